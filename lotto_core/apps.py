@@ -6,4 +6,4 @@ class LottoCoreConfig(AppConfig):
     name = 'lotto_core'
 
     def ready(self):
-        pass
+        from . import signals  # noqa: F401 (시그널 핸들러 등록)
@@ -42,3 +42,13 @@ def sync_cafe_job():
         logger.info(">> 스케줄러: 카페 정보 동기화 작업이 성공적으로 완료되었습니다.")
     except Exception as e:
         logger.error(f">> 스케줄러: 카페 정보 동기화 작업 중 오류 발생: {e}", exc_info=True)
+
+def grade_rounds_job():
+    """
+    1분마다 실행되는 스케줄링 작업입니다.
+    `grade_rounds` 관리자 커맨드를 호출하여 등록된 당첨 결과 채점 작업을 처리합니다.
+    """
+    try:
+        call_command('grade_rounds')
+    except Exception as e:
+        logger.error(f">> 스케줄러: 당첨 결과 채점 작업 중 오류 발생: {e}", exc_info=True)
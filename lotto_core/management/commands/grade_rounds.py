@@ -0,0 +1,54 @@
+from django.core.management.base import BaseCommand, CommandError
+from lotto_core.models import Round
+from lotto_core.utils.grading import GRADE_WORKERS, enqueue_round, run_pending
+from lotto_core.utils.leaderboard import user_leaderboard
+from lotto_core.utils.snapshot import touch_dbsync
+
+
+class Command(BaseCommand):
+    help = '등록된 회차별 당첨 결과 채점 작업(공유 번호, 구매 번호)을 이어서 처리합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rid', type=int, help='이 회차만 처리합니다. 채점 작업이 등록되지 않았으면 새로 등록합니다.')
+        parser.add_argument('--workers', type=int, default=GRADE_WORKERS, help=f'동시에 채점할 작업자 수 (기본값: {GRADE_WORKERS})')
+
+    def handle(self, *args, **options):
+        """
+        채점이 요청된(GradingRequest) 회차의 청크를 등록하고, done=False인 채점 청크(GradingChunk)를 작업자 풀에서 나누어 채점합니다.
+        중간에 중단되어도 완료된 청크는 건너뛰므로 다시 실행하면 남은 청크부터 이어서 처리합니다.
+        """
+        rid = options.get('rid')
+        try:
+            if rid is not None:
+                round_obj = Round.objects.filter(rid=rid).first()
+                if round_obj is None:
+                    raise CommandError(f'회차({rid}) 정보가 없습니다.')
+                added = enqueue_round(round_obj)
+                if added:
+                    self.stdout.write(f"# 회차({rid})의 채점 청크 {added}개를 등록했습니다.")
+
+            summary = run_pending(rid=rid, workers=options['workers'])
+            if summary['enqueued']:
+                self.stdout.write(f"# 채점이 요청된 회차의 채점 청크 {summary['enqueued']}개를 등록했습니다.")
+            if summary['chunks'] == 0:
+                self.stdout.write("# 처리할 채점 작업이 없습니다.")
+                return
+
+            # 공유 번호 채점으로 사용자 당첨 횟수가 바뀌었으므로 사용자 순위를 다시 만들도록 표시합니다.
+            # 이 프로세스(스케줄러)의 캐시뿐 아니라 웹 작업자들도 바로 알 수 있도록 dbsync.json의 수정 시각을 갱신합니다.
+            user_leaderboard.invalidate()
+            try:
+                touch_dbsync()
+            except OSError as e:
+                self.stdout.write(self.style.ERROR(f"# dbsync.json 갱신 실패: {e}"))
+
+            message = f"# 청크 {summary['chunks']}개, 번호 {summary['graded']}개를 채점했습니다."
+            if summary['remaining']:
+                self.stdout.write(self.style.WARNING(f"{message} (남은 청크 {summary['remaining']}개는 다음 실행 때 처리합니다.)"))
+            else:
+                self.stdout.write(self.style.SUCCESS(message))
+
+        except CommandError:
+            raise
+        except Exception as e:
+            raise CommandError(f'채점 작업 중 오류가 발생했습니다: {e}')
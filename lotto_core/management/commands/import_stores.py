@@ -2,6 +2,8 @@ import pandas as pd
 import numpy as np
 from django.core.management.base import BaseCommand
 from lotto_core.models import Store
+from lotto_core.utils.geo_index import store_geo_index
+from lotto_core.utils.region_tree import region_tree
 
 
 class Command(BaseCommand):
@@ -74,6 +76,10 @@ class Command(BaseCommand):
             if stores_to_create:
                 Store.objects.bulk_create(stores_to_create)
                 self.stdout.write(self.style.SUCCESS(f'{len(stores_to_create)}개의 새로운 판매점 정보가 성공적으로 추가되었습니다.'))
+
+                # 주변 판매점 검색 인덱스와 지역 트리를 다시 만들도록 표시합니다.
+                store_geo_index.invalidate()
+                region_tree.invalidate()
             else:
                 self.stdout.write(self.style.SUCCESS('추가할 새로운 데이터가 없습니다.'))
 
@@ -5,7 +5,7 @@ import signal
 from django.core.management.base import BaseCommand
 from apscheduler.schedulers.background import BackgroundScheduler
 from django_apscheduler.jobstores import DjangoJobStore
-from lotto_core.jobs import sync_round_job, sync_stores_job, sync_cafe_job
+from lotto_core.jobs import sync_round_job, sync_stores_job, sync_cafe_job, grade_rounds_job
 
 logger = logging.getLogger(__name__)
 
@@ -71,6 +71,19 @@ class Command(BaseCommand):
         )
         logger.info("스케줄러: '카페 정보 동기화' 작업이 등록되었습니다. (매주 월 09:00)")
 
+        # 4. 당첨 결과 채점 작업 등록 (새 회차가 생성되면 등록된 채점 청크를 처리)
+        scheduler.add_job(
+            grade_rounds_job,
+            trigger='interval',
+            minutes=1,
+            id='grade_rounds_job',
+            name='당첨 결과 채점',
+            max_instances=1,
+            coalesce=True,
+            replace_existing=True,
+        )
+        logger.info("스케줄러: '당첨 결과 채점' 작업이 등록되었습니다. (1분 간격)")
+
         def shutdown_scheduler(signum, frame):
             logger.info("종료 시그널을 수신했습니다. 스케줄러를 안전하게 종료합니다...")
             scheduler.shutdown()
@@ -1,5 +1,6 @@
 from django.core.management.base import BaseCommand, CommandError
 from lotto_core.utils.store_parser import StoreParser
+from lotto_core.utils.store_checkpoint import StoreSyncCheckpoint, StorePageHashes
 import json
 import os
 from django.utils import timezone
@@ -8,19 +9,36 @@ from django.utils import timezone
 class Command(BaseCommand):
     help = '전체 로또 판매점 정보를 가져와 데이터베이스에 동기화합니다.'
 
+    def add_arguments(self, parser):
+        parser.add_argument('--restart', action='store_true', help='저장된 체크포인트를 버리고 처음부터 동기화합니다.')
+        parser.add_argument('--full', action='store_true', help='지난 페이지 해시를 무시하고 모든 판매점을 DB와 비교합니다.')
+
     def handle(self, *args, **options):
         """
         동행복권 사이트에서 전체 로또 판매점 정보를 스크래핑하여 데이터베이스와 동기화합니다.
         - 신규 판매점은 추가합니다.
         - 정보가 변경된 판매점은 업데이트합니다.
         - 없어진 판매점은 비활성화(enabled=False) 처리합니다.
+        페이지와 시도별 반영 여부를 체크포인트(store_sync/)에 저장하므로, 실패 후 다시 실행하면 이어서 진행합니다.
+        지난 반영 때와 내용이 같은 페이지/시도는 페이지 해시(store_hashes.json)로 판단하여 비교를 건너뜁니다.
         """
         try:
             self.stdout.write(self.style.SUCCESS('>> 로또 판매점 정보 동기화를 시작합니다.'))
 
+            checkpoint = StoreSyncCheckpoint()
+            if options['restart']:
+                checkpoint.clear()
+
+            page_hashes = StorePageHashes()
+            if options['full']:
+                page_hashes.clear()
+
             parser = StoreParser()
-            parser.parse_store()
-            parser.upload_store()
+            summary = parser.sync(checkpoint, page_hashes)
+            if summary:
+                self.stdout.write(self.style.SUCCESS(
+                    f"# 생성 {summary['created']}, 수정 {summary['updated']}, 비활성화 {summary['disabled']}, 변경 없음 {summary['unchanged']}"
+                ))
 
             # dbsync.json 업데이트
             try:
@@ -5,11 +5,11 @@ from lotto_core.models import Store
 
 
 class Command(BaseCommand):
-    help = '모든 판매점(Store)의 1등 및 2등 당첨 횟수를 전체 재계산하여 업데이트합니다.'
+    help = '모든 판매점(Store)의 1등 및 2등 당첨 횟수와 당첨금 합계, 최근 당첨일을 전체 재계산하여 업데이트합니다.'
 
     def handle(self, *args, **options):
         """
-        모든 Store의 matches1, matches2 필드를 StoreWin 데이터를 기반으로 전체 재계산하여 업데이트합니다.
+        모든 Store의 matches1, matches2, amount1_total, amount2_total, last_win_date 필드를 StoreWin 데이터를 기반으로 전체 재계산하여 업데이트합니다.
         """
         self.stdout.write(self.style.SUCCESS("## 모든 판매점의 1, 2등 당첨 횟수 전체 업데이트 시작..."))
 
@@ -25,20 +25,30 @@ class Command(BaseCommand):
             # 현재 페이지의 Store 객체에 대해서만 annotate를 실행합니다.
             stores_with_counts = page.object_list.annotate(
                 new_matches1=models.Count('storewin', filter=models.Q(storewin__rank=1)),
-                new_matches2=models.Count('storewin', filter=models.Q(storewin__rank=2))
+                new_matches2=models.Count('storewin', filter=models.Q(storewin__rank=2)),
+                new_amount1_total=models.Sum('storewin__round__amount1', filter=models.Q(storewin__rank=1), default=0),
+                new_amount2_total=models.Sum('storewin__round__amount2', filter=models.Q(storewin__rank=2), default=0),
+                new_last_win_date=models.Max('storewin__round__date')
             )
 
             stores_to_update = []
             for store in stores_with_counts:
                 # 계산된 값과 실제 필드 값이 다른 경우에만 업데이트 목록에 추가합니다.
-                if store.matches1 != store.new_matches1 or store.matches2 != store.new_matches2:
+                if (
+                    store.matches1 != store.new_matches1 or store.matches2 != store.new_matches2
+                    or store.amount1_total != store.new_amount1_total or store.amount2_total != store.new_amount2_total
+                    or store.last_win_date != store.new_last_win_date
+                ):
                     store.matches1 = store.new_matches1
                     store.matches2 = store.new_matches2
+                    store.amount1_total = store.new_amount1_total
+                    store.amount2_total = store.new_amount2_total
+                    store.last_win_date = store.new_last_win_date
                     stores_to_update.append(store)
 
             if stores_to_update:
                 with transaction.atomic():
-                    Store.objects.bulk_update(stores_to_update, ['matches1', 'matches2'])
+                    Store.objects.bulk_update(stores_to_update, ['matches1', 'matches2', 'amount1_total', 'amount2_total', 'last_win_date'])
                 total_updated_count += len(stores_to_update)
                 self.stdout.write(self.style.SUCCESS(f"  - {len(stores_to_update)}개 판매점 업데이트 완료."))
 
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lotto_core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='round',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lotto_core', '0002_round_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='store',
+            index=models.Index(fields=['enabled', 'addr1', 'addr2', 'addr3', 'sid'], name='store_region_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='store',
+            index=models.Index(fields=['enabled', '-matches1', '-matches2', 'sid'], name='store_top_idx'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-17 04:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lotto_core', '0003_store_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GradingChunk',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rid', models.IntegerField()),
+                ('target', models.CharField(max_length=20)),
+                ('start_id', models.BigIntegerField()),
+                ('end_id', models.BigIntegerField()),
+                ('done', models.BooleanField(default=False)),
+                ('graded', models.IntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['done', 'rid', 'target', 'start_id'], name='grading_pending_idx')],
+                'constraints': [models.UniqueConstraint(fields=('rid', 'target', 'start_id'), name='unique_grading_chunk')],
+            },
+        ),
+    ]
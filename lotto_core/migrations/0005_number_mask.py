@@ -0,0 +1,65 @@
+# Generated by Django 5.2.18 on 2026-10-17 04:03
+
+from django.db import migrations, models
+from django.db.models import F, Value
+
+
+def fill_masks(apps, schema_editor):
+    """기존 번호의 비트마스크를 한 번의 UPDATE로 채웁니다. (번호 n -> n-1번째 비트)"""
+    mask = None
+    for i in range(1, 7):
+        bit = Value(1, output_field=models.BigIntegerField()).bitleftshift(F(f'number{i}') - 1)
+        mask = bit if mask is None else mask.bitor(bit)
+    for model_name in ['UserNumber', 'PurchasedNumber', 'SharedNumber']:
+        apps.get_model('lotto_core', model_name).objects.update(mask=mask)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lotto_core', '0004_grading_chunk'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='purchasednumber',
+            name='mask',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='sharednumber',
+            name='mask',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='usernumber',
+            name='deleted',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='usernumber',
+            name='mask',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.RunPython(fill_masks, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='purchasednumber',
+            index=models.Index(fields=['user', 'mask'], name='purchased_user_mask_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='purchasednumber',
+            index=models.Index(fields=['rid', 'mask'], name='purchased_rid_mask_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='sharednumber',
+            index=models.Index(fields=['user', 'mask'], name='shared_user_mask_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='sharednumber',
+            index=models.Index(fields=['rid', 'mask'], name='shared_rid_mask_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='usernumber',
+            index=models.Index(fields=['user', 'mask'], name='usernumber_user_mask_idx'),
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.18 on 2026-10-17 04:06
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def fill_counts(apps, schema_editor):
+    """삭제되지 않은 기존 공유/구매 번호로 조합별 집계를 채웁니다."""
+    CombinationCount = apps.get_model('lotto_core', 'CombinationCount')
+    counts = {}
+    for model_name, field in [('SharedNumber', 'shared'), ('PurchasedNumber', 'purchased')]:
+        rows = (
+            apps.get_model('lotto_core', model_name).objects.filter(deleted=False)
+            .values('rid', 'mask').annotate(n=Count('id')).order_by()
+        )
+        for row in rows.iterator():
+            item = counts.setdefault((row['rid'], row['mask']), {'shared': 0, 'purchased': 0})
+            item[field] = row['n']
+    CombinationCount.objects.bulk_create([
+        CombinationCount(rid=rid, mask=mask, shared=c['shared'], purchased=c['purchased'], total=c['shared'] + c['purchased'])
+        for (rid, mask), c in counts.items()
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lotto_core', '0005_number_mask'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CombinationCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rid', models.IntegerField()),
+                ('mask', models.BigIntegerField()),
+                ('shared', models.IntegerField(default=0)),
+                ('purchased', models.IntegerField(default=0)),
+                ('total', models.IntegerField(default=0)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['rid', '-total', 'mask'], name='combination_total_idx'), models.Index(fields=['rid', '-shared', 'mask'], name='combination_shared_idx'), models.Index(fields=['rid', '-purchased', 'mask'], name='combination_purchased_idx')],
+                'constraints': [models.UniqueConstraint(fields=('rid', 'mask'), name='unique_combination_count')],
+            },
+        ),
+        migrations.RunPython(fill_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.2.18 on 2026-10-17 04:15
+
+from django.db import migrations, models
+from django.db.models import Max, Q, Sum
+
+
+def fill_aggregates(apps, schema_editor):
+    """기존 당첨 내역(StoreWin)과 회차 당첨금으로 판매점별 당첨금 합계와 최근 당첨일을 채웁니다."""
+    Store = apps.get_model('lotto_core', 'Store')
+    rows = (
+        apps.get_model('lotto_core', 'StoreWin').objects.values('store_id')
+        .annotate(
+            amount1_total=Sum('round__amount1', filter=Q(rank=1)),
+            amount2_total=Sum('round__amount2', filter=Q(rank=2)),
+            last_win_date=Max('round__date'),
+        ).order_by()
+    )
+    stores = [
+        Store(sid=row['store_id'], amount1_total=row['amount1_total'] or 0, amount2_total=row['amount2_total'] or 0,
+              last_win_date=row['last_win_date'])
+        for row in rows
+    ]
+    Store.objects.bulk_update(stores, ['amount1_total', 'amount2_total', 'last_win_date'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lotto_core', '0006_combination_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='store',
+            name='amount1_total',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='store',
+            name='amount2_total',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='store',
+            name='last_win_date',
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='storewin',
+            index=models.Index(fields=['store', 'round'], name='storewin_store_round_idx'),
+        ),
+        migrations.RunPython(fill_aggregates, migrations.RunPython.noop),
+    ]
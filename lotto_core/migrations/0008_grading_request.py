@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-17 04:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lotto_core', '0007_store_win_aggregates'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GradingRequest',
+            fields=[
+                ('rid', models.IntegerField(primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+    ]
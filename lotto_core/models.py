@@ -1,6 +1,4 @@
 from django.db import models
-from django.db.models.signals import post_save
-from django.dispatch import receiver
 
 
 class Round(models.Model):
@@ -49,6 +47,7 @@ class Round(models.Model):
     rule_ballset = models.IntegerField(default=0) # 추첨방식: 볼세트 (1~3)
     rule_garo = models.IntegerField(default=0) # 추첨방식: 모름/가로/세로 (0~2)
     rule_machine = models.IntegerField(default=0) # 추첨방식: 추첨기 (1~3)
+    updated_at = models.DateTimeField(auto_now=True) # 갱신일
 
 
 class Store(models.Model):
@@ -65,8 +64,19 @@ class Store(models.Model):
     geo_n = models.FloatField(default=0) # latitude
     matches1 = models.IntegerField(default=0) # 1등 당첨 수 
     matches2 = models.IntegerField(default=0) # 2등 당첨 수
+    amount1_total = models.BigIntegerField(default=0) # 1등 당첨금 합계 (회차별 1게임당 1등 당첨금의 합)
+    amount2_total = models.BigIntegerField(default=0) # 2등 당첨금 합계 (회차별 1게임당 2등 당첨금의 합)
+    last_win_date = models.DateField(null=True, blank=True) # 최근 1, 2등 당첨 추첨일
     updated_at = models.DateTimeField(auto_now=True) # 갱신일
 
+    class Meta:
+        indexes = [
+            # 지역별 판매점 목록 (stores/region): 지역 필터 + sid 순 키셋 페이지네이션
+            models.Index(fields=['enabled', 'addr1', 'addr2', 'addr3', 'sid'], name='store_region_idx'),
+            # 당첨 판매점 순위 (stores/top): 1등 > 2등 > sid 순 키셋 페이지네이션
+            models.Index(fields=['enabled', '-matches1', '-matches2', 'sid'], name='store_top_idx'),
+        ]
+
 
 class StoreWin(models.Model):
     class WinType(models.IntegerChoices):
@@ -80,6 +90,12 @@ class StoreWin(models.Model):
     rank = models.IntegerField()
     auto = models.IntegerField(choices=WinType.choices)
 
+    class Meta:
+        indexes = [
+            # 판매점 상세 (store?detail=1): 판매점의 당첨 내역을 회차 순으로 조회
+            models.Index(fields=['store', 'round'], name='storewin_store_round_idx'),
+        ]
+
 
 class User(models.Model):
     uid = models.CharField(max_length=20, unique=True)
@@ -99,12 +115,17 @@ class UserNumber(models.Model):
     number4 = models.IntegerField()
     number5 = models.IntegerField()
     number6 = models.IntegerField()
+    mask = models.BigIntegerField(default=0) # 번호 조합 비트마스크 (번호 n -> n-1번째 비트)
+    deleted = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True) # 생성일
 
     class Meta:
         constraints = [
             models.UniqueConstraint(fields=['user', 'number1', 'number2', 'number3', 'number4', 'number5', 'number6'], name='unique_user_number')
         ]
+        indexes = [
+            models.Index(fields=['user', 'mask'], name='usernumber_user_mask_idx'),
+        ]
 
 
 class PurchasedNumber(models.Model):
@@ -117,9 +138,16 @@ class PurchasedNumber(models.Model):
     number4 = models.IntegerField()
     number5 = models.IntegerField()
     number6 = models.IntegerField()
+    mask = models.BigIntegerField(default=0) # 번호 조합 비트마스크 (번호 n -> n-1번째 비트)
     result = models.IntegerField(default=-1) # 당첨 결과 (-1:미추첨, 0:꽝, 1~5:1~5등)
     created_at = models.DateTimeField(auto_now_add=True) # 생성일
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'mask'], name='purchased_user_mask_idx'),
+            models.Index(fields=['rid', 'mask'], name='purchased_rid_mask_idx'),
+        ]
+
 
 class SharedNumber(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
@@ -131,6 +159,7 @@ class SharedNumber(models.Model):
     number4 = models.IntegerField()
     number5 = models.IntegerField()
     number6 = models.IntegerField()
+    mask = models.BigIntegerField(default=0) # 번호 조합 비트마스크 (번호 n -> n-1번째 비트)
     description = models.TextField() # 글 내용
     result = models.IntegerField(default=-1) # 당첨 결과 (-1:미추첨, 0:꽝, 1~5:1~5등)
     created_at = models.DateTimeField(auto_now_add=True) # 생성일
@@ -139,6 +168,33 @@ class SharedNumber(models.Model):
         constraints = [
             models.UniqueConstraint(fields=['user', 'rid', 'number1', 'number2', 'number3', 'number4', 'number5', 'number6'], name='unique_shared_number')
         ]
+        indexes = [
+            models.Index(fields=['user', 'mask'], name='shared_user_mask_idx'),
+            models.Index(fields=['rid', 'mask'], name='shared_rid_mask_idx'),
+        ]
+
+
+class CombinationCount(models.Model):
+    """
+    회차별 번호 조합의 인기도 집계 (utils/popularity.py 참고).
+    공유 번호/구매 번호가 저장되거나 삭제될 때 증감하므로, 인기 조합을 조회할 때 전체 번호를 GROUP BY 하지 않습니다.
+    """
+    rid = models.IntegerField() # 회차
+    mask = models.BigIntegerField() # 번호 조합 비트마스크 (번호 n -> n-1번째 비트)
+    shared = models.IntegerField(default=0) # 공유 번호 수
+    purchased = models.IntegerField(default=0) # 구매 번호 수
+    total = models.IntegerField(default=0) # 공유 + 구매 번호 수
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['rid', 'mask'], name='unique_combination_count')
+        ]
+        indexes = [
+            # 회차별 인기 조합 (numbers/hot): 상위 k개만 인덱스 순서대로 읽습니다.
+            models.Index(fields=['rid', '-total', 'mask'], name='combination_total_idx'),
+            models.Index(fields=['rid', '-shared', 'mask'], name='combination_shared_idx'),
+            models.Index(fields=['rid', '-purchased', 'mask'], name='combination_purchased_idx'),
+        ]
 
 
 class SharedNumberComment(models.Model):
@@ -148,67 +204,35 @@ class SharedNumberComment(models.Model):
     created_at = models.DateTimeField(auto_now_add=True) # 생성일
 
 
-@receiver(post_save, sender=Round)
-def update_shared_number_results(sender, instance, created, **kwargs):
+class GradingRequest(models.Model):
+    """
+    채점 청크 등록을 기다리는 회차 표시 (utils/grading.py 참고).
+    회차가 저장되면 커밋 후 이 행만 추가하고, 대상 번호를 청크로 나누는 작업은 run_pending이 회차 저장과 분리하여 처리합니다.
     """
-    (시그널 핸들러)
-    새로운 Round가 생성될 때, 해당 회차의 SharedNumber들의 당첨 결과를 업데이트합니다.
+    rid = models.IntegerField(primary_key=True) # 회차
+    created_at = models.DateTimeField(auto_now_add=True) # 생성일
+
+
+class GradingChunk(models.Model):
     """
-    if not created:
-        return
-
-    # 해당 회차의 공유 번호들을 가져옵니다.
-    shared_numbers_to_check = SharedNumber.objects.filter(
-        rid=instance.rid, result=-1 # 아직 처리되지 않은 번호만 대상으로 합니다.
-    )
-
-    if not shared_numbers_to_check:
-        return
-
-    # 당첨 번호와 보너스 번호를 세트로 만듭니다.
-    win_numbers = {instance.number1, instance.number2, instance.number3, instance.number4, instance.number5, instance.number6}
-    bonus_number = instance.number7
-
-    updated_shared_numbers = []
-    users_to_update = {} # 사용자의 당첨 횟수를 업데이트하기 위한 딕셔너리
-    for shared in shared_numbers_to_check:
-        shared_nums = {shared.number1, shared.number2, shared.number3, shared.number4, shared.number5, shared.number6}
-        
-        # 일치하는 번호 개수 확인
-        match_count = len(win_numbers.intersection(shared_nums))
-
-        # 등수 판정
-        if match_count == 6:
-            shared.result = 1
-            if shared.user_id not in users_to_update: users_to_update[shared.user_id] = {'matches1': 0, 'matches2': 0, 'matches3': 0}
-            users_to_update[shared.user_id]['matches1'] += 1
-        elif match_count == 5 and bonus_number in shared_nums:
-            shared.result = 2
-            if shared.user_id not in users_to_update: users_to_update[shared.user_id] = {'matches1': 0, 'matches2': 0, 'matches3': 0}
-            users_to_update[shared.user_id]['matches2'] += 1
-        elif match_count == 5:
-            shared.result = 3
-            if shared.user_id not in users_to_update: users_to_update[shared.user_id] = {'matches1': 0, 'matches2': 0, 'matches3': 0}
-            users_to_update[shared.user_id]['matches3'] += 1
-        elif match_count == 4:
-            shared.result = 4
-        elif match_count == 3:
-            shared.result = 5
-        else:
-            shared.result = 0
-
-        updated_shared_numbers.append(shared)
-
-    # 데이터베이스 업데이트 (트랜잭션으로 묶어 원자성 보장)
-    with models.manager.transaction.atomic():
-        # 1. SharedNumber의 당첨 결과(result)를 bulk_update 합니다.
-        if updated_shared_numbers:
-            SharedNumber.objects.bulk_update(updated_shared_numbers, ['result'])
-
-        # 2. User의 당첨 횟수(matches)를 F() 표현식을 사용하여 업데이트합니다.
-        for user_id, counts in users_to_update.items():
-            User.objects.filter(id=user_id).update(
-                matches1=models.F('matches1') + counts['matches1'],
-                matches2=models.F('matches2') + counts['matches2'],
-                matches3=models.F('matches3') + counts['matches3'],
-            )
+    회차별 당첨 결과 채점 작업의 단위 (utils/grading.py 참고).
+    채점 대상 번호를 id 범위로 나눈 것으로, 채점 결과와 done 표시가 같은 트랜잭션에서 저장되므로
+    작업이 중간에 중단되어도 done=False인 청크만 다시 처리하면 됩니다.
+    """
+    rid = models.IntegerField() # 회차
+    target = models.CharField(max_length=20) # 채점 대상 모델 (SharedNumber, PurchasedNumber)
+    start_id = models.BigIntegerField() # 대상 id 범위: 시작 (포함)
+    end_id = models.BigIntegerField() # 대상 id 범위: 끝 (포함)
+    done = models.BooleanField(default=False) # 채점 완료 여부
+    graded = models.IntegerField(default=0) # 채점한 번호 수
+    created_at = models.DateTimeField(auto_now_add=True) # 생성일
+    updated_at = models.DateTimeField(auto_now=True) # 갱신일
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['rid', 'target', 'start_id'], name='unique_grading_chunk')
+        ]
+        indexes = [
+            # 처리할 청크 조회
+            models.Index(fields=['done', 'rid', 'target', 'start_id'], name='grading_pending_idx'),
+        ]
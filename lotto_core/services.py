@@ -1,10 +1,20 @@
 from .models import Round, User, UserNumber, SharedNumber, Store, StoreWin, PurchasedNumber
 from .utils.nick_generator import generate_nick
+from .utils.round_snapshot import round_snapshot, ROUND_FIELDS, ROUND_FORMATS
+from .utils.geo_index import store_geo_index
+from .utils.region_tree import region_tree
+from .utils.leaderboard import store_leaderboard, user_leaderboard
+from .utils.number_stats import number_stats
+from .utils.draw_analytics import draw_analytics
+from .utils import number_generator
+from .utils.grading import number_mask, number_masks, popcount
+from .utils import popularity
 import secrets
 from django.core.exceptions import ValidationError
-from django.db import transaction
+from django.db import IntegrityError, transaction
 import math
-from django.db.models import Q, Case, When, Value, IntegerField
+import numpy as np
+from django.db.models import Q, F, Case, When, Value, IntegerField, Max
 
 MAX_NICKNAME_LENGTH = 18 # 사용자 닉네임 최대 길이 (의도된 18자)
 
@@ -20,6 +30,64 @@ def get_all_rounds():
     return Round.objects.all().order_by('-rid')
 
 
+def get_all_rounds_payload(fmt: str = 'json'):
+    """
+    미리 직렬화해 둔 전체 회차 목록을 가져옵니다.
+    회차 정보가 바뀌지 않았다면 DB 조회나 직렬화 없이 프로세스 메모리의 스냅샷을 그대로 반환합니다.
+
+    Args:
+        fmt (str, optional): 인코딩 형식. 'json', 'columns', 'binary' 중 하나. Defaults to 'json'.
+
+    Returns:
+        RoundPayload: body(바이트), etag(강한 ETag 문자열), content_type, version(스냅샷 버전)을 담은 객체.
+                      body의 회차 순서는 get_all_rounds()와 같이 rid 내림차순입니다.
+
+    Raises:
+        ValidationError: 지원하지 않는 인코딩 형식일 경우.
+    """
+    if fmt not in ROUND_FORMATS:
+        raise ValidationError(f"지원하지 않는 형식입니다: {fmt} ({', '.join(ROUND_FORMATS)} 중 하나여야 합니다.)")
+    return round_snapshot.get()[fmt]
+
+
+def get_rounds_since(since_rid: int = None, since=None):
+    """
+    마지막 동기화 이후 추가되거나 변경된 회차 정보만 가져옵니다. (증분 동기화)
+
+    - since_rid가 주어지면, 그보다 큰 회차(새로 추첨된 회차)를 포함합니다.
+    - since(datetime)가 주어지면, 그 이후 갱신된 회차(카페 정보로 drawing*/practice*/rule_* 가 채워진 회차 등)를 포함합니다.
+    - 둘 다 주어지면 두 조건 중 하나라도 만족하는 회차를 모두 포함합니다.
+    - 둘 다 없으면 전체 회차를 반환합니다.
+
+    Args:
+        since_rid (int, optional): 클라이언트가 가진 마지막 회차 번호. Defaults to None.
+        since (datetime, optional): 클라이언트가 마지막으로 받은 갱신 시각. Defaults to None.
+
+    Returns:
+        dict: 다음 요청에 사용할 커서(last_rid, updated_at)와 변경된 회차 목록(items)을 담은 딕셔너리.
+              items는 get_all_rounds()와 같이 rid 내림차순으로 정렬됩니다.
+    """
+    # 커서는 변경 여부와 관계없이 현재 테이블 상태를 기준으로 계산합니다.
+    cursor = Round.objects.aggregate(last_rid=Max('rid'), updated_at=Max('updated_at'))
+
+    queryset = get_all_rounds()
+    conditions = Q()
+    if since_rid is not None:
+        conditions |= Q(rid__gt=since_rid)
+    if since is not None:
+        conditions |= Q(updated_at__gt=since)
+    if conditions:
+        queryset = queryset.filter(conditions)
+
+    # 밀리초로 잘리지 않도록 isoformat()으로 직접 직렬화합니다. (잘리면 마지막 회차가 매번 다시 내려옵니다.)
+    updated_at = cursor['updated_at']
+    return {
+        'last_rid': cursor['last_rid'] or 0,
+        'updated_at': updated_at.isoformat() if updated_at else None,
+        'items': list(queryset.values(*ROUND_FIELDS)),
+    }
+
+
 def get_last_round():
     """
     데이터베이스에서 가장 최신 로또 회차 정보를 가져옵니다.
@@ -46,23 +114,53 @@ def get_round(rid: int):
     return Round.objects.get(rid=rid)
 
 
+def _get_region_nodes(addr1: str = None, addr2: str = None):
+    """지역 트리에서 주어진 상위 지역의 하위 노드 리스트를 찾습니다. 없으면 빈 리스트를 반환합니다."""
+    tree = region_tree.get()
+    if addr1 and addr2:
+        parent = tree['nodes'].get((addr1, addr2))
+    elif addr1:
+        parent = tree['nodes'].get((addr1,))
+    else:
+        return tree['roots']
+    return parent['children'] if parent else []
+
+
 def get_regions(addr1: str = None, addr2: str = None):
     """
     주소 정보를 계층적으로 조회합니다.
+    메모리에 올려 둔 지역 트리(region_tree)에서 조회하므로 DB를 조회하지 않습니다.
 
     - 매개변수가 없으면, 중복되지 않은 시/도 (addr1) 리스트를 반환합니다.
     - addr1이 주어지면, 해당 시/도의 중복되지 않은 시/군/구 (addr2) 리스트를 반환합니다.
     - addr1과 addr2가 주어지면, 해당하는 중복되지 않은 읍/면/동 (addr3) 리스트를 반환합니다.
     """
-    queryset = Store.objects.filter(enabled=True)
-    if addr1 and addr2:
-        queryset = queryset.filter(addr1=addr1, addr2=addr2)
-        return list(queryset.values_list('addr3', flat=True).distinct())
-    elif addr1:
-        queryset = queryset.filter(addr1=addr1)
-        return list(queryset.values_list('addr2', flat=True).distinct())
-    else:
-        return list(queryset.values_list('addr1', flat=True).distinct())
+    return [node['name'] for node in _get_region_nodes(addr1, addr2)]
+
+
+def get_region_tree(addr1: str = None, addr2: str = None):
+    """
+    판매점 수와 1/2등 당첨 수 합계를 포함한 지역 트리를 조회합니다.
+
+    Args:
+        addr1 (str, optional): 시/도. 주어지면 해당 시/도의 하위 트리만 반환합니다. Defaults to None.
+        addr2 (str, optional): 시/군/구. addr1과 함께 주어지면 해당 시/군/구의 하위 트리만 반환합니다. Defaults to None.
+
+    Returns:
+        list[dict]: {'name', 'stores', 'matches1', 'matches2', ('children')} 노드 리스트.
+                    시/도와 시/군/구 노드는 children에 하위 노드를 가집니다.
+    """
+    return _get_region_nodes(addr1, addr2)
+
+
+def get_region_tree_body():
+    """
+    미리 JSON으로 직렬화해 둔 전체 지역 트리를 반환합니다.
+
+    Returns:
+        bytes: get_region_tree()의 결과를 JSON으로 인코딩한 바이트.
+    """
+    return region_tree.get()['body']
 
 
 def get_stores_by_region(addr1: str = None, addr2: str = None, addr3: str = None):
@@ -70,6 +168,7 @@ def get_stores_by_region(addr1: str = None, addr2: str = None, addr3: str = None
     주어진 지역 정보(시/도, 시/군/구, 읍/면/동)에 따라 판매점 목록을 조회합니다.
     - 활성화된(enabled=True) 판매점만 대상으로 합니다.
     - 지역 정보가 주어질수록 더 상세하게 필터링합니다.
+    - sid 순으로 정렬되므로 키셋 페이지네이션 시 store_region_idx 인덱스를 사용합니다.
 
     Args:
         addr1 (str, optional): 시/도. Defaults to None.
@@ -77,7 +176,7 @@ def get_stores_by_region(addr1: str = None, addr2: str = None, addr3: str = None
         addr3 (str, optional): 읍/면/동. Defaults to None.
 
     Returns:
-        QuerySet: Store 모델의 QuerySet.
+        QuerySet: Store 모델의 QuerySet. sid 오름차순으로 정렬됩니다.
     """
     queryset = Store.objects.filter(enabled=True)
 
@@ -91,46 +190,89 @@ def get_stores_by_region(addr1: str = None, addr2: str = None, addr3: str = None
     return queryset.order_by('sid')
 
 
-def get_nearby_stores(latitude: float, longitude: float):
+NEARBY_RADIUS_M = 10000 # 주변 판매점 기본 검색 반경 (약 10km)
+NEARBY_MIN_STORES = 5 # 반경 내 판매점이 부족할 때 최소로 반환할 판매점 수
+NEARBY_MAX_LIMIT = 100 # 한 번에 반환할 수 있는 최대 판매점 수
+NEARBY_BOUNDS_MARGIN = 1.0 # 판매점 인덱스 범위 밖으로 검색을 허용할 여유 (도, 약 100km)
+STORE_LIST_FIELDS = ['sid', 'sname', 'phone', 'addr_doro', 'addr4', 'geo_n', 'geo_e', 'matches1', 'matches2']
+
+
+def get_nearby_stores(latitude: float, longitude: float, radius_m: float = NEARBY_RADIUS_M, limit: int = NEARBY_MAX_LIMIT,
+                      cursor: str = None, lucky: bool = False, min_stores: int = NEARBY_MIN_STORES):
     """
-    주어진 좌표 근처의 판매점을 검색합니다.
-    - 초기 위도 ±0.1, 경도 ±0.1 (약 10km) 범위로 검색합니다.
-    - 결과가 5개 미만이면, 최소 5개의 판매점이 나올 때까지 위/경도 범위를 각각 0.05씩 늘려나갑니다.
+    주어진 좌표 근처의 판매점을 가까운 순서대로 검색합니다.
+    - 메모리에 올려 둔 판매점 공간 인덱스(GeoGrid)에서 대원 거리(haversine) 기준으로 찾습니다.
+    - 반경 radius_m 이내의 판매점을 가까운 순서로 최대 limit개 반환합니다.
+    - 반경 내 판매점이 min_stores개 미만이면, 거리와 관계없이 가장 가까운 min_stores개를 반환합니다.
+    - lucky가 True이면 1등 당첨 이력이 있는 판매점(명당)만 별도 인덱스에서 찾습니다.
+    - 기준점이 판매점 인덱스 범위에서 NEARBY_BOUNDS_MARGIN 이상 벗어나 있으면 빈 목록을 반환합니다.
 
     Args:
         latitude (float): 기준점의 위도.
         longitude (float): 기준점의 경도.
+        radius_m (float, optional): 검색 반경(m). Defaults to NEARBY_RADIUS_M.
+        limit (int, optional): 최대 반환 개수 (1 ~ NEARBY_MAX_LIMIT). Defaults to NEARBY_MAX_LIMIT.
+        cursor (str, optional): 이전 응답의 next_cursor. 주어지면 그 다음 판매점부터 반환합니다. Defaults to None.
+        lucky (bool, optional): 1등 배출 판매점만 검색할지 여부. Defaults to False.
+        min_stores (int, optional): 반경과 관계없이 보장할 최소 판매점 수. Defaults to NEARBY_MIN_STORES.
 
     Returns:
-        QuerySet: Store 모델의 QuerySet. 활성화된 판매점만 반환합니다.
+        dict: items(판매점 리스트)와 next_cursor(다음 페이지 커서, 없으면 None)를 담은 딕셔너리.
+              items의 각 항목은 STORE_LIST_FIELDS와 distance(기준점까지의 거리, m)를 담고, 거리 오름차순으로 정렬됩니다.
+
+    Raises:
+        ValidationError: 파라미터가 유효하지 않을 경우.
     """
-    # 초기 위/경도 차이 (약 10km)
-    lat_diff = 0.1
-    lon_diff = 0.1
-    min_stores_count = 5
-    max_iterations = 20  # 무한 루프 방지를 위한 최대 반복 횟수
-    current_iteration = 0
+    if radius_m <= 0:
+        raise ValidationError("radius_m은 0보다 커야 합니다.")
+    if not (1 <= limit <= NEARBY_MAX_LIMIT):
+        raise ValidationError(f"limit은 1에서 {NEARBY_MAX_LIMIT} 사이의 정수여야 합니다.")
+
+    # 커서는 마지막으로 반환한 판매점의 (거리, sid)입니다. 거리는 repr로 직렬화하여 정확히 복원됩니다.
+    after = None
+    if cursor:
+        try:
+            distance_str, sid_str = cursor.split(':')
+            after = (float(distance_str), int(sid_str))
+        except ValueError:
+            raise ValidationError("cursor 형식이 올바르지 않습니다.")
+
+    grid = store_geo_index.get()['lucky' if lucky else 'all']
+    if not grid.contains(latitude, longitude, NEARBY_BOUNDS_MARGIN):
+        return {'items': [], 'next_cursor': None}
+
+    nearest = []
+    for rank, (distance, sid, _, _) in enumerate(grid.iter_nearest(latitude, longitude)):
+        if distance > radius_m and rank >= min_stores:
+            break
+        if after and (distance, sid) <= after:
+            continue
+        nearest.append((sid, distance))
+        if len(nearest) > limit: # 다음 페이지 존재 여부를 알기 위해 하나 더 가져옵니다.
+            break
 
-    while current_iteration < max_iterations:
-        current_iteration += 1
+    has_next = len(nearest) > limit
+    nearest = nearest[:limit]
 
-        stores = Store.objects.filter(
-            enabled=True,
-            geo_n__gte=latitude - lat_diff,
-            geo_n__lte=latitude + lat_diff,
-            geo_e__gte=longitude - lon_diff,
-            geo_e__lte=longitude + lon_diff
-        )
+    # 인덱스에는 좌표만 있으므로, 찾은 판매점의 상세 정보는 한 번의 쿼리로 가져옵니다.
+    stores_qs = Store.objects.filter(sid__in=[sid for sid, _ in nearest], enabled=True)
+    if lucky:
+        stores_qs = stores_qs.filter(matches1__gt=0)
+    stores_map = {s['sid']: s for s in stores_qs.values(*STORE_LIST_FIELDS)}
 
-        # 조회된 상점이 5개 이상이면 루프를 종료하고 결과를 반환합니다.
-        if stores.count() >= min_stores_count:
-            break
+    items = []
+    for sid, distance in nearest:
+        store = stores_map.get(sid)
+        if store:
+            store['distance'] = round(distance)
+            items.append(store)
 
-        # 결과가 부족하면 검색 범위를 확장합니다.
-        lat_diff += 0.05
-        lon_diff += 0.05
+    next_cursor = None
+    if has_next and nearest:
+        last_sid, last_distance = nearest[-1]
+        next_cursor = f'{last_distance!r}:{last_sid}'
 
-    return stores
+    return {'items': items, 'next_cursor': next_cursor}
 
 
 def get_round_stores(rid: int):
@@ -154,15 +296,45 @@ def get_top_stores():
     """
     1등 당첨 횟수가 많은 순서로 판매점 목록을 조회합니다.
     1등 또는 2등 당첨 이력이 있는 판매점만 대상으로 하며,
-    1등 횟수가 같으면 2등 횟수가 많은 순으로 정렬합니다.
+    1등 횟수가 같으면 2등 횟수가 많은 순으로, 그마저 같으면 sid 순으로 정렬합니다.
+    키셋 페이지네이션 시 store_top_idx 인덱스를 사용합니다.
 
     Returns:
         QuerySet: Store 모델의 QuerySet.
     """
-    return Store.objects.filter(
+    queryset = Store.objects.filter(
         Q(matches1__gt=0) | Q(matches2__gt=0),
         enabled=True
-    ).order_by('-matches1', '-matches2')
+    )
+    return queryset.order_by('-matches1', '-matches2', 'sid')
+
+
+def get_top_stores_ranked(offset: int, limit: int):
+    """
+    미리 계산해 둔 판매점 순위(store_leaderboard)에서 한 페이지를 조회합니다.
+    정렬이나 COUNT 없이 순위 배열을 잘라 쓰므로, 어느 페이지든 조회 비용이 같습니다.
+
+    Args:
+        offset (int): 건너뛸 판매점 수.
+        limit (int): 가져올 판매점 수.
+
+    Returns:
+        tuple: (전체 순위 대상 수, 판매점 딕셔너리 리스트). 각 판매점에는 순위(rank)가 포함됩니다.
+    """
+    ranking = store_leaderboard.get()
+    page = ranking.slice(offset, limit)
+    stores_map = {
+        s['sid']: s for s in Store.objects.filter(sid__in=[sid for sid, _ in page]).values(
+            'sid', 'sname', 'phone', 'addr_doro', 'addr4', 'geo_n', 'geo_e', 'matches1', 'matches2', 'enabled'
+        )
+    }
+    items = []
+    for sid, rank in page:
+        store = stores_map.get(sid)
+        if store:
+            store['rank'] = rank
+            items.append(store)
+    return len(ranking), items
 
 
 def get_store(sid: int):
@@ -181,6 +353,29 @@ def get_store(sid: int):
     return Store.objects.get(sid=sid)
 
 
+def get_store_wins(sid: int):
+    """
+    판매점의 모든 당첨 내역을 회차의 추첨일, 당첨금과 함께 조회합니다.
+    StoreWin과 Round를 JOIN하는 한 번의 쿼리로 가져오며, (store, round) 인덱스를 사용합니다.
+
+    Args:
+        sid (int): 판매점의 고유 ID.
+
+    Returns:
+        list[dict]: 최근 회차 순 [{'rid', 'date', 'rank', 'auto', 'amount'}, ...]. amount는 해당 등수의 1게임당 당첨금입니다.
+    """
+    return list(
+        StoreWin.objects.filter(store_id=sid)
+        .annotate(
+            rid=F('round_id'),
+            date=F('round__date'),
+            amount=Case(When(rank=1, then=F('round__amount1')), default=F('round__amount2')),
+        )
+        .order_by('-round_id', 'rank')
+        .values('rid', 'date', 'rank', 'auto', 'amount')
+    )
+
+
 def register_user():
     """
     새로운 사용자를 생성하고 데이터베이스에 저장합니다.
@@ -254,6 +449,23 @@ def set_user_nick(uid: str, new_nick: str):
     return user
 
 
+def _numbers_list_masks(numbers_list: list[list[int]]):
+    """
+    삭제/조회할 번호 세트들을 비트마스크 목록으로 변환합니다.
+    1~45 사이의 중복 없는 정수 6개가 아닌 세트는 저장된 번호와 일치할 수 없으므로 건너뜁니다.
+
+    Raises:
+        ValidationError: 번호 세트가 6개의 숫자로 이루어진 리스트가 아닐 경우.
+    """
+    masks = set()
+    for numbers in numbers_list:
+        if not isinstance(numbers, list) or len(numbers) != 6:
+            raise ValidationError("각 로또 번호 세트는 6개의 숫자로 이루어진 리스트여야 합니다.")
+        if len(set(numbers)) == 6 and all(isinstance(n, int) and 1 <= n <= 45 for n in numbers):
+            masks.add(number_mask(numbers))
+    return list(masks)
+
+
 def add_user_numbers(uid: str, numbers_list: list[list[int]]):
     """
     주어진 UID를 가진 사용자의 로또 번호를 저장합니다.
@@ -298,6 +510,7 @@ def add_user_numbers(uid: str, numbers_list: list[list[int]]):
                 number4=sorted_numbers[3],
                 number5=sorted_numbers[4],
                 number6=sorted_numbers[5],
+                mask=number_mask(sorted_numbers),
             )
             user_numbers_to_create.append(user_number_obj)
 
@@ -332,19 +545,10 @@ def del_user_numbers(uid: str, numbers_list: list[list[int]]):
     except User.DoesNotExist:
         raise User.DoesNotExist(f"UID '{uid}'를 가진 사용자를 찾을 수 없습니다.")
 
-    q_objects = Q()
-    for numbers in numbers_list:
-        if not isinstance(numbers, list) or len(numbers) != 6:
-            raise ValidationError("각 로또 번호 세트는 6개의 숫자로 이루어진 리스트여야 합니다.")
-        
-        sorted_numbers = sorted(numbers)
-        q_objects |= Q(
-            number1=sorted_numbers[0], number2=sorted_numbers[1], number3=sorted_numbers[2],
-            number4=sorted_numbers[3], number5=sorted_numbers[4], number6=sorted_numbers[5]
-        )
+    masks = _numbers_list_masks(numbers_list)
 
-    # 사용자의 번호 중, 삭제 요청된 번호 조합과 일치하고 아직 삭제되지 않은 번호들을 업데이트합니다.
-    updated_count = UserNumber.objects.filter(user=user, deleted=False).filter(q_objects).update(deleted=True)
+    # 사용자의 번호 중, 삭제 요청된 번호 조합과 일치하고 아직 삭제되지 않은 번호들을 업데이트합니다. ((user, mask) 인덱스 사용)
+    updated_count = UserNumber.objects.filter(user=user, deleted=False, mask__in=masks).update(deleted=True)
     return updated_count
 
 
@@ -416,11 +620,14 @@ def add_purchased_numbers(uid: str, numbers_list: list[list[int]]):
                 number4=sorted_numbers[3],
                 number5=sorted_numbers[4],
                 number6=sorted_numbers[5],
+                mask=number_mask(sorted_numbers),
             )
             purchased_numbers_to_create.append(purchased_number_obj)
 
         # 5. bulk_create를 사용하여 한 번의 쿼리로 여러 객체를 생성합니다.
-        return PurchasedNumber.objects.bulk_create(purchased_numbers_to_create)
+        created_numbers = PurchasedNumber.objects.bulk_create(purchased_numbers_to_create)
+        popularity.change_counts('purchased', [(n.rid, n.mask) for n in created_numbers])
+        return created_numbers
 
 
 def del_purchased_numbers(uid: str, numbers_list: list[list[int]]):
@@ -444,15 +651,16 @@ def del_purchased_numbers(uid: str, numbers_list: list[list[int]]):
     except User.DoesNotExist:
         raise User.DoesNotExist(f"UID '{uid}'를 가진 사용자를 찾을 수 없습니다.")
 
-    q_objects = Q()
-    for numbers in numbers_list:
-        if not isinstance(numbers, list) or len(numbers) != 6:
-            raise ValidationError("각 로또 번호 세트는 6개의 숫자로 이루어진 리스트여야 합니다.")
-        
-        sorted_numbers = sorted(numbers)
-        q_objects |= Q(number1=sorted_numbers[0], number2=sorted_numbers[1], number3=sorted_numbers[2], number4=sorted_numbers[3], number5=sorted_numbers[4], number6=sorted_numbers[5])
+    masks = _numbers_list_masks(numbers_list)
 
-    updated_count = PurchasedNumber.objects.filter(user=user, deleted=False).filter(q_objects).update(deleted=True)
+    with transaction.atomic():
+        # 조합별 집계를 줄이기 위해 삭제할 번호의 (회차, 마스크)를 잠그고 가져옵니다.
+        targets = list(
+            PurchasedNumber.objects.select_for_update()
+            .filter(user=user, deleted=False, mask__in=masks).values_list('id', 'rid', 'mask')
+        )
+        updated_count = PurchasedNumber.objects.filter(id__in=[t[0] for t in targets]).update(deleted=True)
+        popularity.change_counts('purchased', [(rid, mask) for _, rid, mask in targets], sign=-1)
     return updated_count
 
 
@@ -473,6 +681,189 @@ def get_purchased_numbers(uid: str):
     return PurchasedNumber.objects.filter(user__uid=uid, deleted=False).order_by('-created_at')
 
 
+BULK_MAX_NUMBERS = 5000 # 일괄 저장 API에서 한 번에 받을 수 있는 최대 번호 세트 수
+BULK_BATCH_SIZE = 1000 # bulk_create 한 번에 저장할 행 수
+
+
+def _validate_number_sets(items: list):
+    """
+    번호 세트 목록을 한꺼번에 검사합니다.
+    형태(6개의 정수 리스트)만 항목별로 확인하고, 범위(1~45)와 중복 번호는 배열 연산으로 한 번에 검사합니다.
+
+    Args:
+        items (list): 번호 세트 후보들. 형식이 잘못된 항목도 포함될 수 있습니다.
+
+    Returns:
+        tuple: (유효한 세트의 마스크 배열(uint64), 항목별 오류 메시지 리스트(유효하면 None))
+    """
+    errors = [None] * len(items)
+    rows = np.zeros((len(items), 6), dtype=np.int64)
+    shaped = np.zeros(len(items), dtype=bool)
+    for i, numbers in enumerate(items):
+        if (
+            isinstance(numbers, list) and len(numbers) == 6
+            and all(isinstance(n, int) and not isinstance(n, bool) for n in numbers)
+        ):
+            if all(-2**31 < n < 2**31 for n in numbers): # 배열에 담을 수 없는 큰 정수는 범위 오류로 처리합니다.
+                rows[i] = numbers
+            shaped[i] = True
+        else:
+            errors[i] = "각 로또 번호 세트는 6개의 숫자로 이루어진 리스트여야 합니다."
+
+    in_range = shaped & ((rows >= 1) & (rows <= 45)).all(axis=1)
+    for i in np.flatnonzero(shaped & ~in_range):
+        errors[i] = "로또 번호는 1에서 45 사이의 정수여야 합니다."
+
+    masks = np.zeros(len(items), dtype=np.uint64)
+    masks[in_range] = number_masks(rows[in_range])
+    # 중복 번호가 있으면 마스크의 비트 수가 6보다 작습니다.
+    distinct = popcount(masks) == 6
+    for i in np.flatnonzero(in_range & ~distinct):
+        errors[i] = "로또 번호는 중복될 수 없습니다."
+
+    return masks, errors
+
+
+def _mask_to_numbers(mask: int):
+    """비트마스크를 오름차순 번호 리스트로 변환합니다."""
+    return [n for n in range(1, 46) if mask >> (n - 1) & 1]
+
+
+def _bulk_add_numbers(model, user, items: list, existing_qs, extra_fields: dict, restore_deleted: bool = False):
+    """
+    번호 세트들을 부분 성공 방식으로 한 번에 저장합니다.
+    - 배치 안의 같은 조합은 처음 나온 것만 저장합니다. (duplicate)
+    - 이미 저장된 조합은 한 번의 mask IN 쿼리로 찾아 건너뜁니다. (exists)
+    - restore_deleted가 True이면 삭제 처리된 조합은 새로 만들지 않고 되살립니다. (restored)
+
+    같은 사용자의 일괄 저장이 동시에 들어와도 중복 저장되지 않도록 사용자 행을 잠근 뒤 확인/저장합니다.
+    잠그지 않는 경로(단건 저장 등)와 겹쳐 UniqueConstraint에 걸리면 항목별로 다시 저장하여,
+    실제로 저장된 항목만 created로 보고합니다.
+
+    Returns:
+        dict: {'summary': {상태: 개수}, 'items': [{'index', 'numbers', 'status', ('message')}, ...]}
+              status는 created, restored, duplicate, exists, invalid 중 하나입니다.
+    """
+    if len(items) > BULK_MAX_NUMBERS:
+        raise ValidationError(f"한 번에 최대 {BULK_MAX_NUMBERS}개의 번호 세트만 저장할 수 있습니다.")
+
+    masks, errors = _validate_number_sets(items)
+    valid_masks = {int(masks[i]) for i in range(len(items)) if errors[i] is None}
+
+    with transaction.atomic():
+        User.objects.select_for_update().filter(pk=user.pk).exists() # 같은 사용자의 일괄 저장을 순서대로 처리합니다.
+        existing = dict(existing_qs.filter(mask__in=list(valid_masks)).values_list('mask', 'deleted')) if valid_masks else {}
+
+        results = []
+        seen = set()
+        to_create = []
+        to_restore = []
+        for i, numbers in enumerate(items):
+            if errors[i] is not None:
+                results.append({'index': i, 'numbers': numbers, 'status': 'invalid', 'message': errors[i]})
+                continue
+            mask = int(masks[i])
+            sorted_numbers = _mask_to_numbers(mask)
+            result = {'index': i, 'numbers': sorted_numbers}
+            if mask in seen:
+                result['status'] = 'duplicate'
+            elif mask in existing and restore_deleted and existing[mask]:
+                result['status'] = 'restored'
+                to_restore.append(mask)
+            elif mask in existing:
+                result['status'] = 'exists'
+            else:
+                result['status'] = 'created'
+                to_create.append((result, model(
+                    user=user,
+                    number1=sorted_numbers[0],
+                    number2=sorted_numbers[1],
+                    number3=sorted_numbers[2],
+                    number4=sorted_numbers[3],
+                    number5=sorted_numbers[4],
+                    number6=sorted_numbers[5],
+                    mask=mask,
+                    **extra_fields,
+                )))
+            seen.add(mask)
+            results.append(result)
+
+        if to_restore:
+            existing_qs.filter(mask__in=to_restore, deleted=True).update(deleted=False)
+        try:
+            with transaction.atomic():
+                model.objects.bulk_create([obj for _, obj in to_create], batch_size=BULK_BATCH_SIZE)
+        except IntegrityError:
+            # 잠그지 않는 경로에서 같은 조합이 먼저 저장된 경우: 항목별로 저장하고 충돌한 항목은 exists로 보고합니다.
+            for result, obj in to_create:
+                try:
+                    with transaction.atomic():
+                        obj.save(force_insert=True)
+                except IntegrityError:
+                    result['status'] = 'exists'
+        created = [obj for result, obj in to_create if result['status'] == 'created']
+        if model is PurchasedNumber:
+            popularity.change_counts('purchased', [(n.rid, n.mask) for n in created])
+
+    summary = {'created': 0, 'restored': 0, 'duplicate': 0, 'exists': 0, 'invalid': 0}
+    for result in results:
+        summary[result['status']] += 1
+    return {'summary': summary, 'items': results}
+
+
+def bulk_add_user_numbers(uid: str, items: list):
+    """
+    주어진 UID를 가진 사용자의 로또 번호를 일괄 저장합니다. (부분 성공, _bulk_add_numbers 참고)
+    삭제 처리된 번호도 UniqueConstraint에 포함되므로 새로 만들지 않고 삭제 표시를 해제합니다. (restored)
+
+    Args:
+        uid (str): 로또 번호를 저장할 사용자의 고유 ID.
+        items (list): 번호 세트들의 리스트.
+
+    Returns:
+        dict: 상태별 개수(summary)와 항목별 결과(items).
+
+    Raises:
+        User.DoesNotExist: 해당 UID를 가진 사용자가 없을 경우.
+        ValidationError: 번호 세트가 너무 많을 경우.
+    """
+    try:
+        user = User.objects.get(uid=uid)
+    except User.DoesNotExist:
+        raise User.DoesNotExist(f"UID '{uid}'를 가진 사용자를 찾을 수 없습니다.")
+
+    return _bulk_add_numbers(UserNumber, user, items, UserNumber.objects.filter(user=user), {}, restore_deleted=True)
+
+
+def bulk_add_purchased_numbers(uid: str, items: list):
+    """
+    주어진 UID를 가진 사용자의 다음 회차 구매 번호를 일괄 저장합니다. (부분 성공, _bulk_add_numbers 참고)
+    같은 회차에 이미 저장된(삭제되지 않은) 조합은 건너뜁니다.
+
+    Args:
+        uid (str): 구매 번호를 저장할 사용자의 고유 ID.
+        items (list): 번호 세트들의 리스트.
+
+    Returns:
+        dict: 회차(rid), 상태별 개수(summary)와 항목별 결과(items).
+
+    Raises:
+        User.DoesNotExist: 해당 UID를 가진 사용자가 없을 경우.
+        ValidationError: 번호 세트가 너무 많을 경우.
+    """
+    try:
+        user = User.objects.get(uid=uid)
+    except User.DoesNotExist:
+        raise User.DoesNotExist(f"UID '{uid}'를 가진 사용자를 찾을 수 없습니다.")
+
+    last_round = get_last_round()
+    rid = (last_round.rid + 1) if last_round else 1
+
+    existing_qs = PurchasedNumber.objects.filter(user=user, rid=rid, deleted=False)
+    result = _bulk_add_numbers(PurchasedNumber, user, items, existing_qs, {'rid': rid})
+    return {'rid': rid, **result}
+
+
 def add_shared_number(uid: str, rid: int, numbers: list[int], description: str):
     """
     주어진 정보를 바탕으로 공유 번호를 생성하고 저장합니다.
@@ -517,23 +908,28 @@ def add_shared_number(uid: str, rid: int, numbers: list[int], description: str):
     sorted_numbers = sorted(numbers)
     # get_or_create를 사용하여 중복 생성을 방지합니다.
     # UniqueConstraint에 명시된 모든 필드를 기준으로 조회합니다.
-    shared_number, created = SharedNumber.objects.get_or_create(
-        user=user,
-        rid=rid,
-        number1=sorted_numbers[0],
-        number2=sorted_numbers[1],
-        number3=sorted_numbers[2],
-        number4=sorted_numbers[3],
-        number5=sorted_numbers[4],
-        number6=sorted_numbers[5],
-        defaults={
-            'description': description.strip()
-        }
-    )
+    with transaction.atomic():
+        shared_number, created = SharedNumber.objects.get_or_create(
+            user=user,
+            rid=rid,
+            number1=sorted_numbers[0],
+            number2=sorted_numbers[1],
+            number3=sorted_numbers[2],
+            number4=sorted_numbers[3],
+            number5=sorted_numbers[4],
+            number6=sorted_numbers[5],
+            defaults={
+                'description': description.strip(),
+                'mask': number_mask(sorted_numbers),
+            }
+        )
+
+        # 이미 존재하는 번호 조합이라면 ValidationError를 발생시킵니다.
+        if not created:
+            raise ValidationError(f"{rid}회차에 이미 공유한 번호 조합입니다.")
 
-    # 이미 존재하는 번호 조합이라면 ValidationError를 발생시킵니다.
-    if not created:
-        raise ValidationError(f"{rid}회차에 이미 공유한 번호 조합입니다.")
+        # 조합별 집계에 반영합니다.
+        popularity.change_counts('shared', [(rid, shared_number.mask)])
 
     return shared_number
 
@@ -559,16 +955,17 @@ def del_shared_numbers(uid: str, numbers_list: list[list[int]]):
     except User.DoesNotExist:
         raise User.DoesNotExist(f"UID '{uid}'를 가진 사용자를 찾을 수 없습니다.")
 
-    q_objects = Q()
-    for numbers in numbers_list:
-        if not isinstance(numbers, list) or len(numbers) != 6:
-            raise ValidationError("각 로또 번호 세트는 6개의 숫자로 이루어진 리스트여야 합니다.")
-        
-        sorted_numbers = sorted(numbers)
-        q_objects |= Q(number1=sorted_numbers[0], number2=sorted_numbers[1], number3=sorted_numbers[2], number4=sorted_numbers[3], number5=sorted_numbers[4], number6=sorted_numbers[5])
+    masks = _numbers_list_masks(numbers_list)
 
-    # 사용자의 번호 중, 삭제 요청된 번호 조합과 일치하고 아직 삭제되지 않은 번호들을 업데이트합니다.
-    updated_count = SharedNumber.objects.filter(user=user, deleted=False).filter(q_objects).update(deleted=True)
+    # 사용자의 번호 중, 삭제 요청된 번호 조합과 일치하고 아직 삭제되지 않은 번호들을 업데이트합니다. ((user, mask) 인덱스 사용)
+    with transaction.atomic():
+        # 조합별 집계를 줄이기 위해 삭제할 번호의 (회차, 마스크)를 잠그고 가져옵니다.
+        targets = list(
+            SharedNumber.objects.select_for_update()
+            .filter(user=user, deleted=False, mask__in=masks).values_list('id', 'rid', 'mask')
+        )
+        updated_count = SharedNumber.objects.filter(id__in=[t[0] for t in targets]).update(deleted=True)
+        popularity.change_counts('shared', [(rid, mask) for _, rid, mask in targets], sign=-1)
     return updated_count
 
 
@@ -599,6 +996,245 @@ def get_top_shared_numbers():
     ).select_related('user').order_by('result', '-rid')
 
 
+def get_same_shared_numbers(rid: int, numbers: list[int]):
+    """
+    주어진 회차에 같은 번호 조합을 공유한 번호 목록을 조회합니다. ((rid, mask) 인덱스 사용)
+
+    Args:
+        rid (int): 로또 회차.
+        numbers (list[int]): 1에서 45 사이의 중복 없는 6개의 로또 번호 리스트.
+
+    Returns:
+        QuerySet: SharedNumber 모델의 QuerySet. 먼저 공유한 순서로 정렬됩니다.
+
+    Raises:
+        ValidationError: 로또 번호가 유효하지 않을 경우.
+    """
+    if not isinstance(numbers, list) or len(numbers) != 6 or len(set(numbers)) != 6:
+        raise ValidationError("로또 번호는 중복 없는 6개의 숫자로 이루어진 리스트여야 합니다.")
+    for num in numbers:
+        if not isinstance(num, int) or not (1 <= num <= 45):
+            raise ValidationError("로또 번호는 1에서 45 사이의 정수여야 합니다.")
+
+    return SharedNumber.objects.filter(
+        rid=rid, mask=number_mask(numbers), deleted=False
+    ).select_related('user').order_by('created_at', 'id')
+
+
+HOT_COMBINATIONS_MAX_LIMIT = 100 # 인기 조합 조회 시 최대 개수
+
+
+def get_hot_combinations(rid: int = None, kind: str = 'total', limit: int = 10):
+    """
+    회차별로 가장 많이 공유/구매된 번호 조합을 조회합니다. (조합별 집계 테이블에서 상위 limit개만 읽습니다.)
+
+    Args:
+        rid (int, optional): 로또 회차. Defaults to None (다음 회차).
+        kind (str, optional): 정렬 기준 ('total', 'shared', 'purchased'). Defaults to 'total'.
+        limit (int, optional): 최대 개수 (HOT_COMBINATIONS_MAX_LIMIT 이하). Defaults to 10.
+
+    Returns:
+        dict: {'rid': 회차, 'items': [{'numbers', 'shared', 'purchased', 'total'}, ...]}
+
+    Raises:
+        ValidationError: kind 또는 limit이 유효하지 않을 경우.
+    """
+    if kind not in ('total', 'shared', 'purchased'):
+        raise ValidationError("kind는 total, shared, purchased 중 하나여야 합니다.")
+    if limit <= 0:
+        raise ValidationError("limit은 0보다 큰 정수여야 합니다.")
+
+    if rid is None:
+        last_round = get_last_round()
+        rid = (last_round.rid + 1) if last_round else 1
+    items = popularity.get_top(rid, kind, min(limit, HOT_COMBINATIONS_MAX_LIMIT))
+    for item in items:
+        item['numbers'] = _mask_to_numbers(item.pop('mask'))
+    return {'rid': rid, 'items': items}
+
+
+def get_combination_count(rid: int, numbers: list[int]):
+    """
+    회차에 주어진 번호 조합을 공유/구매한 수를 조회합니다.
+
+    Returns:
+        dict: {'rid', 'numbers', 'shared', 'purchased', 'total'}
+
+    Raises:
+        ValidationError: 로또 번호가 유효하지 않을 경우.
+    """
+    masks, errors = _validate_number_sets([numbers])
+    if errors[0]:
+        raise ValidationError(errors[0])
+    mask = int(masks[0])
+    return {'rid': rid, 'numbers': _mask_to_numbers(mask), **popularity.get_count(rid, mask)}
+
+
+NUMBER_STATS_MAX_LIMIT = 100 # 번호 통계의 동반 출현 쌍/3개 조합 최대 개수
+
+
+def get_number_stats(from_rid: int = None, to_rid: int = None, limit: int = 10):
+    """
+    회차 구간의 번호별 출현 통계를 조회합니다. (메모리에 캐시된 번호 행렬의 누적합으로 계산합니다.)
+
+    Args:
+        from_rid (int, optional): 시작 회차 (포함). Defaults to None (첫 회차).
+        to_rid (int, optional): 끝 회차 (포함). Defaults to None (마지막 회차).
+        limit (int, optional): 동반 출현 쌍/3개 조합 개수 (NUMBER_STATS_MAX_LIMIT 이하). Defaults to 10.
+
+    Returns:
+        dict: {'from_rid', 'to_rid', 'rounds', 'numbers': [{'number', 'count', 'bonus_count', 'last_rid', 'gap', 'hit_streak'}, ...],
+               'hot', 'cold', 'pairs': [{'numbers', 'count'}, ...], 'triples': [...]}
+
+    Raises:
+        ValidationError: 회차 구간 또는 limit이 유효하지 않을 경우.
+    """
+    if from_rid is not None and to_rid is not None and from_rid > to_rid:
+        raise ValidationError("from_rid는 to_rid보다 클 수 없습니다.")
+    if limit <= 0:
+        raise ValidationError("limit은 0보다 큰 정수여야 합니다.")
+    return number_stats.query(from_rid, to_rid, min(limit, NUMBER_STATS_MAX_LIMIT))
+
+
+BACKTEST_MAX_SETS = 100 # 백테스트 한 번에 채점할 수 있는 최대 번호 세트 수
+
+
+def backtest_numbers(numbers_list: list[list[int]], from_rid: int = None, to_rid: int = None):
+    """
+    번호 세트들이 지난 회차들에서 몇 등이었을지 한 번에 채점합니다.
+    모든 회차의 당첨 번호 마스크를 미리 만들어 둔 배열과 (세트 수 x 회차 수) popcount로 계산합니다.
+
+    Args:
+        numbers_list (list[list[int]]): 번호 세트 목록 (BACKTEST_MAX_SETS개 이하).
+        from_rid (int, optional): 시작 회차 (포함). Defaults to None (첫 회차).
+        to_rid (int, optional): 끝 회차 (포함). Defaults to None (마지막 회차).
+
+    Returns:
+        dict: {'from_rid', 'to_rid', 'rids': [회차, ...],
+               'items': [{'numbers', 'ranks': [회차별 등수(0:꽝), ...], 'summary': {'1'~'5', 'none'}, 'winnings'}, ...]}
+
+    Raises:
+        ValidationError: 번호 세트 또는 회차 구간이 유효하지 않을 경우.
+    """
+    if not isinstance(numbers_list, list) or not numbers_list:
+        raise ValidationError("번호 세트 목록이 비어 있거나 올바르지 않습니다.")
+    if len(numbers_list) > BACKTEST_MAX_SETS:
+        raise ValidationError(f"번호 세트는 한 번에 최대 {BACKTEST_MAX_SETS}개까지 채점할 수 있습니다.")
+    if from_rid is not None and to_rid is not None and from_rid > to_rid:
+        raise ValidationError("from_rid는 to_rid보다 클 수 없습니다.")
+
+    masks, errors = _validate_number_sets(numbers_list)
+    for i, error in enumerate(errors):
+        if error:
+            raise ValidationError(f"{i + 1}번째 번호 세트: {error}")
+
+    rids, ranks, winnings = number_stats.backtest(masks, from_rid, to_rid)
+    # 세트별 등수 분포 (0:꽝, 1~5등)
+    counts = np.stack([(ranks == rank).sum(axis=1) for rank in range(6)], axis=1)
+    totals = winnings.sum(axis=1)
+
+    items = []
+    for i, mask in enumerate(masks):
+        summary = {str(rank): int(counts[i, rank]) for rank in range(1, 6)}
+        summary['none'] = int(counts[i, 0])
+        items.append({
+            'numbers': _mask_to_numbers(int(mask)),
+            'ranks': ranks[i].tolist(),
+            'summary': summary,
+            'winnings': int(totals[i]),
+        })
+    return {
+        'from_rid': int(rids[0]) if len(rids) else from_rid,
+        'to_rid': int(rids[-1]) if len(rids) else to_rid,
+        'rids': rids.tolist(),
+        'items': items,
+    }
+
+
+def get_draw_analytics():
+    """
+    추첨 정보(추첨기, 볼세트, 가로/세로, 추첨 순서, 모의추첨 번호) 통계를 조회합니다. (동기화 후 한 번만 계산하여 캐시합니다.)
+
+    Returns:
+        dict: {'rounds', 'machines', 'ballsets', 'garo': [{'value', 'rounds', 'counts', 'hot'}, ...],
+               'practice': {'rounds', 'overlap_counts', 'average_overlap', 'bonus_hits'},
+               'drawing': {'rounds', 'positions': [{'position', 'counts', 'hot', 'mean'}, ...]}}
+    """
+    return draw_analytics.get()
+
+
+RECOMMEND_MAX_COUNT = 100 # 한 번에 추천할 수 있는 최대 번호 세트 수
+
+
+def _validate_number_filter(numbers, name: str):
+    """포함/제외 번호 목록을 검사하여 중복 없는 번호 튜플로 반환합니다."""
+    if numbers is None:
+        return ()
+    if not isinstance(numbers, list) or not all(isinstance(n, int) and not isinstance(n, bool) and 1 <= n <= 45 for n in numbers):
+        raise ValidationError(f"{name}는 1에서 45 사이의 정수 리스트여야 합니다.")
+    return tuple(sorted(set(numbers)))
+
+
+def recommend_numbers(count: int = 5, include: list[int] = None, exclude: list[int] = None, sum_min: int = None, sum_max: int = None,
+                      odd: int = None, exclude_won: bool = False, uid: str = None, seed: int = None):
+    """
+    조건을 만족하는 추천 번호 세트들을 생성합니다.
+    조건별 경우의 수 표로 조건을 만족하는 조합 중에서 균등하게 뽑으므로, 조건이 까다로워도 반복 재시도가 없습니다.
+
+    Args:
+        count (int, optional): 생성할 세트 수 (RECOMMEND_MAX_COUNT 이하). Defaults to 5.
+        include (list[int], optional): 반드시 포함할 번호. Defaults to None.
+        exclude (list[int], optional): 제외할 번호. Defaults to None.
+        sum_min (int, optional): 번호 합 최소값. Defaults to None.
+        sum_max (int, optional): 번호 합 최대값. Defaults to None.
+        odd (int, optional): 홀수 개수 (0~6, 짝수는 6 - odd개). Defaults to None (제한 없음).
+        exclude_won (bool, optional): 지난 1등 당첨 조합 제외 여부. Defaults to False.
+        uid (str, optional): 이 사용자가 저장한 번호 조합(UserNumber)을 제외합니다. Defaults to None.
+        seed (int, optional): 같은 seed와 조건이면 항상 같은 결과를 생성합니다. Defaults to None.
+
+    Returns:
+        dict: {'total': 조건을 만족하는 전체 조합 수, 'items': [[번호 6개], ...]}
+
+    Raises:
+        User.DoesNotExist: 해당 UID를 가진 사용자가 없을 경우.
+        ValidationError: 조건이 유효하지 않거나 조건을 만족하는 조합이 부족할 경우.
+    """
+    if not 1 <= count <= RECOMMEND_MAX_COUNT:
+        raise ValidationError(f"count는 1에서 {RECOMMEND_MAX_COUNT} 사이의 정수여야 합니다.")
+    include = _validate_number_filter(include, 'include')
+    exclude = _validate_number_filter(exclude, 'exclude')
+    if len(include) > 6:
+        raise ValidationError("include는 6개를 넘을 수 없습니다.")
+    if set(include) & set(exclude):
+        raise ValidationError("include와 exclude에 같은 번호가 있습니다.")
+    if odd is not None and not 0 <= odd <= 6:
+        raise ValidationError("odd는 0에서 6 사이의 정수여야 합니다.")
+    sum_min = 0 if sum_min is None else sum_min
+    sum_max = number_generator.SUM_SIZE - 1 if sum_max is None else sum_max
+    if sum_min > sum_max:
+        raise ValidationError("sum_min은 sum_max보다 클 수 없습니다.")
+    if seed is not None and seed < 0:
+        raise ValidationError("seed는 0 이상의 정수여야 합니다.")
+
+    excluded = []
+    if exclude_won:
+        excluded.append(number_stats.get()['matrix'].masks)
+    if uid:
+        try:
+            user = User.objects.get(uid=uid)
+        except User.DoesNotExist:
+            raise User.DoesNotExist(f"UID '{uid}'를 가진 사용자를 찾을 수 없습니다.")
+        user_masks = UserNumber.objects.filter(user=user, deleted=False).values_list('mask', flat=True)
+        excluded.append(np.array(list(user_masks), dtype=np.uint64))
+    excluded_masks = np.concatenate(excluded) if excluded else None
+
+    total = int(number_generator.count_table(include, exclude, sum_min, sum_max, odd)[0, 0, 0, 0])
+    masks = number_generator.generate(count, include, exclude, sum_min, sum_max, odd, excluded_masks, seed)
+    if len(masks) < count:
+        raise ValidationError("조건을 만족하는 번호 조합이 부족합니다.")
+    return {'total': total, 'items': number_generator.masks_to_numbers(masks)}
+
+
 def get_top_shared_users():
     """
     당첨 횟수가 많은 순서대로 사용자 목록을 조회합니다.
@@ -610,4 +1246,64 @@ def get_top_shared_users():
     """
     return User.objects.filter(
         Q(matches1__gt=0) | Q(matches2__gt=0) | Q(matches3__gt=0)
-    ).order_by('-matches1', '-matches2', '-matches3')
+    ).order_by('-matches1', '-matches2', '-matches3', 'id')
+
+
+def get_top_shared_users_ranked(offset: int, limit: int):
+    """
+    미리 계산해 둔 사용자 순위(user_leaderboard)에서 한 페이지를 조회합니다.
+
+    Args:
+        offset (int): 건너뛸 사용자 수.
+        limit (int): 가져올 사용자 수.
+
+    Returns:
+        tuple: (전체 순위 대상 수, 사용자 딕셔너리 리스트). 각 사용자에는 순위(rank)가 포함됩니다.
+    """
+    ranking = user_leaderboard.get()
+    page = ranking.slice(offset, limit)
+    users_map = {
+        u['id']: u for u in User.objects.filter(id__in=[user_id for user_id, _ in page]).values(
+            'id', 'uid', 'nick', 'matches1', 'matches2', 'matches3', 'created_at'
+        )
+    }
+    items = []
+    for user_id, rank in page:
+        user = users_map.get(user_id)
+        if user:
+            del user['id']
+            user['rank'] = rank
+            items.append(user)
+    return len(ranking), items
+
+
+def get_user_rank(uid: str):
+    """
+    주어진 UID를 가진 사용자의 당첨 순위를 조회합니다.
+
+    Args:
+        uid (str): 순위를 조회할 사용자의 고유 ID.
+
+    Returns:
+        dict: 사용자 정보와 rank(순위, 순위권 밖이면 None), position(순위 배열 위치, 0부터), total(전체 순위 대상 수).
+
+    Raises:
+        User.DoesNotExist: 해당 UID를 가진 사용자가 없을 경우.
+    """
+    try:
+        user = User.objects.get(uid=uid)
+    except User.DoesNotExist:
+        raise User.DoesNotExist(f"UID '{uid}'를 가진 사용자를 찾을 수 없습니다.")
+
+    ranking = user_leaderboard.get()
+    found = ranking.rank_of(user.id)
+    return {
+        'uid': user.uid,
+        'nick': user.nick,
+        'matches1': user.matches1,
+        'matches2': user.matches2,
+        'matches3': user.matches3,
+        'rank': found[0] if found else None,
+        'position': found[1] if found else None,
+        'total': len(ranking),
+    }
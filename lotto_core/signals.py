@@ -0,0 +1,34 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .models import Round
+from .utils.round_snapshot import round_snapshot
+from .utils.number_stats import number_stats
+from .utils.draw_analytics import draw_analytics
+from .utils.grading import request_round
+
+
+@receiver(post_save, sender=Round)
+@receiver(post_delete, sender=Round)
+def invalidate_round_snapshot(sender, instance, **kwargs):
+    """
+    (시그널 핸들러)
+    Round가 저장/삭제되면 미리 직렬화해 둔 전체 회차 스냅샷과 번호 통계/추첨 분석 스냅샷을 무효화합니다.
+    (번호 통계는 새 회차만 추가된 경우 추가된 회차만 이어 붙여 갱신합니다.)
+    """
+    round_snapshot.invalidate()
+    number_stats.invalidate()
+    draw_analytics.invalidate()
+
+
+@receiver(post_save, sender=Round)
+def enqueue_number_grading(sender, instance, created, **kwargs):
+    """
+    (시그널 핸들러)
+    새로운 Round가 생성될 때, 커밋 후 해당 회차의 채점 요청(GradingRequest)만 추가합니다.
+    대상 번호를 청크로 나누고 채점하는 작업은 회차 저장 트랜잭션과 분리되어 스케줄러의 grade_rounds 작업이 처리합니다. (utils/grading.py 참고)
+    """
+    if created:
+        rid = instance.rid
+        transaction.on_commit(lambda: request_round(rid))
@@ -1,3 +1,192 @@
-from django.test import TestCase
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from math import comb
 
-# Create your tests here.
+import numpy as np
+import requests
+from django.test import SimpleTestCase
+
+from .utils import number_generator
+from .utils.crawler import Crawler, TokenBucket
+from .utils.grading import number_mask
+
+
+class NumberGeneratorTests(SimpleTestCase):
+    """utils/number_generator.py: 조건부 번호 생성 (seed를 고정하여 항상 같은 결과로 검사합니다.)"""
+
+    def test_count_table_matches_closed_form(self):
+        table = number_generator.count_table
+        self.assertEqual(table()[0, 0, 0, 0], comb(45, 6))
+        # 1을 포함하고 홀수 3개: 나머지 홀수 22개 중 2개, 짝수 22개 중 3개
+        self.assertEqual(table(include=(1,), odd=3)[0, 0, 0, 0], comb(22, 2) * comb(22, 3))
+        self.assertEqual(table(include=(1,), odd=3)[0, 0, 0, 0], 355740)
+        # 1~10 제외
+        self.assertEqual(table(exclude=tuple(range(1, 11)))[0, 0, 0, 0], comb(35, 6))
+        # 합이 21인 조합은 1~6 하나뿐입니다.
+        self.assertEqual(table(sum_min=21, sum_max=21)[0, 0, 0, 0], 1)
+
+    def test_generated_sets_satisfy_constraints(self):
+        include = (7, 12)
+        exclude = (1, 2, 3, 44, 45)
+        excluded_sets = [[7, 12, 20, 25, 30, 35], [4, 7, 12, 21, 33, 40]]
+        excluded_masks = np.array([number_mask(s) for s in excluded_sets], dtype=np.uint64)
+
+        masks = number_generator.generate(
+            200, include=include, exclude=exclude, sum_min=100, sum_max=160, odd=3,
+            excluded_masks=excluded_masks, seed=1234,
+        )
+        self.assertEqual(len(masks), 200)
+        self.assertEqual(len(set(masks.tolist())), 200)
+        self.assertFalse(np.isin(masks, excluded_masks).any())
+
+        for numbers in number_generator.masks_to_numbers(masks):
+            self.assertEqual(len(numbers), 6)
+            self.assertTrue(set(include) <= set(numbers))
+            self.assertFalse(set(exclude) & set(numbers))
+            self.assertTrue(100 <= sum(numbers) <= 160)
+            self.assertEqual(sum(n % 2 for n in numbers), 3)
+
+    def test_same_seed_gives_same_sets(self):
+        options = {'include': (5,), 'sum_min': 90, 'sum_max': 180, 'seed': 42}
+        first = number_generator.generate(50, **options)
+        second = number_generator.generate(50, **options)
+        other = number_generator.generate(50, **{**options, 'seed': 43})
+        np.testing.assert_array_equal(first, second)
+        self.assertFalse(np.array_equal(first, other))
+
+    def test_small_feasible_space_returns_all_combinations(self):
+        # 1~7 중 6개(7가지)만 가능하면, 더 많이 요청해도 서로 다른 7개만 반환합니다.
+        masks = number_generator.generate(20, exclude=tuple(range(8, 46)), seed=0)
+        self.assertEqual(len(masks), 7)
+        self.assertEqual(len(set(masks.tolist())), 7)
+
+
+class _FakeHandler(BaseHTTPRequestHandler):
+    """
+    테스트용 가짜 서버.
+    - /slow/<n>: (10 - n) * 10ms 후 n을 응답합니다. (나중 요청이 먼저 끝나도록)
+    - /flaky: 처음 두 번은 503, 그 다음부터 200을 응답합니다.
+    - /missing: 404를 응답합니다.
+    """
+    hits = {}
+    lock = threading.Lock()
+
+    def do_GET(self):
+        with self.lock:
+            self.hits[self.path] = self.hits.get(self.path, 0) + 1
+            count = self.hits[self.path]
+        if self.path.startswith('/slow/'):
+            n = int(self.path.rsplit('/', 1)[1])
+            time.sleep((10 - n) * 0.01)
+            self._respond(200, str(n))
+        elif self.path == '/flaky':
+            self._respond(503 if count <= 2 else 200, 'ok')
+        else:
+            self._respond(404, 'missing')
+
+    def _respond(self, status, body):
+        data = body.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+class CrawlerTests(SimpleTestCase):
+    """utils/crawler.py: 로컬 가짜 서버로 순서 보존, 재시도, 속도 제한을 검사합니다."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), _FakeHandler)
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+        cls.url = f'http://127.0.0.1:{cls.server.server_address[1]}'
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        _FakeHandler.hits.clear()
+        self.waits = []
+
+    def _crawler(self, **kwargs):
+        options = {'rate': 1000, 'burst': 100, 'workers': 4, 'sleep': self.waits.append}
+        options.update(kwargs)
+        return Crawler(**options)
+
+    def test_map_preserves_input_order(self):
+        crawler = self._crawler()
+        try:
+            results = crawler.map(lambda n: crawler.get(f'{self.url}/slow/{n}').text, range(10))
+        finally:
+            crawler.close()
+        self.assertEqual(results, [str(n) for n in range(10)])
+
+    def test_retries_5xx_with_backoff(self):
+        crawler = self._crawler(max_retries=3, backoff_base=0.5, backoff_max=10)
+        try:
+            response = crawler.get(f'{self.url}/flaky')
+        finally:
+            crawler.close()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(_FakeHandler.hits['/flaky'], 3)
+        # 실패 두 번에 대해 full jitter 백오프: 0 ~ 0.5 * 2^시도
+        self.assertEqual(len(self.waits), 2)
+        self.assertTrue(0 <= self.waits[0] <= 0.5)
+        self.assertTrue(0 <= self.waits[1] <= 1.0)
+
+    def test_gives_up_after_max_retries(self):
+        crawler = self._crawler(max_retries=2, backoff_base=0.1)
+        try:
+            with self.assertRaises(requests.exceptions.HTTPError):
+                crawler.get(f'{self.url}/flaky')
+        finally:
+            crawler.close()
+        self.assertEqual(_FakeHandler.hits['/flaky'], 2)
+
+    def test_does_not_retry_other_errors(self):
+        crawler = self._crawler()
+        try:
+            with self.assertRaises(requests.exceptions.HTTPError):
+                crawler.get(f'{self.url}/missing')
+        finally:
+            crawler.close()
+        self.assertEqual(_FakeHandler.hits['/missing'], 1)
+        self.assertEqual(self.waits, [])
+
+    def test_token_bucket_limits_rate(self):
+        clock = [0.0]
+
+        def sleep(seconds):
+            clock[0] += seconds
+
+        # 가짜 시계가 부동소수 오차 없이 움직이도록 2의 거듭제곱 속도를 사용합니다.
+        bucket = TokenBucket(rate=4, capacity=2, clock=lambda: clock[0], sleep=sleep)
+        for _ in range(10):
+            bucket.acquire()
+        # 처음 2개는 바로, 나머지 8개는 초당 4개씩: 2초
+        self.assertEqual(clock[0], 2.0)
+
+    def test_crawler_requests_respect_rate_limit(self):
+        clock = [0.0]
+
+        def sleep(seconds):
+            clock[0] += seconds
+
+        crawler = self._crawler(workers=1)
+        crawler.limiter = TokenBucket(rate=8, capacity=1, clock=lambda: clock[0], sleep=sleep)
+        try:
+            crawler.map(lambda n: crawler.get(f'{self.url}/slow/9'), range(5))
+        finally:
+            crawler.close()
+        # 첫 요청은 바로, 나머지 4개는 초당 8개씩: 0.5초
+        self.assertEqual(_FakeHandler.hits['/slow/9'], 5)
+        self.assertEqual(clock[0], 0.5)
@@ -7,17 +7,18 @@ urlpatterns = [
     path('db/updated', views.get_db_updated, name='get_db_updated'), # GET
 
     # ROUND
-    path('rounds/all', views.get_all_rounds, name='get_all_rounds'), # GET
+    path('rounds/all', views.get_all_rounds, name='get_all_rounds'), # GET ? (format=json|columns|binary)
+    path('rounds/since', views.get_rounds_since, name='get_rounds_since'), # GET ? (since_rid=XX) & (since=XX)
     path('rounds/last', views.get_last_round, name='get_last_round'), # GET
     path('round/get', views.get_round, name='get_round'), # GET ? rid=XX # TEST
 
     # STORE
-    path('regions', views.get_regions, name='get_regions'), # GET ? (addr1=XX) & (addr2=XX)
-    path('stores/region', views.get_stores_by_region, name='get_stores_by_region'), # GET ? (addr1=XX) & (addr2=XX) & (addr3=XX) & page=XX & (size=XX)
-    path('stores/nearby', views.get_nearby_stores, name='get_nearby_stores'), # GET ? geo_e=XX & geo_n=XX
+    path('regions', views.get_regions, name='get_regions'), # GET ? (addr1=XX) & (addr2=XX) & (tree=1)
+    path('stores/region', views.get_stores_by_region, name='get_stores_by_region'), # GET ? (addr1=XX) & (addr2=XX) & (addr3=XX) & page=XX & (size=XX) | after_sid=XX & size=XX
+    path('stores/nearby', views.get_nearby_stores, name='get_nearby_stores'), # GET ? geo_e=XX & geo_n=XX & (radius_m=XX) & (limit=XX) & (cursor=XX) & (lucky=1)
     path('stores/round', views.get_round_stores, name='get_round_stores'), # GET ? rid=XX
-    path('stores/top', views.get_top_stores, name='get_top_stores'), # GET ? page=XX & (size=XX)
-    path('store', views.get_store, name='get_store'), # GET ? sid=XX # TEST
+    path('stores/top', views.get_top_stores, name='get_top_stores'), # GET ? page=XX & (size=XX) | after=XX & size=XX
+    path('store', views.get_store, name='get_store'), # GET ? sid=XX & (detail=1) # TEST
 
     # USER
     path('user/register', views.register_user, name='register_user'), # POST
@@ -25,18 +26,32 @@ urlpatterns = [
 
     # USER NUMBER
     path('numbers/user/add', views.add_user_numbers, name='add_user_numbers'), # POST ? uid=XX & numbers=[[1,2,3,4,5,6],..]
+    path('numbers/user/bulk', views.bulk_add_user_numbers, name='bulk_add_user_numbers'), # POST {uid, numbers:[[..],..]} | NDJSON ? uid=XX
     path('numbers/user/del', views.del_user_numbers, name='del_user_numbers'), # POST ? uid=XX & numbers=[[1,2,3,4,5,6],..]
-    path('numbers/user/get', views.get_user_numbers, name='get_user_numbers'), # GET ? uid=XX & page=XX & (size=XX)
+    path('numbers/user/get', views.get_user_numbers, name='get_user_numbers'), # GET ? uid=XX & page=XX & (size=XX) | cursor=XX & size=XX
 
     # PURCHASED NUMBER
     path('numbers/purchased/add', views.add_purchased_numbers, name='add_purchased_numbers'), # POST ? uid=XX & numbers=[[1,2,3,4,5,6],..]
+    path('numbers/purchased/bulk', views.bulk_add_purchased_numbers, name='bulk_add_purchased_numbers'), # POST {uid, numbers:[[..],..]} | NDJSON ? uid=XX
     path('numbers/purchased/del', views.del_purchased_numbers, name='del_purchased_numbers'), # POST ? uid=XX & numbers=[[1,2,3,4,5,6],..]
-    path('numbers/purchased/get', views.get_purchased_numbers, name='get_purchased_numbers'), # GET ? uid=XX & page=XX & (size=XX)
+    path('numbers/purchased/get', views.get_purchased_numbers, name='get_purchased_numbers'), # GET ? uid=XX & page=XX & (size=XX) | cursor=XX & size=XX
 
     # SHARED NUMBER
     path('number/shared/add', views.add_shared_number, name='add_shared_number'), # POST ? uid=XX & numbers=[1,2,3,4,5,6] & description=XX
     path('numbers/shared/del', views.del_shared_numbers, name='del_shared_numbers'), # POST ? uid=XX & numbers=[[1,2,3,4,5,6],..]
-    path('numbers/shared/get', views.get_shared_numbers, name='get_shared_numbers'), # GET ? (uid=XX) & page=XX & (size=XX)
-    path('numbers/shared/top', views.get_top_shared_numbers, name='get_top_shared_numbers'), # GET ? page=XX & size=XX
-    path('users/shared/top', views.get_top_shared_users, name='get_top_shared_users'), # GET ? page=XX & size=XX
+    path('numbers/shared/get', views.get_shared_numbers, name='get_shared_numbers'), # GET ? (uid=XX) & page=XX & (size=XX) | cursor=XX & size=XX
+    path('numbers/shared/top', views.get_top_shared_numbers, name='get_top_shared_numbers'), # GET ? page=XX & (size=XX) | cursor=XX & size=XX
+    path('numbers/shared/same', views.get_same_shared_numbers, name='get_same_shared_numbers'), # GET ? rid=XX & numbers=[1,2,3,4,5,6]
+    path('numbers/hot', views.get_hot_combinations, name='get_hot_combinations'), # GET ? (rid=XX) & (kind=total|shared|purchased) & (limit=XX)
+    path('numbers/count', views.get_combination_count, name='get_combination_count'), # GET ? rid=XX & numbers=[1,2,3,4,5,6]
+    path('users/shared/top', views.get_top_shared_users, name='get_top_shared_users'), # GET ? page=XX & (size=XX) | cursor=XX & size=XX
+    path('users/shared/rank', views.get_user_rank, name='get_user_rank'), # GET ? uid=XX
+
+    # STATS
+    path('stats/numbers', views.get_number_stats, name='get_number_stats'), # GET ? (from_rid=XX) & (to_rid=XX) & (limit=XX)
+    path('stats/backtest', views.backtest_numbers, name='backtest_numbers'), # GET ? numbers=[[1,2,3,4,5,6],..] & (from_rid=XX) & (to_rid=XX)
+    path('stats/draws', views.get_draw_analytics, name='get_draw_analytics'), # GET
+
+    # RECOMMEND
+    path('numbers/recommend', views.recommend_numbers, name='recommend_numbers'), # GET ? (count=XX) & (include=[..]) & (exclude=[..]) & (sum_min=XX) & (sum_max=XX) & (odd=XX) & (exclude_won=1) & (uid=XX) & (seed=XX)
 ]
@@ -0,0 +1,118 @@
+# crawler.py
+
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from requests.adapters import HTTPAdapter
+
+REQUEST_RATE = 1.0 # 초당 허용 요청 수 (모든 작업자 합계)
+REQUEST_BURST = 2 # 한꺼번에 보낼 수 있는 최대 요청 수 (토큰 버킷 크기)
+CRAWL_WORKERS = 4 # 동시에 요청을 보내는 작업자(스레드) 수
+MAX_RETRIES = 3 # 요청당 최대 시도 횟수
+BACKOFF_BASE = 2.0 # 재시도 대기 시간 기준 (초). 시도마다 두 배씩 늘어납니다.
+BACKOFF_MAX = 60.0 # 재시도 대기 시간 상한 (초)
+RETRY_STATUS = {429, 500, 502, 503, 504} # 재시도할 HTTP 상태 코드
+
+
+class TokenBucket:
+    """
+    여러 스레드가 함께 쓰는 토큰 버킷 속도 제한기.
+    초당 rate개씩 토큰이 채워지고(최대 capacity개), acquire()는 토큰이 생길 때까지 기다렸다가 하나를 가져갑니다.
+    """
+
+    def __init__(self, rate=REQUEST_RATE, capacity=REQUEST_BURST, clock=time.monotonic, sleep=time.sleep):
+        self.rate = rate
+        self.capacity = capacity
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = float(capacity)
+        self._updated_at = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = self._clock()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+                self._updated_at = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            self._sleep(wait)
+
+
+class Crawler:
+    """
+    동시 요청 수와 초당 요청 수를 제한하는 크롤러.
+
+    - 모든 요청은 하나의 requests.Session(연결 풀 크기 = 작업자 수)을 함께 사용합니다.
+    - 요청 전에 토큰 버킷(TokenBucket)에서 토큰을 받으므로, 작업자 수와 관계없이 전체 요청 속도가 rate를 넘지 않습니다.
+    - 연결 오류나 RETRY_STATUS 응답은 지수 백오프 + 지터(0 ~ min(BACKOFF_MAX, BACKOFF_BASE * 2^시도) 사이 임의 시간)로 기다린 뒤 재시도합니다.
+
+    테스트에서는 로컬 가짜 서버 주소와 큰 rate, 작은 backoff_base를 넘겨 사용할 수 있습니다.
+    """
+
+    def __init__(self, rate=REQUEST_RATE, burst=REQUEST_BURST, workers=CRAWL_WORKERS, max_retries=MAX_RETRIES,
+                 backoff_base=BACKOFF_BASE, backoff_max=BACKOFF_MAX, headers=None, session=None, sleep=time.sleep):
+        self.workers = workers
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._sleep = sleep
+        self.limiter = TokenBucket(rate, burst, sleep=sleep)
+
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(workers, 1))
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+        if headers:
+            session.headers.update(headers)
+        self.session = session
+
+    def backoff(self, attempt):
+        """attempt번째(0부터) 실패 후 기다릴 시간 (full jitter)."""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def request(self, method, url, **kwargs):
+        """
+        속도 제한과 재시도를 적용하여 요청을 보내고 응답을 반환합니다.
+        max_retries번 모두 실패하면 마지막 예외를 발생시킵니다.
+        """
+        for attempt in range(self.max_retries):
+            self.limiter.acquire()
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except requests.exceptions.RequestException as e:
+                error = e
+            else:
+                if response.status_code not in RETRY_STATUS:
+                    response.raise_for_status() # 그 외 4xx/5xx는 재시도하지 않습니다.
+                    return response
+                error = requests.exceptions.HTTPError(f"{response.status_code} 응답", response=response)
+
+            if attempt == self.max_retries - 1:
+                raise error
+            wait = self.backoff(attempt)
+            print(f"# Error occurred (attempt {attempt + 1}/{self.max_retries}), {wait:.1f}초 후 재시도: {error}")
+            self._sleep(wait)
+
+    def post(self, url, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def map(self, func, items):
+        """items의 각 항목에 func를 작업자 풀에서 실행하고, 입력 순서대로 결과 리스트를 반환합니다."""
+        items = list(items)
+        if self.workers <= 1 or len(items) <= 1:
+            return [func(item) for item in items]
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            return list(executor.map(func, items))
+
+    def close(self):
+        self.session.close()
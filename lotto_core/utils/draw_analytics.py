@@ -0,0 +1,110 @@
+# draw_analytics.py
+
+import numpy as np
+from django.db.models import Count, Max
+from lotto_core.models import Round
+from lotto_core.utils.snapshot import VersionedSnapshot
+
+NUMBER_COUNT = 45
+NUMBER_FIELDS = ['number1', 'number2', 'number3', 'number4', 'number5', 'number6', 'number7']
+DRAWING_FIELDS = ['drawing1', 'drawing2', 'drawing3', 'drawing4', 'drawing5', 'drawing6', 'drawing7']
+PRACTICE_FIELDS = ['practice1', 'practice2', 'practice3', 'practice4', 'practice5', 'practice6', 'practice7']
+RULE_FIELDS = ['rule_machine', 'rule_ballset', 'rule_garo']
+HOT_COUNT = 6 # 그룹별로 함께 반환할 최다 출현 번호 수
+
+
+def _presence(numbers):
+    """번호 배열(shape: (N, k), 1~45, 0은 빈 값)을 번호별 출현 여부 행렬(bool, shape: (N, 45))로 변환합니다."""
+    present = np.zeros((len(numbers), NUMBER_COUNT + 1), dtype=bool)
+    present[np.arange(len(numbers))[:, None], numbers] = True
+    return present[:, 1:]
+
+
+def _group_stats(keys, main):
+    """
+    추첨 방식 값(keys)별 회차 수, 번호별 출현 횟수, 최다 출현 번호를 계산합니다. (0은 정보 없음으로 제외)
+
+    Returns:
+        list[dict]: [{'value', 'rounds', 'counts': [45개], 'hot': [...]}, ...]
+    """
+    groups = []
+    for value in np.unique(keys[keys > 0]):
+        selected = keys == value
+        counts = main[selected].sum(axis=0)
+        order = np.lexsort((np.arange(NUMBER_COUNT), -counts))[:HOT_COUNT]
+        groups.append({
+            'value': int(value),
+            'rounds': int(selected.sum()),
+            'counts': counts.tolist(),
+            'hot': (order + 1).tolist(),
+        })
+    return groups
+
+
+def _practice_stats(practice, main, bonus):
+    """
+    모의추첨 번호 7개와 실제 당첨 번호(6개 + 보너스)의 겹치는 개수 분포를 계산합니다.
+    모의추첨 번호가 모두 채워진 회차만 대상으로 합니다.
+    """
+    valid = (practice > 0).all(axis=1)
+    practice_present = _presence(practice[valid])
+    overlap = (practice_present & main[valid]).sum(axis=1)
+    bonus_hits = (practice_present & bonus[valid]).any(axis=1)
+    rounds = int(valid.sum())
+    return {
+        'rounds': rounds,
+        'overlap_counts': np.bincount(overlap, minlength=7).tolist(), # 당첨 번호 6개 중 k개가 모의추첨에 나온 회차 수 (k=0~6)
+        'average_overlap': round(float(overlap.mean()), 4) if rounds else 0.0,
+        'bonus_hits': int(bonus_hits.sum()), # 보너스 번호가 모의추첨에 나온 회차 수
+    }
+
+
+def _position_stats(drawing):
+    """
+    추첨 순서(1~7번째, 7번째는 보너스)별 번호 출현 횟수와 평균 번호를 계산합니다.
+    추첨 순서 정보가 모두 채워진 회차만 대상으로 합니다.
+    """
+    valid = drawing[(drawing > 0).all(axis=1)]
+    positions = []
+    for position in range(drawing.shape[1]):
+        column = valid[:, position]
+        counts = np.bincount(column, minlength=NUMBER_COUNT + 1)[1:]
+        order = np.lexsort((np.arange(NUMBER_COUNT), -counts))[:HOT_COUNT]
+        positions.append({
+            'position': position + 1,
+            'counts': counts.tolist(),
+            'hot': (order + 1).tolist(),
+            'mean': round(float(column.mean()), 4) if len(column) else 0.0,
+        })
+    return {'rounds': len(valid), 'positions': positions}
+
+
+class DrawAnalytics(VersionedSnapshot):
+    """
+    추첨기/볼세트/가로·세로 방식별 번호 출현, 모의추첨 적중, 추첨 순서별 통계 스냅샷.
+    이 값들은 회차/카페 동기화 때만 바뀌므로, 동기화 후 처음 조회할 때 한 번만 배열 연산으로 계산해 둡니다.
+    """
+
+    def get_version(self):
+        agg = Round.objects.aggregate(count=Count('rid'), max_rid=Max('rid'), updated_at=Max('updated_at'))
+        return (agg['count'], agg['max_rid'], agg['updated_at'])
+
+    def build(self, version):
+        rows = list(Round.objects.order_by('rid').values_list(*NUMBER_FIELDS, *DRAWING_FIELDS, *PRACTICE_FIELDS, *RULE_FIELDS))
+        data = np.array(rows, dtype=np.int64).reshape(len(rows), 24)
+        # 범위를 벗어난 값은 정보 없음(0)으로 취급합니다.
+        data[:, :21] = np.where((data[:, :21] >= 1) & (data[:, :21] <= NUMBER_COUNT), data[:, :21], 0)
+        main = _presence(data[:, 0:6])
+        bonus = _presence(data[:, 6:7])
+        machine, ballset, garo = data[:, 21], data[:, 22], data[:, 23]
+        return {
+            'rounds': len(rows),
+            'machines': _group_stats(machine, main),
+            'ballsets': _group_stats(ballset, main),
+            'garo': _group_stats(garo, main),
+            'practice': _practice_stats(data[:, 14:21], main, bonus),
+            'drawing': _position_stats(data[:, 7:14]),
+        }
+
+
+draw_analytics = DrawAnalytics()
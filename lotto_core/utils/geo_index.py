@@ -0,0 +1,147 @@
+# geo_index.py
+
+import heapq
+import math
+from django.db.models import Count, Max, Q
+from lotto_core.models import Store
+from lotto_core.utils.snapshot import VersionedSnapshot
+
+EARTH_RADIUS_M = 6371008.8 # 지구 평균 반지름 (m)
+METERS_PER_DEGREE = math.pi * EARTH_RADIUS_M / 180 # 위도 1도의 길이 (약 111km)
+CELL_SIZE = 0.01 # 격자 한 칸의 크기 (도, 약 1km)
+
+
+def haversine(lat1, lon1, lat2, lon2):
+    """두 좌표 사이의 대원 거리(m)를 반환합니다."""
+    phi1 = math.radians(lat1)
+    phi2 = math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lon2 - lon1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(min(1.0, math.sqrt(a)))
+
+
+class GeoGrid:
+    """
+    위/경도를 CELL_SIZE 단위 격자로 나눈 최근접 이웃 검색용 공간 인덱스.
+    기준점이 속한 칸에서 시작해 바깥쪽 링(ring)으로 넓혀가며 후보를 모으고,
+    아직 보지 않은 링까지의 최소 거리보다 가까운 후보부터 거리순으로 내보냅니다.
+    """
+
+    def __init__(self, points, cell_size=CELL_SIZE):
+        """
+        Args:
+            points (iterable): (key, 위도, 경도) 튜플들.
+            cell_size (float, optional): 격자 한 칸의 크기(도). Defaults to CELL_SIZE.
+        """
+        self.cell_size = cell_size
+        self.cells = {}
+        for key, lat, lon in points:
+            self.cells.setdefault(self._cell(lat, lon), []).append((key, lat, lon))
+        self.size = sum(len(v) for v in self.cells.values())
+        if self.cells:
+            rows = [c[0] for c in self.cells]
+            cols = [c[1] for c in self.cells]
+            self.bounds = (min(rows), max(rows), min(cols), max(cols))
+        else:
+            self.bounds = None
+
+    def __len__(self):
+        return self.size
+
+    def _cell(self, lat, lon):
+        return (math.floor(lat / self.cell_size), math.floor(lon / self.cell_size))
+
+    def _ring(self, row, col, r):
+        """(row, col)에서 체비쇼프 거리가 정확히 r인 칸들 중 인덱스 범위(bounds) 안에 있는 칸들을 반환합니다."""
+        min_row, max_row, min_col, max_col = self.bounds
+        if r == 0:
+            return [(row, col)]
+        cells = []
+        cols = range(max(col - r, min_col), min(col + r, max_col) + 1)
+        for rr in (row - r, row + r):
+            if min_row <= rr <= max_row:
+                cells.extend((rr, c) for c in cols)
+        rows = range(max(row - r + 1, min_row), min(row + r - 1, max_row) + 1)
+        for cc in (col - r, col + r):
+            if min_col <= cc <= max_col:
+                cells.extend((rr, cc) for rr in rows)
+        return cells
+
+    def _min_ring(self, row, col):
+        """(row, col)에서 점이 있을 수 있는 가장 가까운 링 번호 (인덱스 범위까지의 체비쇼프 거리)."""
+        min_row, max_row, min_col, max_col = self.bounds
+        return max(0, min_row - row, row - max_row, min_col - col, col - max_col)
+
+    def _max_ring(self, row, col):
+        min_row, max_row, min_col, max_col = self.bounds
+        return max(abs(row - min_row), abs(row - max_row), abs(col - min_col), abs(col - max_col))
+
+    def _ring_lower_bound(self, lat, r):
+        """링 r+1 이상에 있는 점까지의 거리 하한(m)을 반환합니다."""
+        # 링 r+1 이상의 점은 위도 또는 경도가 최소 r칸 만큼 떨어져 있습니다.
+        # 위도 차이만큼의 거리보다 경도 차이에 의한 거리가 항상 짧으므로 경도 쪽 하한을 사용합니다.
+        # haversine 식에서 cos(위도) 곱을 기준점과 인덱스 범위 중 가장 높은 위도 기준으로 줄여 보수적으로 계산합니다.
+        min_row, max_row = self.bounds[0], self.bounds[1]
+        max_lat = min(90.0, max(abs(lat), abs(min_row * self.cell_size), abs((max_row + 1) * self.cell_size)))
+        d_lambda = math.radians(min(180.0, r * self.cell_size))
+        return 2 * EARTH_RADIUS_M * math.asin(math.cos(math.radians(max_lat)) * math.sin(d_lambda / 2))
+
+    def contains(self, lat, lon, margin=0.0):
+        """좌표가 인덱스 범위(점이 있는 칸들의 경계 상자)에서 margin(도) 이내에 있는지 여부를 반환합니다."""
+        if not self.cells:
+            return False
+        min_row, max_row, min_col, max_col = self.bounds
+        return (min_row * self.cell_size - margin <= lat <= (max_row + 1) * self.cell_size + margin
+                and min_col * self.cell_size - margin <= lon <= (max_col + 1) * self.cell_size + margin)
+
+    def iter_nearest(self, lat, lon):
+        """
+        기준점에서 가까운 순서대로 (거리(m), key, 위도, 경도)를 하나씩 내보내는 제너레이터.
+        필요한 만큼만 소비하면 그만큼의 링만 탐색합니다.
+        인덱스 범위 밖의 빈 링은 건너뛰고, 각 링에서도 범위 안의 칸만 확인합니다.
+        """
+        if not self.cells:
+            return
+        row, col = self._cell(lat, lon)
+        max_ring = self._max_ring(row, col)
+        heap = []
+        for r in range(self._min_ring(row, col), max_ring + 1):
+            for cell in self._ring(row, col, r):
+                for key, p_lat, p_lon in self.cells.get(cell, ()):
+                    heapq.heappush(heap, (haversine(lat, lon, p_lat, p_lon), key, p_lat, p_lon))
+            bound = self._ring_lower_bound(lat, r)
+            while heap and heap[0][0] <= bound:
+                yield heapq.heappop(heap)
+        while heap:
+            yield heapq.heappop(heap)
+
+
+class StoreGeoIndex(VersionedSnapshot):
+    """
+    활성화된 판매점 좌표로 만든 GeoGrid 스냅샷.
+    - 'all': 활성화된 모든 판매점
+    - 'lucky': 1등 당첨 이력(matches1 > 0)이 있는 판매점만 (명당 검색 시 나머지 판매점을 훑지 않도록 따로 둡니다.)
+
+    판매점 정보는 주 2회(sync_store), 당첨 횟수는 주 1회(sync_round)만 바뀌므로,
+    (활성 판매점 수, 1등 배출 판매점 수, 최종 갱신일)을 버전으로 사용합니다.
+    좌표가 없는(0, 0) 판매점은 인덱스에 포함하지 않습니다.
+    """
+
+    def get_version(self):
+        agg = Store.objects.filter(enabled=True).aggregate(
+            count=Count('sid'),
+            lucky=Count('sid', filter=Q(matches1__gt=0)),
+            updated_at=Max('updated_at'),
+        )
+        return (agg['count'], agg['lucky'], agg['updated_at'])
+
+    def build(self, version):
+        stores = Store.objects.filter(enabled=True).exclude(geo_n=0, geo_e=0)
+        return {
+            'all': GeoGrid(stores.values_list('sid', 'geo_n', 'geo_e')),
+            'lucky': GeoGrid(stores.filter(matches1__gt=0).values_list('sid', 'geo_n', 'geo_e')),
+        }
+
+
+store_geo_index = StoreGeoIndex()
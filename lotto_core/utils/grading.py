@@ -0,0 +1,295 @@
+# grading.py
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from django.db import connection, transaction
+from django.db.models import Case, F, IntegerField, Value, When
+from lotto_core.models import GradingChunk, GradingRequest, PurchasedNumber, Round, SharedNumber, User
+
+logger = logging.getLogger(__name__)
+
+GRADE_CHUNK_SIZE = 5000 # 청크 하나에 담을 번호 수
+GRADE_WORKERS = 4 # 청크를 동시에 채점할 작업자(스레드) 수
+NUMBER_FIELDS = ['number1', 'number2', 'number3', 'number4', 'number5', 'number6']
+
+# 채점 대상 모델과 사용자 당첨 횟수(User.matches1~3) 반영 여부
+# (사용자 당첨 횟수는 공유 번호의 당첨만 집계합니다.)
+GRADE_TARGETS = {
+    'SharedNumber': (SharedNumber, True),
+    'PurchasedNumber': (PurchasedNumber, False),
+}
+
+if hasattr(np, 'bitwise_count'):
+    popcount = np.bitwise_count
+else:
+    # NumPy 2.0 미만: 바이트 단위 비트 수 표를 이용합니다.
+    _POPCOUNT_TABLE = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+    def popcount(masks):
+        masks = np.asarray(masks, dtype=np.uint64)
+        counts = _POPCOUNT_TABLE[np.ascontiguousarray(masks.reshape(-1)).view(np.uint8)]
+        return counts.reshape(masks.shape + (8,)).sum(axis=-1, dtype=np.uint8) # 입력 shape을 유지합니다.
+
+
+def number_mask(numbers):
+    """번호 목록을 45비트 마스크로 변환합니다. (번호 n -> n-1번째 비트)"""
+    mask = 0
+    for n in numbers:
+        mask |= 1 << (n - 1)
+    return mask
+
+
+def number_masks(columns):
+    """
+    번호 열 배열(shape: (N, 6))을 45비트 마스크 배열(uint64, shape: (N,))로 변환합니다.
+    """
+    columns = np.asarray(columns, dtype=np.uint64)
+    if columns.size == 0:
+        return np.zeros(0, dtype=np.uint64)
+    return np.bitwise_or.reduce(np.left_shift(np.uint64(1), columns - np.uint64(1)), axis=1)
+
+
+def grade_masks(masks, win_mask, bonus_mask):
+    """
+    번호 마스크 배열을 한 번에 채점합니다.
+
+    당첨/보너스 마스크에 배열을 넘기면 브로드캐스팅되므로, 여러 번호와 여러 회차를 한 번에 채점할 수도 있습니다.
+    (예: masks[:, None]과 회차별 마스크 배열[None, :] -> (번호 수, 회차 수) 결과)
+
+    Args:
+        masks (ndarray): number_masks로 만든 uint64 마스크 배열.
+        win_mask (int | ndarray): 당첨 번호 6개의 마스크.
+        bonus_mask (int | ndarray): 보너스 번호의 마스크.
+
+    Returns:
+        ndarray: 당첨 결과 배열 (0:꽝, 1~5:1~5등).
+    """
+    masks = np.asarray(masks, dtype=np.uint64)
+    matches = popcount(masks & np.asarray(win_mask, dtype=np.uint64)).astype(np.int8)
+    has_bonus = (masks & np.asarray(bonus_mask, dtype=np.uint64)) != 0
+
+    results = np.zeros(matches.shape, dtype=np.int8)
+    results[matches == 3] = 5
+    results[matches == 4] = 4
+    results[matches == 5] = 3
+    results[(matches == 5) & has_bonus] = 2
+    results[matches == 6] = 1
+    return results
+
+
+def round_masks(round_obj):
+    """회차의 (당첨 번호 마스크, 보너스 번호 마스크)를 반환합니다."""
+    win_mask = number_mask(getattr(round_obj, name) for name in NUMBER_FIELDS)
+    return win_mask, number_mask([round_obj.number7])
+
+
+def _grade_rows(model, rows, win_mask, bonus_mask):
+    """
+    읽어 온 (id, user_id, mask) 행들을 채점하고 결과별로 한 번씩 UPDATE 합니다.
+    사용자 당첨 횟수 집계를 위해 1~3등 당첨 행의 (user_id, 결과) 배열을 반환합니다.
+    """
+    data = np.array(rows, dtype=np.int64)
+    ids, user_ids = data[:, 0], data[:, 1]
+    results = grade_masks(data[:, 2].astype(np.uint64), win_mask, bonus_mask)
+
+    # 행마다 UPDATE 하지 않고, 같은 결과를 가진 id들을 모아 결과별로 한 번씩 UPDATE 합니다. (최대 6번)
+    for result in np.unique(results):
+        model.objects.filter(id__in=ids[results == result].tolist()).update(result=int(result))
+
+    winners = (results >= 1) & (results <= 3)
+    return user_ids[winners], results[winners]
+
+
+def apply_user_matches(user_ids, results):
+    """
+    1~3등 당첨 내역을 사용자별로 합산하여, 한 번의 UPDATE 문으로 User.matches1~3에 더합니다.
+
+    Args:
+        user_ids (ndarray): 당첨된 번호의 user_id 배열.
+        results (ndarray): 같은 위치의 당첨 결과(1~3) 배열.
+
+    Returns:
+        int: 당첨 횟수가 바뀐 사용자 수.
+    """
+    if len(user_ids) == 0:
+        return 0
+
+    unique_users, inverse = np.unique(user_ids, return_inverse=True)
+    counts = np.zeros((len(unique_users), 3), dtype=np.int64)
+    np.add.at(counts, (inverse, results.astype(np.int64) - 1), 1)
+
+    updates = {}
+    for i, field in enumerate(['matches1', 'matches2', 'matches3']):
+        whens = [When(id=int(uid), then=Value(int(c))) for uid, c in zip(unique_users, counts[:, i]) if c]
+        if whens:
+            updates[field] = F(field) + Case(*whens, default=Value(0), output_field=IntegerField())
+    return User.objects.filter(id__in=unique_users.tolist()).update(**updates)
+
+
+def request_round(rid):
+    """
+    회차의 채점을 요청합니다. (GradingRequest 한 행만 추가하며, 이미 요청되어 있으면 아무것도 하지 않습니다.)
+    대상 번호를 청크로 나누는 작업은 run_pending이 처리하므로 회차 저장 트랜잭션에서 번호를 읽지 않습니다.
+    """
+    GradingRequest.objects.bulk_create([GradingRequest(rid=rid)], ignore_conflicts=True)
+
+
+def enqueue_requested_rounds(chunk_size=GRADE_CHUNK_SIZE):
+    """
+    채점이 요청된(GradingRequest) 회차의 청크를 등록하고 요청을 지웁니다.
+    회차마다 요청 행을 잠그고(skip_locked) 청크 등록과 요청 삭제를 하나의 트랜잭션으로 처리하므로,
+    여러 프로세스가 동시에 실행해도 같은 회차를 두 번 등록하지 않습니다.
+
+    Returns:
+        int: 새로 등록한 청크 수.
+    """
+    added = 0
+    for rid in GradingRequest.objects.order_by('rid').values_list('rid', flat=True):
+        with transaction.atomic():
+            request = GradingRequest.objects.select_for_update(skip_locked=True).filter(rid=rid).first()
+            if request is None:
+                continue
+            round_obj = Round.objects.filter(rid=rid).first()
+            if round_obj is not None:
+                added += enqueue_round(round_obj, chunk_size)
+            request.delete()
+    return added
+
+
+def enqueue_round(round_obj, chunk_size=GRADE_CHUNK_SIZE):
+    """
+    회차의 아직 채점되지 않은(result=-1) 공유 번호와 구매 번호를 id 범위 청크(GradingChunk)로 나누어 등록합니다.
+    실제 채점은 run_pending이 합니다. 이미 등록된 청크가 있으면 그 이후의 id만 새 청크로 등록합니다.
+
+    Args:
+        round_obj (Round): 채점할 회차.
+        chunk_size (int, optional): 청크 하나에 담을 번호 수. Defaults to GRADE_CHUNK_SIZE.
+
+    Returns:
+        int: 새로 등록한 청크 수.
+    """
+    chunks = []
+    for target, (model, _) in GRADE_TARGETS.items():
+        last_end = (
+            GradingChunk.objects.filter(rid=round_obj.rid, target=target)
+            .order_by('-end_id').values_list('end_id', flat=True).first()
+        ) or 0
+        ids = (
+            model.objects.filter(rid=round_obj.rid, result=-1, id__gt=last_end)
+            .order_by('id').values_list('id', flat=True).iterator(chunk_size=chunk_size)
+        )
+        start_id = end_id = None
+        count = 0
+        for object_id in ids:
+            if start_id is None:
+                start_id = object_id
+            end_id = object_id
+            count += 1
+            if count == chunk_size:
+                chunks.append(GradingChunk(rid=round_obj.rid, target=target, start_id=start_id, end_id=end_id))
+                start_id = None
+                count = 0
+        if start_id is not None:
+            chunks.append(GradingChunk(rid=round_obj.rid, target=target, start_id=start_id, end_id=end_id))
+
+    GradingChunk.objects.bulk_create(chunks)
+    return len(chunks)
+
+
+def grade_chunk(chunk_id, masks=None):
+    """
+    청크 하나를 채점합니다.
+    채점 결과, 사용자 당첨 횟수, 청크 완료 표시를 하나의 트랜잭션으로 저장하므로,
+    중간에 실패하면 모두 취소되어 다시 실행해도 당첨 횟수가 두 번 더해지지 않습니다.
+    다른 작업자가 처리 중인(잠긴) 청크나 이미 끝난 청크는 건너뜁니다.
+
+    Args:
+        chunk_id (int): GradingChunk id.
+        masks (dict, optional): rid -> (당첨 번호 마스크, 보너스 번호 마스크) 캐시. Defaults to None.
+
+    Returns:
+        int: 채점한 번호 수.
+    """
+    with transaction.atomic():
+        chunk = (
+            GradingChunk.objects.select_for_update(skip_locked=True)
+            .filter(id=chunk_id, done=False).first()
+        )
+        if chunk is None:
+            return 0
+
+        if masks is not None and chunk.rid in masks:
+            win_mask, bonus_mask = masks[chunk.rid]
+        else:
+            win_mask, bonus_mask = round_masks(Round.objects.get(rid=chunk.rid))
+
+        model, count_matches = GRADE_TARGETS[chunk.target]
+        rows = list(
+            model.objects.filter(rid=chunk.rid, result=-1, id__gte=chunk.start_id, id__lte=chunk.end_id)
+            .values_list('id', 'user_id', 'mask')
+        )
+        if rows:
+            user_ids, results = _grade_rows(model, rows, win_mask, bonus_mask)
+            if count_matches:
+                apply_user_matches(user_ids, results)
+
+        chunk.done = True
+        chunk.graded = len(rows)
+        chunk.save(update_fields=['done', 'graded', 'updated_at'])
+        return len(rows)
+
+
+def _grade_chunk_worker(chunk_id, masks):
+    """작업자 스레드에서 청크를 채점합니다. 스레드마다 열린 DB 연결은 끝나면 닫습니다."""
+    try:
+        return grade_chunk(chunk_id, masks)
+    except Exception as e:
+        logger.error(f"# 청크({chunk_id}) 채점 중 오류 발생: {e}", exc_info=True)
+        return 0
+    finally:
+        connection.close()
+
+
+def run_pending(rid=None, workers=GRADE_WORKERS):
+    """
+    채점이 요청된 회차의 청크를 먼저 등록한 뒤(enqueue_requested_rounds), 완료되지 않은 채점 청크를 작업자 풀에서 나누어 채점합니다.
+    실패한 청크는 done=False로 남으므로 다음 실행 때 이어서 처리됩니다.
+
+    Args:
+        rid (int, optional): 이 회차의 청크만 처리합니다. Defaults to None (모든 회차).
+        workers (int, optional): 작업자 수. Defaults to GRADE_WORKERS.
+
+    Returns:
+        dict: {'enqueued': 새로 등록한 청크 수, 'chunks': 처리 대상 청크 수, 'graded': 채점한 번호 수, 'remaining': 남은 청크 수}
+    """
+    enqueued = enqueue_requested_rounds()
+    pending = GradingChunk.objects.filter(done=False)
+    if rid is not None:
+        pending = pending.filter(rid=rid)
+    chunk_ids = list(pending.order_by('rid', 'target', 'start_id').values_list('id', flat=True))
+    if not chunk_ids:
+        return {'enqueued': enqueued, 'chunks': 0, 'graded': 0, 'remaining': 0}
+
+    rids = set(pending.values_list('rid', flat=True).distinct())
+    masks = {r.rid: round_masks(r) for r in Round.objects.filter(rid__in=rids)}
+
+    if workers <= 1:
+        graded = sum(grade_chunk(chunk_id, masks) for chunk_id in chunk_ids)
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            graded = sum(executor.map(lambda chunk_id: _grade_chunk_worker(chunk_id, masks), chunk_ids))
+
+    remaining = GradingChunk.objects.filter(id__in=chunk_ids, done=False).count()
+    return {'enqueued': enqueued, 'chunks': len(chunk_ids), 'graded': graded, 'remaining': remaining}
+
+
+def grade_round(round_obj, chunk_size=GRADE_CHUNK_SIZE, workers=1):
+    """
+    회차를 바로 채점합니다. (청크 등록 후 그 회차의 청크를 처리)
+
+    Returns:
+        dict: run_pending의 결과.
+    """
+    enqueue_round(round_obj, chunk_size)
+    return run_pending(rid=round_obj.rid, workers=workers)
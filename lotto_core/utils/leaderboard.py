@@ -0,0 +1,91 @@
+# leaderboard.py
+
+from django.db.models import Count, Max, Q, Sum
+from lotto_core.models import Store, User
+from lotto_core.utils.snapshot import VersionedSnapshot
+
+
+class Ranking:
+    """
+    점수 내림차순으로 정렬된 id 배열과 밀집 순위(dense rank).
+    같은 점수는 같은 순위를 가지며, 다음 점수는 바로 다음 순위가 됩니다. (1, 1, 2, 3, 3, 4 ...)
+    """
+
+    def __init__(self, rows):
+        """
+        Args:
+            rows (iterable): 이미 순위대로 정렬된 (id, 점수 튜플) 목록.
+        """
+        self.ids = []
+        self.scores = []
+        self.ranks = []
+        self.positions = {} # id -> 배열 위치
+        rank = 0
+        prev_score = None
+        for key, score in rows:
+            if score != prev_score:
+                rank += 1
+                prev_score = score
+            self.positions[key] = len(self.ids)
+            self.ids.append(key)
+            self.scores.append(score)
+            self.ranks.append(rank)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def slice(self, offset, limit):
+        """offset부터 limit개의 (id, 순위)를 반환합니다."""
+        end = offset + limit
+        return list(zip(self.ids[offset:end], self.ranks[offset:end]))
+
+    def rank_of(self, key):
+        """id의 (순위, 배열 위치)를 반환합니다. 순위권 밖이면 None을 반환합니다."""
+        position = self.positions.get(key)
+        if position is None:
+            return None
+        return self.ranks[position], position
+
+
+class StoreLeaderboard(VersionedSnapshot):
+    """
+    당첨 판매점 순위 (get_top_stores와 같은 기준: 1등 > 2등 > sid).
+    당첨 횟수는 WinsParser.upload_wins에서만 바뀌므로, (대상 수, 1/2등 합계, 최종 갱신일)을 버전으로 사용합니다.
+    """
+
+    def _queryset(self):
+        return Store.objects.filter(Q(matches1__gt=0) | Q(matches2__gt=0), enabled=True)
+
+    def get_version(self):
+        agg = self._queryset().aggregate(
+            count=Count('sid'), matches1=Sum('matches1'), matches2=Sum('matches2'), updated_at=Max('updated_at')
+        )
+        return (agg['count'], agg['matches1'], agg['matches2'], agg['updated_at'])
+
+    def build(self, version):
+        rows = self._queryset().order_by('-matches1', '-matches2', 'sid').values_list('sid', 'matches1', 'matches2')
+        return Ranking((sid, (m1, m2)) for sid, m1, m2 in rows)
+
+
+class UserLeaderboard(VersionedSnapshot):
+    """
+    공유 번호 당첨 사용자 순위 (get_top_shared_users와 같은 기준: 1등 > 2등 > 3등 > id).
+    당첨 횟수는 공유 번호 채점 시에만 바뀌므로, (대상 수, 1/2/3등 합계)를 버전으로 사용합니다.
+    """
+
+    def _queryset(self):
+        return User.objects.filter(Q(matches1__gt=0) | Q(matches2__gt=0) | Q(matches3__gt=0))
+
+    def get_version(self):
+        agg = self._queryset().aggregate(
+            count=Count('id'), matches1=Sum('matches1'), matches2=Sum('matches2'), matches3=Sum('matches3')
+        )
+        return (agg['count'], agg['matches1'], agg['matches2'], agg['matches3'])
+
+    def build(self, version):
+        rows = self._queryset().order_by('-matches1', '-matches2', '-matches3', 'id').values_list('id', 'matches1', 'matches2', 'matches3')
+        return Ranking((user_id, (m1, m2, m3)) for user_id, m1, m2, m3 in rows)
+
+
+store_leaderboard = StoreLeaderboard()
+user_leaderboard = UserLeaderboard()
@@ -0,0 +1,122 @@
+# number_generator.py
+
+from functools import lru_cache
+import numpy as np
+
+NUMBER_COUNT = 45
+PICK_COUNT = 6
+SUM_SIZE = 256 # 번호 6개 합의 최대값(40+41+...+45=255) + 1
+MAX_RESAMPLE = 10 # 제외 조합/중복에 걸린 세트만 다시 뽑는 최대 횟수
+TABLE_CACHE_SIZE = 8 # 조건별 경우의 수 표를 보관할 최대 개수
+
+
+@lru_cache(maxsize=TABLE_CACHE_SIZE)
+def count_table(include=(), exclude=(), sum_min=0, sum_max=SUM_SIZE - 1, odd=None):
+    """
+    조건을 만족하는 조합의 경우의 수 표를 만듭니다.
+
+    table[i, c, s, o]: 번호 1~i를 보고 c개(합 s, 홀수 o개)를 고른 상태에서, 번호 i+1~45로 조건을 만족하도록
+    나머지를 채우는 경우의 수. table[0, 0, 0, 0]이 조건을 만족하는 전체 조합 수입니다.
+    뒤에서부터 (건너뛰기 + 고르기) 두 경우를 배열 이동으로 더해 가며 계산합니다.
+
+    Args:
+        include (tuple[int]): 반드시 포함할 번호.
+        exclude (tuple[int]): 제외할 번호.
+        sum_min (int): 번호 합 최소값 (포함).
+        sum_max (int): 번호 합 최대값 (포함).
+        odd (int, optional): 홀수 개수 (0~6). None이면 제한하지 않습니다.
+
+    Returns:
+        ndarray: int64 배열 (shape: (46, 7, 256, 7)).
+    """
+    table = np.zeros((NUMBER_COUNT + 1, PICK_COUNT + 1, SUM_SIZE, PICK_COUNT + 1), dtype=np.int64)
+    sums = slice(max(sum_min, 0), min(sum_max, SUM_SIZE - 1) + 1)
+    table[NUMBER_COUNT, PICK_COUNT, sums, slice(None) if odd is None else odd] = 1
+
+    for i in range(NUMBER_COUNT - 1, -1, -1):
+        n = i + 1
+        nxt = table[i + 1]
+        if n not in include: # 건너뛰기
+            table[i] += nxt
+        if n not in exclude: # 고르기: (c, s, o) -> (c + 1, s + n, o + 홀수 여부)
+            d = n % 2
+            table[i, :PICK_COUNT, :SUM_SIZE - n, :PICK_COUNT + 1 - d] += nxt[1:, n:, d:]
+    table.setflags(write=False)
+    return table
+
+
+def sample_masks(table, count, rng, include=()):
+    """
+    경우의 수 표를 이용해 조건을 만족하는 조합 count개를 균등하게 뽑습니다. (재시도 없이 번호 1~45를 한 번씩만 훑습니다.)
+    번호마다 '건너뛰는 경우의 수 / 전체 경우의 수' 확률로 건너뛰고 나머지 경우에는 고르며, count개를 배열로 동시에 진행합니다.
+    (제외 번호는 표에서 고르는 경우의 수가 0이므로 항상 건너뛰고, 포함 번호는 건너뛰는 경우의 수를 0으로 두어 항상 고릅니다.)
+
+    Args:
+        table (ndarray): count_table로 만든 경우의 수 표.
+        count (int): 뽑을 조합 수.
+        rng (Generator): 난수 생성기.
+        include (tuple[int], optional): 표를 만들 때 사용한 포함 번호. Defaults to ().
+
+    Returns:
+        ndarray: uint64 마스크 배열 (shape: (count,)).
+    """
+    c = np.zeros(count, dtype=np.intp)
+    s = np.zeros(count, dtype=np.intp)
+    o = np.zeros(count, dtype=np.intp)
+    masks = np.zeros(count, dtype=np.uint64)
+
+    for i in range(NUMBER_COUNT):
+        n = i + 1
+        total = table[i, c, s, o]
+        skip_ways = 0 if n in include else table[i + 1, c, s, o]
+        take = rng.random(count) * total >= skip_ways
+        masks[take] |= np.uint64(1 << i)
+        c += take
+        s += take * n
+        o += take * (n % 2)
+    return masks
+
+
+def generate(count, include=(), exclude=(), sum_min=0, sum_max=SUM_SIZE - 1, odd=None, excluded_masks=None, seed=None):
+    """
+    조건을 만족하는 서로 다른 번호 조합 count개를 생성합니다.
+
+    Args:
+        count (int): 생성할 조합 수.
+        include, exclude, sum_min, sum_max, odd: count_table 참고.
+        excluded_masks (ndarray, optional): 나오면 안 되는 조합의 마스크 (지난 1등 조합, 사용자 저장 번호 등).
+        seed (int, optional): 같은 seed와 조건이면 항상 같은 결과를 생성합니다.
+
+    Returns:
+        ndarray: uint64 마스크 배열. 조건을 만족하는 조합이 부족하면 count개보다 적을 수 있습니다.
+    """
+    include = tuple(sorted(include))
+    table = count_table(include, tuple(sorted(exclude)), sum_min, sum_max, odd)
+    if table[0, 0, 0, 0] == 0:
+        return np.zeros(0, dtype=np.uint64)
+
+    rng = np.random.default_rng(seed)
+    excluded = np.zeros(0, dtype=np.uint64) if excluded_masks is None else np.asarray(excluded_masks, dtype=np.uint64)
+    masks = sample_masks(table, count, rng, include)
+    # 제외 조합이나 앞서 나온 조합과 겹치는 세트만 다시 뽑습니다. (전체 8,145,060개 중 겹칠 확률은 매우 낮습니다.)
+    for _ in range(MAX_RESAMPLE):
+        _, first = np.unique(masks, return_index=True)
+        bad = np.ones(len(masks), dtype=bool)
+        bad[first] = False
+        bad |= np.isin(masks, excluded)
+        if not bad.any():
+            break
+        masks[bad] = sample_masks(table, int(bad.sum()), rng, include)
+    else:
+        _, first = np.unique(masks, return_index=True)
+        keep = np.zeros(len(masks), dtype=bool)
+        keep[first] = True
+        masks = masks[keep & ~np.isin(masks, excluded)]
+    return masks
+
+
+def masks_to_numbers(masks):
+    """uint64 마스크 배열을 오름차순 번호 리스트들로 변환합니다."""
+    bits = (np.asarray(masks, dtype=np.uint64)[:, None] >> np.arange(NUMBER_COUNT, dtype=np.uint64)) & np.uint64(1)
+    return [(np.flatnonzero(row) + 1).tolist() for row in bits]
+
@@ -0,0 +1,245 @@
+# number_stats.py
+
+import copy
+from collections import OrderedDict
+from itertools import combinations
+import numpy as np
+from django.db.models import Count, Max
+from lotto_core.models import Round
+from lotto_core.utils.snapshot import VersionedSnapshot
+from lotto_core.utils.grading import grade_masks, number_masks
+
+NUMBER_COUNT = 45
+DRAW_FIELDS = ['number1', 'number2', 'number3', 'number4', 'number5', 'number6']
+AMOUNT_FIELDS = ['amount1', 'amount2', 'amount3', 'amount4', 'amount5']
+RESULT_CACHE_SIZE = 128 # 구간별 통계 결과를 보관할 최대 개수
+
+# 6개 번호에서 고를 수 있는 3개 조합의 위치 (20가지)
+TRIPLE_POSITIONS = np.array(list(combinations(range(6), 3)), dtype=np.intp)
+
+
+class RoundMatrix:
+    """
+    회차별 당첨 번호를 (회차 수 x 45) 행렬로 담아 둔 통계용 배열 묶음.
+    행은 회차 오름차순이며, 새 회차는 extend()로 뒤에 이어 붙입니다.
+
+    - rids: 회차 배열
+    - numbers: 당첨 번호 6개 (0부터 시작하는 번호, shape: (N, 6))
+    - main / bonus: 당첨 번호 / 보너스 번호 출현 여부 (bool, shape: (N, 45))
+    - main_prefix / bonus_prefix: 출현 횟수 누적합 (shape: (N + 1, 45)). 구간 [lo, hi)의 출현 횟수는 prefix[hi] - prefix[lo]
+    - last_seen: 각 행까지 마지막으로 출현한 행 위치 (없으면 -1)
+    - hit_run: 각 행에서 끝나는 연속 출현 회차 수
+    - masks / bonus_masks: 당첨 번호 / 보너스 번호의 45비트 마스크 (uint64, 백테스트용)
+    - amounts: 1~5등 1게임당 당첨금액 (shape: (N, 5))
+    """
+
+    def __init__(self):
+        self.rids = np.zeros(0, dtype=np.int32)
+        self.numbers = np.zeros((0, 6), dtype=np.int8)
+        self.main = np.zeros((0, NUMBER_COUNT), dtype=bool)
+        self.bonus = np.zeros((0, NUMBER_COUNT), dtype=bool)
+        self.main_prefix = np.zeros((1, NUMBER_COUNT), dtype=np.int32)
+        self.bonus_prefix = np.zeros((1, NUMBER_COUNT), dtype=np.int32)
+        self.last_seen = np.zeros((0, NUMBER_COUNT), dtype=np.int32)
+        self.hit_run = np.zeros((0, NUMBER_COUNT), dtype=np.int32)
+        self.masks = np.zeros(0, dtype=np.uint64)
+        self.bonus_masks = np.zeros(0, dtype=np.uint64)
+        self.amounts = np.zeros((0, 5), dtype=np.int64)
+
+    def __len__(self):
+        return len(self.rids)
+
+    def extend(self, rows):
+        """
+        (rid, number1, ..., number7, amount1, ..., amount5) 행들을 뒤에 추가하고, 누적 배열은 추가된 행만 계산합니다.
+        rows는 기존 마지막 회차보다 큰 회차만 오름차순으로 담고 있어야 합니다.
+        """
+        if not rows:
+            return
+        data = np.array(rows, dtype=np.int64)
+        start = len(self.rids)
+        count = len(data)
+        positions = np.arange(start, start + count)
+
+        numbers = (data[:, 1:7] - 1).astype(np.int8)
+        main = np.zeros((count, NUMBER_COUNT), dtype=bool)
+        main[np.arange(count)[:, None], numbers] = True
+        bonus = np.zeros((count, NUMBER_COUNT), dtype=bool)
+        bonus[np.arange(count), data[:, 7] - 1] = True
+
+        main_prefix = self.main_prefix[-1] + np.cumsum(main, axis=0, dtype=np.int32)
+        bonus_prefix = self.bonus_prefix[-1] + np.cumsum(bonus, axis=0, dtype=np.int32)
+
+        # 마지막 출현 위치: 출현한 행은 자기 위치, 아니면 이전 값을 이어 받습니다.
+        prev_last = self.last_seen[-1] if start else np.full(NUMBER_COUNT, -1, dtype=np.int32)
+        marks = np.where(main, positions[:, None], -1).astype(np.int32)
+        last_seen = np.maximum.accumulate(np.vstack([prev_last, marks]), axis=0)[1:]
+
+        # 연속 출현 수: 출현한 행이면 이전 값 + 1, 아니면 0
+        prev_run = self.hit_run[-1] if start else np.zeros(NUMBER_COUNT, dtype=np.int32)
+        hit_run = np.zeros((count, NUMBER_COUNT), dtype=np.int32)
+        for i in range(count):
+            prev_run = np.where(main[i], prev_run + 1, 0)
+            hit_run[i] = prev_run
+
+        self.rids = np.concatenate([self.rids, data[:, 0].astype(np.int32)])
+        self.numbers = np.vstack([self.numbers, numbers])
+        self.main = np.vstack([self.main, main])
+        self.bonus = np.vstack([self.bonus, bonus])
+        self.main_prefix = np.vstack([self.main_prefix, main_prefix])
+        self.bonus_prefix = np.vstack([self.bonus_prefix, bonus_prefix])
+        self.last_seen = np.vstack([self.last_seen, last_seen])
+        self.hit_run = np.vstack([self.hit_run, hit_run])
+        self.masks = np.concatenate([self.masks, number_masks(data[:, 1:7])])
+        self.bonus_masks = np.concatenate([self.bonus_masks, number_masks(data[:, 7:8])])
+        self.amounts = np.vstack([self.amounts, data[:, 8:13]])
+
+    def window(self, from_rid=None, to_rid=None):
+        """회차 구간 [from_rid, to_rid]에 해당하는 행 위치 [lo, hi)를 반환합니다."""
+        lo = 0 if from_rid is None else int(np.searchsorted(self.rids, from_rid, side='left'))
+        hi = len(self.rids) if to_rid is None else int(np.searchsorted(self.rids, to_rid, side='right'))
+        return lo, max(lo, hi)
+
+    def number_stats(self, lo, hi):
+        """구간 [lo, hi)의 번호별 출현 횟수, 보너스 출현 횟수, 마지막 출현 회차, 미출현 회차 수, 연속 출현 수를 계산합니다."""
+        counts = self.main_prefix[hi] - self.main_prefix[lo]
+        bonus_counts = self.bonus_prefix[hi] - self.bonus_prefix[lo]
+        stats = []
+        for n in range(NUMBER_COUNT):
+            last = int(self.last_seen[hi - 1, n]) if hi > lo else -1
+            seen = last >= lo
+            stats.append({
+                'number': n + 1,
+                'count': int(counts[n]),
+                'bonus_count': int(bonus_counts[n]),
+                'last_rid': int(self.rids[last]) if seen else None,
+                'gap': (hi - 1 - last) if seen else (hi - lo), # 마지막 출현 이후 지난 회차 수 (구간 내 미출현이면 구간 전체)
+                'hit_streak': int(min(self.hit_run[hi - 1, n], hi - lo)) if hi > lo else 0,
+            })
+        return stats
+
+    def top_pairs(self, lo, hi, limit):
+        """구간 [lo, hi)에서 함께 가장 많이 나온 번호 쌍 상위 limit개를 반환합니다."""
+        window = self.main[lo:hi].astype(np.int32)
+        co = window.T @ window
+        a, b = np.triu_indices(NUMBER_COUNT, k=1)
+        return _top_k([(int(x) + 1, int(y) + 1) for x, y in zip(a, b)], co[a, b], limit)
+
+    def top_triples(self, lo, hi, limit):
+        """구간 [lo, hi)에서 함께 가장 많이 나온 번호 3개 조합 상위 limit개를 반환합니다."""
+        triples = self.numbers[lo:hi].astype(np.intp)[:, TRIPLE_POSITIONS] # (N, 20, 3)
+        keys = (triples[..., 0] * NUMBER_COUNT + triples[..., 1]) * NUMBER_COUNT + triples[..., 2]
+        counts = np.bincount(keys.ravel(), minlength=NUMBER_COUNT ** 3)
+        # 키 순서가 번호 순서와 같으므로, 키를 그대로 레이블 위치로 사용하고 상위 항목만 번호로 되돌립니다.
+        top = _top_k(None, counts, limit)
+        for item in top:
+            k = item['numbers']
+            item['numbers'] = [k // (NUMBER_COUNT ** 2) + 1, k // NUMBER_COUNT % NUMBER_COUNT + 1, k % NUMBER_COUNT + 1]
+        return top
+
+
+def _top_k(labels, counts, limit):
+    """
+    횟수가 많은 순(같으면 배열 순서)으로 상위 limit개를 [{'numbers', 'count'}]로 반환합니다.
+    labels가 None이면 'numbers'에 배열 위치를 그대로 담습니다.
+    """
+    counts = np.asarray(counts)
+    if len(counts) == 0 or limit <= 0:
+        return []
+    order = np.lexsort((np.arange(len(counts)), -counts))[:limit]
+    return [
+        {'numbers': int(i) if labels is None else list(labels[i]), 'count': int(counts[i])}
+        for i in order if counts[i] > 0
+    ]
+
+
+class NumberStats(VersionedSnapshot):
+    """
+    번호별 출현 통계와 백테스트에 사용하는 회차 행렬 스냅샷 (RoundMatrix).
+    새 회차가 추가된 경우에는 전체를 다시 만들지 않고 추가된 회차만 이어 붙이며,
+    기존 회차가 수정/삭제된 경우에만 전체를 다시 만듭니다.
+    구간별 계산 결과는 스냅샷마다 최대 RESULT_CACHE_SIZE개까지 보관합니다.
+    """
+
+    def get_version(self):
+        agg = Round.objects.aggregate(count=Count('rid'), max_rid=Max('rid'), updated_at=Max('updated_at'))
+        return (agg['count'], agg['max_rid'], agg['updated_at'])
+
+    def _rows(self, queryset):
+        return list(queryset.order_by('rid').values_list('rid', *DRAW_FIELDS, 'number7', *AMOUNT_FIELDS))
+
+    def build(self, version):
+        previous = self._value
+        if previous is not None and self._version is not None:
+            prev_count, prev_max_rid, prev_updated_at = self._version
+            matrix = previous['matrix']
+            appended = self._rows(Round.objects.filter(rid__gt=prev_max_rid or 0))
+            # 기존 회차가 그대로이고 뒤에 새 회차만 추가된 경우 (수정된 회차가 없고 개수가 맞을 때)
+            unchanged = not Round.objects.filter(rid__lte=prev_max_rid or 0, updated_at__gt=prev_updated_at).exists() if prev_updated_at else True
+            if unchanged and prev_count + len(appended) == version[0] and len(matrix) == prev_count:
+                # 조회 중인 이전 스냅샷은 그대로 두고, 복사본에 이어 붙입니다. (extend는 배열을 새로 만들어 교체합니다.)
+                matrix = copy.copy(matrix)
+                matrix.extend(appended)
+                return {'matrix': matrix, 'results': OrderedDict()}
+
+        matrix = RoundMatrix()
+        matrix.extend(self._rows(Round.objects.all()))
+        return {'matrix': matrix, 'results': OrderedDict()}
+
+    def query(self, from_rid=None, to_rid=None, limit=10):
+        """
+        회차 구간 [from_rid, to_rid]의 번호 통계를 반환합니다. (구간 미지정 시 전체)
+
+        Returns:
+            dict: {'from_rid', 'to_rid', 'rounds', 'numbers': [...45개], 'hot', 'cold', 'pairs', 'triples'}
+        """
+        snapshot = self.get()
+        matrix = snapshot['matrix']
+        lo, hi = matrix.window(from_rid, to_rid)
+        key = (lo, hi, limit)
+        results = snapshot['results']
+        if key in results:
+            results.move_to_end(key)
+            return results[key]
+
+        stats = matrix.number_stats(lo, hi)
+        by_count = sorted(stats, key=lambda s: (-s['count'], s['number']))
+        result = {
+            'from_rid': int(matrix.rids[lo]) if hi > lo else from_rid,
+            'to_rid': int(matrix.rids[hi - 1]) if hi > lo else to_rid,
+            'rounds': hi - lo,
+            'numbers': stats,
+            'hot': [s['number'] for s in by_count[:6]],
+            'cold': [s['number'] for s in sorted(stats, key=lambda s: (s['count'], s['number']))[:6]],
+            'pairs': matrix.top_pairs(lo, hi, limit),
+            'triples': matrix.top_triples(lo, hi, limit),
+        }
+
+        with self._lock:
+            results[key] = result
+            while len(results) > RESULT_CACHE_SIZE:
+                results.popitem(last=False)
+        return result
+
+    def backtest(self, masks, from_rid=None, to_rid=None):
+        """
+        번호 마스크들을 회차 구간의 모든 회차와 한 번에 채점합니다. ((번호 수 x 회차 수) 배열의 비트 AND + popcount)
+
+        Args:
+            masks (ndarray): 번호 세트의 uint64 마스크 배열.
+            from_rid (int, optional): 시작 회차 (포함). Defaults to None (첫 회차).
+            to_rid (int, optional): 끝 회차 (포함). Defaults to None (마지막 회차).
+
+        Returns:
+            tuple: (회차 배열, 등수 배열 (shape: (번호 수, 회차 수), 0:꽝), 당첨금 배열 (같은 shape))
+        """
+        matrix = self.get()['matrix']
+        lo, hi = matrix.window(from_rid, to_rid)
+        ranks = grade_masks(np.asarray(masks, dtype=np.uint64)[:, None], matrix.masks[None, lo:hi], matrix.bonus_masks[None, lo:hi])
+        # 등수별 당첨금 표 (0열은 꽝)에서 (회차, 등수) 위치의 금액을 가져옵니다.
+        amounts = np.hstack([np.zeros((hi - lo, 1), dtype=np.int64), matrix.amounts[lo:hi]])
+        winnings = amounts[np.arange(hi - lo)[None, :], ranks]
+        return matrix.rids[lo:hi], ranks, winnings
+
+
+number_stats = NumberStats()
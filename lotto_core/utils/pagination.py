@@ -0,0 +1,283 @@
+# pagination.py
+
+import base64
+import datetime
+import json
+import math
+import time
+import threading
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections
+from django.db.models import Q
+from django.http import JsonResponse, StreamingHttpResponse
+
+MAX_PAGE_SIZE = 500 # 한 페이지에 반환할 수 있는 최대 항목 수 (초과 요청은 이 값으로 제한합니다.)
+COUNT_CACHE_TTL = 60 # COUNT 결과 캐시 유지 시간 (초)
+ESTIMATE_THRESHOLD = 10000 # 추정 개수가 이보다 작으면 정확한 COUNT를 사용합니다.
+STREAM_CHUNK_SIZE = 500 # page=0 스트리밍 시 DB 커서에서 한 번에 가져와 내보낼 행 수
+
+_count_cache = {}
+_count_cache_lock = threading.Lock()
+
+
+def _error(message, status=400):
+    return JsonResponse({'status': 'error', 'message': message}, status=status)
+
+
+def count_queryset(queryset, mode='exact'):
+    """
+    QuerySet의 전체 항목 수를 구합니다.
+
+    Args:
+        queryset (QuerySet): 개수를 구할 QuerySet.
+        mode (str, optional): 'exact'(매번 COUNT), 'cached'(같은 쿼리의 COUNT 결과를 COUNT_CACHE_TTL초 동안 재사용),
+            'estimated'(PostgreSQL 실행 계획의 추정 행 수를 사용하되, ESTIMATE_THRESHOLD 미만이면 정확한 COUNT).
+            Defaults to 'exact'.
+
+    Returns:
+        tuple: (전체 항목 수, 추정값 여부). 추정값은 실제 행 수와 다를 수 있습니다.
+    """
+    if mode == 'estimated':
+        estimate = _estimate_count(queryset)
+        if estimate is not None and estimate >= ESTIMATE_THRESHOLD:
+            return estimate, True
+        mode = 'cached'
+
+    if mode == 'cached':
+        sql, params = queryset.order_by().query.sql_with_params()
+        key = (queryset.db, sql, tuple(params))
+        now = time.monotonic()
+        with _count_cache_lock:
+            cached = _count_cache.get(key)
+        if cached and cached[1] > now:
+            return cached[0], False
+        count = queryset.count()
+        with _count_cache_lock:
+            _count_cache[key] = (count, now + COUNT_CACHE_TTL)
+        return count, False
+
+    return queryset.count(), False
+
+
+def _estimate_count(queryset):
+    """PostgreSQL의 EXPLAIN 결과에서 추정 행 수를 가져옵니다. 지원하지 않는 DB면 None을 반환합니다."""
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return None
+    sql, params = queryset.order_by().query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+def stream_items(queryset, fields, chunk_size=STREAM_CHUNK_SIZE):
+    """
+    전체 항목을 JSON으로 조금씩 내보내는 StreamingHttpResponse를 만듭니다.
+    서버 측 커서(QuerySet.iterator)로 chunk_size개씩 읽어 바로 직렬화하므로,
+    행 수와 관계없이 메모리 사용량이 일정하고 첫 바이트를 빨리 보낼 수 있습니다.
+
+    전체 수를 미리 COUNT하지 않도록 items를 먼저 내보내고 total_items를 마지막에 붙입니다.
+    (키 순서만 다를 뿐 page=0의 기존 응답과 같은 구조입니다.)
+    """
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+
+    def generate():
+        yield '{"items": ['
+        count = 0
+        chunk = []
+        for item in queryset.values(*fields).iterator(chunk_size=chunk_size):
+            chunk.append(encoder.encode(item))
+            count += 1
+            if len(chunk) >= chunk_size:
+                yield (',' if count > len(chunk) else '') + ','.join(chunk)
+                chunk = []
+        if chunk:
+            yield (',' if count > len(chunk) else '') + ','.join(chunk)
+        yield f'], "total_items": {count}, "total_pages": 1, "current_page": 0}}'
+
+    return StreamingHttpResponse(generate(), content_type='application/json')
+
+
+def _ordering(queryset):
+    """
+    키셋(커서) 페이지네이션에 사용할 정렬 기준을 [(필드명, 내림차순 여부), ...] 형태로 반환합니다.
+    정렬이 유일하도록 마지막에 기본 키를 붙입니다.
+    """
+    pk_name = queryset.model._meta.pk.attname
+    ordering = []
+    for name in queryset.query.order_by:
+        descending = name.startswith('-')
+        field_name = name.lstrip('-')
+        if field_name == 'pk':
+            field_name = pk_name
+        ordering.append((field_name, descending))
+    if not any(name == pk_name for name, _ in ordering):
+        ordering.append((pk_name, False))
+    return ordering
+
+
+def _encode_cursor(item, ordering):
+    """
+    마지막 항목의 정렬 필드 값들을 커서 문자열로 만듭니다.
+    값 목록을 JSON으로 직렬화한 뒤 URL-safe base64로 인코딩하므로(패딩 '=' 제외),
+    클라이언트가 URL 인코딩 없이 그대로 쿼리 문자열에 넣어도 '+'나 ',' 등이 깨지지 않습니다.
+    """
+    values = []
+    for name, _ in ordering:
+        value = item[name]
+        if isinstance(value, (datetime.date, datetime.datetime)):
+            value = value.isoformat()
+        values.append(str(value))
+    body = json.dumps(values, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(body).decode('ascii').rstrip('=')
+
+
+def _decode_cursor(cursor, queryset, ordering):
+    """커서 문자열을 정렬 필드별 값으로 변환합니다. 형식이 맞지 않으면 ValidationError를 발생시킵니다."""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except (ValueError, TypeError):
+        raise ValidationError("커서 형식이 올바르지 않습니다.")
+    if not isinstance(values, list) or len(values) != len(ordering) or not all(isinstance(v, str) for v in values):
+        raise ValidationError("커서 형식이 올바르지 않습니다.")
+    return [
+        queryset.model._meta.get_field(name).to_python(value)
+        for (name, _), value in zip(ordering, values)
+    ]
+
+
+def _seek(queryset, ordering, values):
+    """정렬 순서상 values 다음에 오는 항목만 남기도록 필터링합니다. (a > x) or (a = x and b > y) ..."""
+    condition = Q()
+    for i, (name, descending) in enumerate(ordering):
+        step = Q(**{f'{name}__{"lt" if descending else "gt"}': values[i]})
+        for (prev_name, _), prev_value in zip(ordering[:i], values[:i]):
+            step &= Q(**{prev_name: prev_value})
+        condition |= step
+    return queryset.filter(condition)
+
+
+def _values(queryset, fields, extra):
+    """fields에 없는 정렬 필드(extra)까지 함께 조회한 뒤, 응답에서는 제외할 수 있도록 목록을 반환합니다."""
+    missing = [name for name in extra if name not in fields]
+    return list(queryset.values(*fields, *missing)), missing
+
+
+def paginate(request, queryset, fields, count='exact', ranked=None, cursor_param='cursor', next_key='next_cursor'):
+    """
+    목록 API 공통 페이지네이션.
+    request.GET의 파라미터에 따라 다음 세 가지 방식 중 하나로 JsonResponse를 만듭니다.
+
+    - page=0: 전체 항목을 스트리밍으로 반환합니다. (stream_items 참고)
+    - page>=1 & size: 페이지 번호 방식. size는 MAX_PAGE_SIZE를 넘지 않도록 제한됩니다.
+      ranked가 주어지면 COUNT/OFFSET 대신 ranked(offset, limit) -> (전체 수, 항목 리스트)를 사용합니다.
+    - {cursor_param} & size: 키셋(커서) 방식. QuerySet의 정렬 기준 값으로 다음 항목을 찾으므로 COUNT/OFFSET이 없습니다.
+      첫 페이지는 빈 값으로 요청하고, 응답의 {next_key}를 다음 요청에 사용합니다. (마지막 페이지면 None)
+
+    Args:
+        request (HttpRequest): GET 요청.
+        queryset (QuerySet): 정렬된 QuerySet.
+        fields (list[str]): 응답 항목에 포함할 필드.
+        count (str, optional): 페이지 번호 방식의 전체 수 계산 방식 ('exact', 'cached', 'estimated'). Defaults to 'exact'.
+            'estimated'이면 응답에 total_items_estimated(전체 수가 추정값인지 여부)를 포함하고,
+            페이지 존재 여부는 추정값이 아니라 실제로 가져온 행으로 판단합니다.
+        ranked (callable, optional): 미리 계산된 순위에서 페이지를 가져오는 함수. Defaults to None.
+        cursor_param (str, optional): 커서 파라미터 이름. Defaults to 'cursor'.
+        next_key (str, optional): 응답의 다음 커서 키 이름. Defaults to 'next_cursor'.
+
+    Returns:
+        HttpResponse: 페이지네이션된 응답(page=0이면 StreamingHttpResponse) 또는 400/404 오류 응답.
+    """
+    page_str = request.GET.get('page')
+    cursor = request.GET.get(cursor_param)
+    size_str = request.GET.get('size')
+
+    if page_str is None and cursor is None:
+        return _error('page는 필수 입력값입니다.')
+
+    size = None
+    if size_str:
+        try:
+            size = int(size_str)
+            if size <= 0: raise ValueError
+        except (ValueError, TypeError):
+            return _error('size는 0보다 큰 정수여야 합니다.')
+        size = min(size, MAX_PAGE_SIZE)
+
+    # 키셋(커서) 방식
+    if cursor is not None:
+        if size is None:
+            return _error(f'{cursor_param}를 사용할 경우 size는 필수 입력값입니다.')
+        ordering = _ordering(queryset)
+        queryset = queryset.order_by(*[f'-{name}' if desc else name for name, desc in ordering])
+        if cursor:
+            try:
+                queryset = _seek(queryset, ordering, _decode_cursor(cursor, queryset, ordering))
+            except ValidationError as e:
+                return _error(e.messages[0])
+        # 다음 페이지 존재 여부를 알기 위해 하나 더 가져옵니다.
+        items, missing = _values(queryset[:size + 1], fields, [name for name, _ in ordering])
+        has_next = len(items) > size
+        items = items[:size]
+        next_cursor = _encode_cursor(items[-1], ordering) if has_next else None
+        for item in items:
+            for name in missing:
+                del item[name]
+        data = {'size': size, next_key: next_cursor, 'items': items}
+        return JsonResponse(data, status=200, json_dumps_params={'ensure_ascii': False})
+
+    try:
+        page = int(page_str)
+    except (ValueError, TypeError):
+        return _error('page는 유효한 정수여야 합니다.')
+
+    if page < 0:
+        return _error('page는 0 또는 양의 정수여야 합니다.')
+
+    # 전체 항목
+    if page == 0:
+        return stream_items(queryset, fields)
+
+    # 페이지 번호 방식
+    if size is None:
+        return _error('page가 1 이상일 경우 size는 필수 입력값입니다.')
+
+    offset = (page - 1) * size
+    estimated = False
+    if ranked is not None:
+        total_items, items = ranked(offset, size)
+    else:
+        total_items, estimated = count_queryset(queryset, count)
+        if estimated:
+            # 추정값은 실제보다 작거나 클 수 있으므로 페이지 존재 여부는 실제로 가져온 행으로 판단합니다.
+            # (다음 페이지 존재 여부를 알기 위해 하나 더 가져옵니다.)
+            items = list(queryset.values(*fields)[offset:offset + size + 1])
+            has_next = len(items) > size
+            items = items[:size]
+            if page > 1 and not items:
+                return _error('요청한 페이지가 존재하지 않습니다.', status=404)
+            if has_next:
+                total_items = max(total_items, offset + size + 1)
+            else: # 마지막 페이지까지 왔으므로 전체 수를 정확히 알 수 있습니다.
+                total_items = offset + len(items)
+                estimated = False
+        else:
+            items = list(queryset.values(*fields)[offset:offset + size]) if offset < total_items else []
+
+    total_pages = max(1, math.ceil(total_items / size))
+    if page > total_pages:
+        return _error('요청한 페이지가 존재하지 않습니다.', status=404)
+
+    data = {
+        'total_items': total_items,
+        'total_pages': total_pages,
+        'current_page': page,
+        'items': items
+    }
+    if count == 'estimated' and ranked is None:
+        data['total_items_estimated'] = estimated
+    return JsonResponse(data, status=200, json_dumps_params={'ensure_ascii': False})
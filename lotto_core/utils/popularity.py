@@ -0,0 +1,66 @@
+# popularity.py
+
+from collections import Counter
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Value, When
+from lotto_core.models import CombinationCount
+
+# 집계 종류 -> CombinationCount 필드
+KINDS = ('shared', 'purchased')
+
+
+def change_counts(kind, pairs, sign=1):
+    """
+    (회차, 마스크) 목록만큼 조합별 집계를 증감합니다.
+    같은 회차의 조합들은 (없는 행 생성 + CASE 증감) 두 번의 쿼리로 한꺼번에 반영합니다.
+
+    Args:
+        kind (str): 'shared' 또는 'purchased'.
+        pairs (iterable): (rid, mask) 튜플들. 같은 조합이 여러 번 나오면 그만큼 증감합니다.
+        sign (int, optional): 1이면 증가, -1이면 감소. Defaults to 1.
+    """
+    if kind not in KINDS:
+        raise ValueError(f"알 수 없는 집계 종류입니다: {kind}")
+
+    by_rid = {}
+    for (rid, mask), count in Counter((int(rid), int(mask)) for rid, mask in pairs).items():
+        by_rid.setdefault(rid, {})[mask] = count * sign
+    if not by_rid:
+        return
+
+    with transaction.atomic():
+        for rid, deltas in by_rid.items():
+            if sign > 0:
+                # 처음 나온 조합은 0으로 먼저 만들어 둡니다. (이미 있으면 무시)
+                CombinationCount.objects.bulk_create(
+                    [CombinationCount(rid=rid, mask=mask) for mask in deltas], ignore_conflicts=True
+                )
+            delta = Case(
+                *[When(mask=mask, then=Value(d)) for mask, d in deltas.items()],
+                default=Value(0), output_field=IntegerField()
+            )
+            CombinationCount.objects.filter(rid=rid, mask__in=list(deltas)).update(
+                **{kind: F(kind) + delta, 'total': F('total') + delta}
+            )
+
+
+def get_count(rid, mask):
+    """회차의 조합 집계를 {'shared', 'purchased', 'total'}로 반환합니다. 없으면 모두 0입니다."""
+    counts = CombinationCount.objects.filter(rid=rid, mask=mask).values('shared', 'purchased', 'total').first()
+    return counts or {'shared': 0, 'purchased': 0, 'total': 0}
+
+
+def get_top(rid, kind='total', limit=10):
+    """
+    회차의 인기 조합 상위 limit개를 반환합니다. ((rid, -kind, mask) 인덱스 순서대로 limit개만 읽습니다.)
+
+    Returns:
+        list[dict]: [{'mask', 'shared', 'purchased', 'total'}, ...]
+    """
+    if kind not in KINDS + ('total',):
+        raise ValueError(f"알 수 없는 집계 종류입니다: {kind}")
+    return list(
+        CombinationCount.objects.filter(rid=rid, **{f'{kind}__gt': 0})
+        .order_by(f'-{kind}', 'mask')
+        .values('mask', 'shared', 'purchased', 'total')[:limit]
+    )
@@ -0,0 +1,64 @@
+# region_tree.py
+
+import json
+from django.db.models import Count, Max, Sum
+from lotto_core.models import Store
+from lotto_core.utils.snapshot import VersionedSnapshot
+
+
+class RegionTree(VersionedSnapshot):
+    """
+    활성화된 판매점의 주소(시/도 > 시/군/구 > 읍/면/동)로 만든 지역 계층 트리 스냅샷.
+    각 노드는 다음 값을 가집니다.
+        {'name': 지역명, 'stores': 판매점 수, 'matches1': 1등 당첨 수 합계, 'matches2': 2등 당첨 수 합계, 'children': [...]}
+
+    판매점 정보는 주 2회(sync_store)만 바뀌므로,
+    (활성 판매점 수, 1/2등 당첨 수 합계, 최종 갱신일)을 버전으로 사용하여 바뀐 경우에만 다시 만듭니다.
+    """
+
+    def get_version(self):
+        agg = Store.objects.filter(enabled=True).aggregate(
+            count=Count('sid'),
+            matches1=Sum('matches1'),
+            matches2=Sum('matches2'),
+            updated_at=Max('updated_at'),
+        )
+        return (agg['count'], agg['matches1'], agg['matches2'], agg['updated_at'])
+
+    def build(self, version):
+        # 읍/면/동 단위로 한 번만 GROUP BY 하고, 상위 노드는 메모리에서 합산합니다.
+        rows = (
+            Store.objects.filter(enabled=True)
+            .values('addr1', 'addr2', 'addr3')
+            .annotate(stores=Count('sid'), matches1=Sum('matches1'), matches2=Sum('matches2'))
+            .order_by('addr1', 'addr2', 'addr3')
+        )
+
+        roots = []
+        nodes = {} # (addr1,), (addr1, addr2), (addr1, addr2, addr3) -> 노드
+        for row in rows:
+            path = (row['addr1'], row['addr2'], row['addr3'])
+            siblings = roots
+            for depth in range(3):
+                key = path[:depth + 1]
+                node = nodes.get(key)
+                if node is None:
+                    node = {'name': path[depth], 'stores': 0, 'matches1': 0, 'matches2': 0}
+                    if depth < 2:
+                        node['children'] = []
+                    siblings.append(node)
+                    nodes[key] = node
+                node['stores'] += row['stores']
+                node['matches1'] += row['matches1'] or 0
+                node['matches2'] += row['matches2'] or 0
+                siblings = node.get('children')
+
+        return {
+            'roots': roots,
+            'nodes': nodes,
+            # 전체 트리는 요청마다 직렬화하지 않도록 미리 JSON으로 만들어 둡니다.
+            'body': json.dumps(roots, ensure_ascii=False).encode('utf-8'),
+        }
+
+
+region_tree = RegionTree()
@@ -0,0 +1,109 @@
+# round_snapshot.py
+
+import datetime
+import hashlib
+import json
+import struct
+from collections import namedtuple
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Count, Max
+from lotto_core.models import Round
+from lotto_core.utils.snapshot import VersionedSnapshot
+
+# 응답에 포함할 필드 (model_to_dict와 동일하게 편집 가능한 필드만 사용하며, updated_at은 제외됩니다.)
+ROUND_FIELDS = [f.attname for f in Round._meta.concrete_fields if f.editable]
+
+# 지원하는 인코딩과 Content-Type
+# - json: 기존과 동일한 객체 배열 [{"rid": 1, "date": "2002-12-07", ...}, ...]
+# - columns: 컬럼 배열 {"count": N, "fields": [...], "columns": {"rid": [...], "date": [...], ...}}
+# - binary: 고정 폭 리틀 엔디언 정수 레코드 (encode_binary 참고)
+ROUND_FORMATS = {
+    'json': 'application/json',
+    'columns': 'application/json',
+    'binary': 'application/octet-stream',
+}
+
+BINARY_MAGIC = b'LTRD'
+BINARY_VERSION = 1
+EPOCH = datetime.date(1970, 1, 1)
+
+RoundPayload = namedtuple('RoundPayload', ['body', 'etag', 'content_type', 'version'])
+
+
+def _binary_type(field_name):
+    """필드를 바이너리 포맷의 struct 타입 코드로 변환합니다. (i: int32, q: int64)"""
+    internal_type = Round._meta.get_field(field_name).get_internal_type()
+    return 'q' if internal_type == 'BigIntegerField' else 'i'
+
+
+BINARY_TYPES = ''.join(_binary_type(name) for name in ROUND_FIELDS)
+BINARY_ROW = struct.Struct('<' + BINARY_TYPES)
+
+
+def encode_json(rows):
+    return json.dumps(rows, cls=DjangoJSONEncoder, ensure_ascii=False).encode('utf-8')
+
+
+def encode_columns(rows):
+    columns = {name: [row[name] for row in rows] for name in ROUND_FIELDS}
+    data = {'count': len(rows), 'fields': ROUND_FIELDS, 'columns': columns}
+    return json.dumps(data, cls=DjangoJSONEncoder, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def encode_binary(rows):
+    """
+    회차 목록을 고정 폭 리틀 엔디언 바이너리로 인코딩합니다.
+
+    헤더:
+        magic(4바이트, b'LTRD'), version(uint16), field_count(uint16), row_count(uint32)
+    필드 정의 (field_count개):
+        type(1바이트, b'i'=int32 / b'q'=int64), name_length(uint8), name(UTF-8)
+    레코드 (row_count개, 필드 정의 순서대로):
+        각 필드 값. date는 1970-01-01 기준 경과 일수(int32)입니다.
+    """
+    header = [struct.pack('<4sHHI', BINARY_MAGIC, BINARY_VERSION, len(ROUND_FIELDS), len(rows))]
+    for name, type_code in zip(ROUND_FIELDS, BINARY_TYPES):
+        encoded_name = name.encode('utf-8')
+        header.append(struct.pack('<cB', type_code.encode('ascii'), len(encoded_name)) + encoded_name)
+
+    body = bytearray(b''.join(header))
+    for row in rows:
+        values = [
+            (row[name] - EPOCH).days if isinstance(row[name], datetime.date) else row[name]
+            for name in ROUND_FIELDS
+        ]
+        body += BINARY_ROW.pack(*values)
+    return bytes(body)
+
+
+ENCODERS = {
+    'json': encode_json,
+    'columns': encode_columns,
+    'binary': encode_binary,
+}
+
+
+class RoundSnapshot(VersionedSnapshot):
+    """
+    전체 회차 목록을 미리 직렬화해 둔 스냅샷.
+    회차 데이터는 주 1회(sync_round, sync_cafe)만 바뀌므로,
+    (회차 수, 최신 회차, 최종 갱신일)을 버전으로 사용하여 바뀐 경우에만 다시 직렬화합니다.
+    지원하는 모든 인코딩(ROUND_FORMATS)을 한 번에 만들어 둡니다.
+    """
+
+    def get_version(self):
+        agg = Round.objects.aggregate(count=Count('rid'), max_rid=Max('rid'), updated_at=Max('updated_at'))
+        return (agg['count'], agg['max_rid'], agg['updated_at'])
+
+    def build(self, version):
+        rows = list(Round.objects.order_by('-rid').values(*ROUND_FIELDS))
+        payloads = {}
+        for fmt, encoder in ENCODERS.items():
+            body = encoder(rows)
+            # 본문 바이트로부터 만든 강한(strong) ETag
+            etag = f'"{hashlib.sha1(body).hexdigest()}"'
+            payloads[fmt] = RoundPayload(body=body, etag=etag, content_type=ROUND_FORMATS[fmt], version=version)
+        return payloads
+
+
+round_snapshot = RoundSnapshot()
@@ -0,0 +1,97 @@
+# snapshot.py
+
+import os
+import threading
+import time
+
+DBSYNC_PATH = os.path.join(os.path.dirname(__file__), '..', '..', 'dbsync.json')
+
+
+def dbsync_mtime():
+    """
+    dbsync.json 파일의 수정 시각을 반환합니다.
+    동기화 커맨드(sync_round, sync_store, sync_cafe)와 채점(grade_rounds)은 작업이 끝나면 이 파일을 갱신하므로,
+    다른 프로세스(스케줄러)에서 발생한 DB 변경을 DB 조회 없이 감지하는 용도로 사용합니다.
+    파일이 없으면 None을 반환합니다.
+    """
+    try:
+        return os.stat(DBSYNC_PATH).st_mtime
+    except OSError:
+        return None
+
+
+def touch_dbsync():
+    """
+    dbsync.json의 수정 시각만 갱신하여 다른 프로세스(웹 작업자)의 스냅샷이 다음 조회 때 버전을 다시 확인하도록 알립니다.
+    동기화 커맨드처럼 파일 내용을 바꾸지 않는 작업(채점 등)에서 사용합니다. 파일이 없으면 빈 객체로 만듭니다.
+    """
+    try:
+        os.utime(DBSYNC_PATH)
+    except FileNotFoundError:
+        with open(DBSYNC_PATH, 'w', encoding='utf-8') as f:
+            f.write('{}')
+
+
+class VersionedSnapshot:
+    """
+    버전 키가 바뀔 때만 다시 만들어지는 프로세스 단위 캐시.
+
+    - 같은 프로세스에서 발생한 변경은 시그널 핸들러가 invalidate()를 호출하여 알립니다.
+    - 다른 프로세스에서 발생한 변경은 dbsync.json의 수정 시각으로 감지합니다.
+    - 그 외에는 REVALIDATE_INTERVAL(초)마다 한 번씩 get_version()으로 버전만 확인합니다.
+
+    하위 클래스는 get_version()과 build(version)를 구현해야 합니다.
+    """
+    REVALIDATE_INTERVAL = 300
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._value = None
+        self._version = None
+        self._dirty = True
+        self._checked_at = 0.0
+        self._dbsync_mtime = None
+
+    def get_version(self):
+        """현재 DB 상태를 나타내는 가벼운 버전 키를 반환합니다."""
+        raise NotImplementedError
+
+    def build(self, version):
+        """주어진 버전에 해당하는 캐시 값을 새로 만들어 반환합니다."""
+        raise NotImplementedError
+
+    def invalidate(self):
+        """다음 조회 시 버전을 다시 확인하도록 표시합니다."""
+        self._dirty = True
+
+    def _is_fresh(self, now, mtime):
+        return (
+            self._value is not None
+            and not self._dirty
+            and mtime == self._dbsync_mtime
+            and now - self._checked_at < self.REVALIDATE_INTERVAL
+        )
+
+    def get(self):
+        """캐시 값을 반환합니다. 필요할 때만 버전을 확인하고 다시 빌드합니다."""
+        now = time.monotonic()
+        mtime = dbsync_mtime()
+        if self._is_fresh(now, mtime):
+            return self._value
+
+        with self._lock:
+            if self._is_fresh(now, mtime):
+                return self._value
+            # 빌드 도중 들어온 invalidate()가 사라지지 않도록 먼저 플래그를 내립니다.
+            self._dirty = False
+            try:
+                version = self.get_version()
+                if self._value is None or version != self._version:
+                    self._value = self.build(version)
+                    self._version = version
+            except Exception:
+                self._dirty = True
+                raise
+            self._checked_at = now
+            self._dbsync_mtime = mtime
+            return self._value
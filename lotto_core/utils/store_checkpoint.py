@@ -0,0 +1,137 @@
+# store_checkpoint.py
+
+import datetime
+import hashlib
+import json
+import os
+import shutil
+import time
+
+CHECKPOINT_DIR = os.path.join(os.path.dirname(__file__), '..', '..', 'store_sync')
+PAGE_HASHES_PATH = os.path.join(os.path.dirname(__file__), '..', '..', 'store_hashes.json')
+CHECKPOINT_MAX_AGE = 24 * 60 * 60 # 이보다 오래된 체크포인트는 이어받지 않고 버립니다. (초)
+
+
+class StoreSyncCheckpoint:
+    """
+    판매점 동기화(sync_store)의 진행 상황을 디스크에 저장하는 체크포인트.
+
+    store_sync/
+      state.json          : 동기화 시작 시각
+      {시도 번호:02d}/{페이지:03d}.json : 가져온 페이지 응답 (totalPage, arr)
+      {시도 번호:02d}/uploaded        : 이 시도의 판매점을 DB에 반영 완료
+
+    중간에 실패한 뒤 다시 실행하면 저장된 페이지는 다시 요청하지 않고, 반영이 끝난 시도는 건너뜁니다.
+    모든 시도가 끝나면 clear()로 지웁니다. 파일은 임시 파일에 쓴 뒤 교체하므로 중간에 중단되어도 깨진 페이지가 남지 않습니다.
+    """
+
+    def __init__(self, directory=CHECKPOINT_DIR, max_age=CHECKPOINT_MAX_AGE):
+        self.directory = directory
+        self.max_age = max_age
+
+    def _state_path(self):
+        return os.path.join(self.directory, 'state.json')
+
+    def _province_dir(self, index):
+        return os.path.join(self.directory, f'{index:02d}')
+
+    def _write(self, path, data):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def start(self):
+        """
+        체크포인트를 시작합니다. 이어받을 체크포인트가 있으면 그대로 두고, 오래되었거나 읽을 수 없으면 지우고 새로 시작합니다.
+
+        Returns:
+            bool: 이전 체크포인트를 이어받으면 True.
+        """
+        try:
+            with open(self._state_path(), 'r', encoding='utf-8') as f:
+                started_at = json.load(f)['started_at']
+            if time.time() - started_at <= self.max_age:
+                return True
+        except (OSError, ValueError, KeyError):
+            pass
+        self.clear()
+        self._write(self._state_path(), {'started_at': time.time()})
+        return False
+
+    def load_page(self, index, page):
+        """저장된 페이지 응답을 반환합니다. 없으면 None을 반환합니다."""
+        try:
+            with open(os.path.join(self._province_dir(index), f'{page:03d}.json'), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def save_page(self, index, page, json_data):
+        self._write(os.path.join(self._province_dir(index), f'{page:03d}.json'), json_data)
+
+    def is_uploaded(self, index):
+        return os.path.exists(os.path.join(self._province_dir(index), 'uploaded'))
+
+    def mark_uploaded(self, index):
+        self._write(os.path.join(self._province_dir(index), 'uploaded'), {'uploaded_at': time.time()})
+
+    def discard(self, index):
+        """시도의 저장된 페이지를 지웁니다. (다음 실행에서 다시 가져옵니다.)"""
+        shutil.rmtree(self._province_dir(index), ignore_errors=True)
+
+    def clear(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+def page_hash(arr):
+    """페이지 응답의 판매점 목록(arr)을 키 순서와 관계없이 같은 값이 나오도록 직렬화하여 SHA-256 해시를 구합니다."""
+    body = json.dumps(arr, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(body.encode('utf-8')).hexdigest()
+
+
+class StorePageHashes:
+    """
+    시도별로 마지막으로 DB에 반영한 페이지들의 해시 목록과 반영 시각을 저장합니다. (체크포인트와 달리 동기화가 끝나도 지우지 않습니다.)
+    다음 동기화에서 해시가 같은 페이지의 판매점은 비교를 건너뛰고, 모든 페이지가 같은 시도는 반영 자체를 건너뜁니다.
+    단, 반영 시각 이후 DB에서 바뀐(updated_at이 더 늦은) 판매점은 해시와 관계없이 다시 비교합니다.
+
+    {시도: {'hashes': [페이지 해시, ...], 'synced_at': 반영 시작 시각(ISO 8601)}}
+    """
+
+    def __init__(self, path=PAGE_HASHES_PATH):
+        self.path = path
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                self.hashes = json.load(f)
+        except (OSError, ValueError):
+            self.hashes = {}
+
+    def get(self, sido):
+        """시도의 마지막 페이지 해시 목록을 반환합니다. 없으면 빈 리스트를 반환합니다."""
+        entry = self.hashes.get(sido)
+        return entry.get('hashes', []) if isinstance(entry, dict) else []
+
+    def synced_at(self, sido):
+        """시도의 마지막 반영 시각(datetime)을 반환합니다. 없으면 None을 반환합니다."""
+        entry = self.hashes.get(sido)
+        try:
+            return datetime.datetime.fromisoformat(entry['synced_at'])
+        except (TypeError, KeyError, ValueError):
+            return None
+
+    def update(self, sido, hashes, synced_at):
+        """시도의 페이지 해시 목록과 반영 시각을 바꾸고 바로 파일에 저장합니다."""
+        self.hashes[sido] = {'hashes': list(hashes), 'synced_at': synced_at.isoformat()}
+        tmp_path = f'{self.path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.hashes, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, self.path)
+
+    def clear(self):
+        self.hashes = {}
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
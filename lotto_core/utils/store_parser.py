@@ -1,13 +1,16 @@
 # store_parser.py
 
-import requests
-import time
 import math
 from lotto_core.models import Store
+from lotto_core.utils.crawler import Crawler
+from lotto_core.utils.store_checkpoint import page_hash
+from lotto_core.utils.geo_index import store_geo_index
+from lotto_core.utils.region_tree import region_tree
 from django.db import transaction
+from django.db.models import Count, Max, Q
+from django.utils import timezone
 
-PAGE_INTERVAL = 6
-MAX_RETRIES = 3  # 최대 재시도 횟수
+UPLOAD_BATCH_SIZE = 1000 # bulk_create/bulk_update 한 번에 처리할 판매점 수
 
 
 class StoreParser:
@@ -24,67 +27,140 @@ class StoreParser:
     UPDATE_FIELDS = ['sname', 'phone', 'addr1', 'addr2', 'addr3', 'addr4', 'addr_doro', 'geo_e', 'geo_n', 'enabled']
     INTERNET_STORE_SID = 51100000
 
-    def __init__(self):
+    def __init__(self, crawler=None, store_url=None):
+        """
+        Args:
+            crawler (Crawler, optional): 요청에 사용할 크롤러. Defaults to None (기본 속도 제한의 Crawler).
+            store_url (str, optional): 판매점 조회 주소 (테스트용 가짜 서버 등). Defaults to None (STORE_URL).
+        """
         self.stores = None
+        self.province_stores = {} # 시도 -> 해당 시도의 판매점 원본 목록 (모든 페이지를 가져온 시도만)
+        self.failed = {} # 시도 -> 페이지를 가져오지 못한 오류
+        self.page_hashes = {} # 시도 -> 페이지별 arr 해시 목록
+        self.unchanged_sids = {} # 지난 반영 때와 해시가 같은 페이지의 판매점 ID -> 지난 반영 시각 (그 뒤로 DB가 바뀌지 않았으면 비교 생략)
+        self.identical = {} # 모든 페이지가 지난 반영 때와 같은 시도 -> 지난 반영 시각 (그 뒤로 DB가 바뀌지 않았으면 반영 생략)
+        self.crawler = crawler or Crawler(headers=self.STORE_HEADERS)
+        self.store_url = store_url or self.STORE_URL
 
     def _replace(self, s):
         return s.replace('&&#35;40;', '(').replace('&&#35;41;', ')').replace('&lt;', '<').replace('&gt;', '>').replace('&amp;', '&').replace('&quot;', '"').replace('&nbsp;', ' ').replace('&#35;', '').replace('&apos;', '').strip()
 
-    def parse_store(self):
+    def _fetch_page(self, sido, page):
+        """시도(sido)의 page번째 판매점 목록 페이지를 가져와 JSON으로 반환합니다. (속도 제한/재시도는 crawler가 처리합니다.)"""
+        payload = {
+            'searchType': '1',
+            'nowPage': str(page),
+            'sltSIDO': sido,
+            'sltGUGUN': '',
+            'rtlrSttus': '001'
+        }
+        json_data = self.crawler.post(self.store_url, data=payload).json()
+        print(f'# {self.SIDO.index(sido):02d}. {sido:<3} - {page:03d} / {json_data["totalPage"]:03d}')
+        return json_data
+
+    def _get_page(self, sido, page, checkpoint):
+        """체크포인트에 저장된 페이지가 있으면 그것을, 없으면 가져와 저장한 뒤 반환합니다. 실패하면 예외를 반환합니다."""
+        index = self.SIDO.index(sido)
+        if checkpoint is not None:
+            json_data = checkpoint.load_page(index, page)
+            if json_data is not None:
+                return json_data
+        try:
+            json_data = self._fetch_page(sido, page)
+        except Exception as e:
+            return e
+        if checkpoint is not None:
+            checkpoint.save_page(index, page, json_data)
+        return json_data
+
+    def parse_store(self, checkpoint=None, previous_hashes=None):
+        """
+        모든 시도의 판매점 목록을 가져옵니다.
+        1) 시도별 첫 페이지를 동시에 가져와 전체 페이지 수를 알아낸 뒤,
+        2) 나머지 페이지를 작업자 풀에서 동시에 가져옵니다. (전체 요청 속도는 crawler의 토큰 버킷으로 제한됩니다.)
+        결과는 시도/페이지 순서대로 모읍니다.
+
+        체크포인트(StoreSyncCheckpoint)를 넘기면 가져온 페이지를 바로 저장하고, 이미 저장된 페이지는 다시 요청하지 않으며,
+        DB 반영이 끝난 시도는 건너뜁니다. 일부 시도가 실패해도 나머지 시도는 계속 가져와 province_stores에 담고,
+        실패한 시도는 failed에 기록합니다. 체크포인트 없이 실행하면 실패 시 예외를 발생시킵니다.
+        응답의 시도 이름(BPLCLOCPLC1)이 요청한 시도와 다른 판매점이 있는 시도도 실패로 처리합니다.
+
+        페이지마다 arr의 해시를 구해 previous_hashes(StorePageHashes)의 지난 해시와 비교합니다.
+        해시가 같은 페이지의 판매점은 unchanged_sids에, 모든 페이지가 같은 시도는 identical에 지난 반영 시각과 함께 담아
+        upload_store/sync가 비교/반영을 건너뛸 수 있게 합니다. (반영 시각이 없는 이전 형식의 해시는 사용하지 않습니다.)
+        """
         print(f'## parse_store')
-        stores = []
-        for i1, sido in enumerate(self.SIDO):
-            print(f'# {i1:02d}. {sido:<3} - {1:03d} / ???')
-            payload = {
-                'searchType': '1',
-                'nowPage': '1',
-                'sltSIDO': sido,
-                'sltGUGUN': '',
-                'rtlrSttus': '001'
+        sidos = [
+            sido for i, sido in enumerate(self.SIDO)
+            if checkpoint is None or not checkpoint.is_uploaded(i)
+        ]
+        first_pages = self.crawler.map(lambda sido: self._get_page(sido, 1, checkpoint), sidos)
+
+        pages = {}
+        self.failed = {}
+        for sido, json_data in zip(sidos, first_pages):
+            if isinstance(json_data, Exception):
+                self.failed[sido] = json_data
+            else:
+                pages[sido] = [json_data]
+
+        tasks = [(sido, page) for sido in pages for page in range(2, pages[sido][0]['totalPage'] + 1)]
+        rest_pages = self.crawler.map(lambda task: self._get_page(*task, checkpoint), tasks)
+        for (sido, _), json_data in zip(tasks, rest_pages):
+            if isinstance(json_data, Exception):
+                self.failed.setdefault(sido, json_data)
+            else:
+                pages[sido].append(json_data)
+
+        # 시도 단위 비활성화와 disable_unlisted_stores는 판매점의 addr1이 요청한 시도 이름(SIDO)과 같다는 것을 전제로 합니다.
+        # 응답의 시도 이름이 다르면(전체 이름, 빈 값 등) 판매점이 잘못 비활성화될 수 있으므로 그 시도는 실패로 처리합니다.
+        for sido in list(pages):
+            mismatched = {
+                store.get('BPLCLOCPLC1') for json_data in pages[sido] for store in json_data['arr']
+                if (store.get('BPLCLOCPLC1') or '') != sido
             }
-            for retry in range(MAX_RETRIES):
-                try:
-                    response = requests.post(self.STORE_URL, headers=self.STORE_HEADERS, data=payload)
-                    break  # 성공하면 루프 탈출
-                except requests.exceptions.RequestException as e:
-                    print(f"# Error occurred (attempt {retry + 1}/{MAX_RETRIES}): {e}")
-                    if retry == MAX_RETRIES - 1:
-                        raise  # 마지막 재시도에도 실패하면 예외 발생
-                    time.sleep(10)  # 재시도 전 대기
-            response.raise_for_status()
-            json_data = response.json()
-            stores.extend(json_data['arr'])
-            time.sleep(PAGE_INTERVAL)
-
-            totalPage = json_data['totalPage']
-            for i2 in range(2, totalPage):
-                print(f'# {i1:02d}. {sido:<3} - {i2:03d} / {totalPage:03d}')
-                payload['nowPage'] = str(i2)
-                for retry in range(MAX_RETRIES):
-                    try:
-                        response = requests.post(self.STORE_URL, headers=self.STORE_HEADERS, data=payload)
-                        break  # 성공하면 루프 탈출
-                    except requests.exceptions.RequestException as e:
-                        print(f"# Error occurred (attempt {retry + 1}/{MAX_RETRIES}): {e}")
-                        if retry == MAX_RETRIES - 1:
-                            raise  # 마지막 재시도에도 실패하면 예외 발생
-                        time.sleep(10)  # 재시도 전 대기
-                response.raise_for_status()
-                json_data = response.json()
-                stores.extend(json_data['arr'])
-                time.sleep(PAGE_INTERVAL)
-
-        for i, r in enumerate(stores):
-            stores[i]['FIRMNM'] = self._replace(stores[i]['FIRMNM'])
-            stores[i]['BPLCLOCPLCDTLADRES'] = self._replace(stores[i]['BPLCLOCPLCDTLADRES'])
-            stores[i]['BPLCDORODTLADRES'] = self._replace(stores[i]['BPLCDORODTLADRES'])
-
-        self.stores = stores        
+            if mismatched:
+                self.failed[sido] = ValueError(f"{sido} 판매점의 시도 이름(BPLCLOCPLC1)이 다릅니다: {sorted(map(str, mismatched))[:5]}")
+                del pages[sido]
+                if checkpoint is not None: # 잘못된 응답은 이어받지 않도록 지웁니다.
+                    checkpoint.discard(self.SIDO.index(sido))
+
+        if self.failed and checkpoint is None:
+            raise next(iter(self.failed.values()))
+
+        self.province_stores = {}
+        self.page_hashes = {}
+        self.unchanged_sids = {}
+        self.identical = {}
+        for sido in sidos:
+            if sido in self.failed:
+                continue
+            hashes = [page_hash(json_data['arr']) for json_data in pages[sido]]
+            self.page_hashes[sido] = hashes
+            synced_at = previous_hashes.synced_at(sido) if previous_hashes is not None else None
+            if synced_at is not None:
+                previous = previous_hashes.get(sido)
+                if hashes == previous:
+                    self.identical[sido] = synced_at
+                # 페이지 위치가 밀려도 내용이 같으면 같은 페이지로 봅니다.
+                previous = set(previous)
+                for h, json_data in zip(hashes, pages[sido]):
+                    if h in previous:
+                        self.unchanged_sids.update((int(store['RTLRID']), synced_at) for store in json_data['arr'])
+
+            stores = [store for json_data in pages[sido] for store in json_data['arr']]
+            for store in stores:
+                store['FIRMNM'] = self._replace(store['FIRMNM'])
+                store['BPLCLOCPLCDTLADRES'] = self._replace(store['BPLCLOCPLCDTLADRES'])
+                store['BPLCDORODTLADRES'] = self._replace(store['BPLCDORODTLADRES'])
+            self.province_stores[sido] = stores
+
+        self.stores = [store for stores in self.province_stores.values() for store in stores]
         return self # 메서드 체이닝을 위해 self 반환
 
-    def _prepare_stores_data(self):
+    def _prepare_stores_data(self, stores):
         """파싱된 원본 데이터를 Django 모델 필드에 맞게 정제하고 타입을 변환합니다."""
-        if not self.stores:
+        if not stores:
             return {}
         
         def safe_float(value, default=0.0):
@@ -105,63 +181,176 @@ class StoreParser:
                 'geo_e': safe_float(s.get('LONGITUDE')),
                 'geo_n': safe_float(s.get('LATITUDE')),
                 'enabled': True
-            } for s in self.stores
+            } for s in stores
         }
 
-    def upload_store(self):
+    def _diff_fields(self, parsed_data, db_values):
+        """파싱된 값과 DB 값이 다른 필드 목록을 반환합니다. (좌표는 부동소수 오차를 허용합니다.)"""
+        changed = []
+        for field, db_value in zip(self.UPDATE_FIELDS, db_values):
+            parsed_value = parsed_data[field]
+            if field in ['geo_e', 'geo_n']:
+                if not math.isclose(parsed_value, db_value):
+                    changed.append(field)
+            elif parsed_value != db_value:
+                changed.append(field)
+        return changed
+
+    def upload_store(self, sido=None):
+        """
+        파싱된 판매점 목록을 DB와 집합 단위로 동기화합니다. (하나의 트랜잭션)
+        sido를 주면 그 시도의 판매점만 반영하며, 비활성화도 그 시도(addr1)의 판매점 중에서만 판단합니다.
+        - 신규 판매점: bulk_create
+        - 변경된 판매점: 바뀐 필드 조합별로 묶어 그 필드만 bulk_update
+        - 목록에서 사라진 판매점: 한 번의 UPDATE ... WHERE sid IN (...)으로 비활성화
+
+        bulk_update/update는 auto_now 필드를 갱신하지 않으므로 updated_at을 직접 지정합니다.
+
+        Returns:
+            dict: {'created', 'updated', 'disabled', 'unchanged'} 판매점 수. 파싱된 데이터가 없으면 None.
+        """
         print(f'## upload_store')
 
-        parsed_stores_map = self._prepare_stores_data()
+        parsed_stores_map = self._prepare_stores_data(self.stores if sido is None else self.province_stores.get(sido))
         if not parsed_stores_map:
             print("# 파싱된 판매점 데이터가 없어 업로드를 건너뜁니다.")
-            return
+            return None
 
-        print("# Django DB에서 모든 판매점 정보를 가져오는 중...")
-        existing_stores_map = {store.sid: store for store in Store.objects.all()}
-        print(f"# 총 {len(existing_stores_map)}개의 판매점 정보를 DB에서 가져왔습니다.")
+        # 시도 단위로 반영할 때는 그 시도의 판매점과, 다른 시도에서 옮겨 왔을 수 있는 파싱된 판매점만 비교합니다.
+        existing_qs = Store.objects.all() if sido is None else Store.objects.filter(Q(addr1=sido) | Q(sid__in=list(parsed_stores_map)))
+        print(f"# Django DB에서 {sido or '모든'} 판매점 정보를 가져오는 중...")
+        existing_values_map = {}
+        existing_updated_at = {}
+        for row in existing_qs.values_list('sid', 'updated_at', *self.UPDATE_FIELDS).iterator(chunk_size=UPLOAD_BATCH_SIZE):
+            existing_values_map[row[0]] = row[2:]
+            existing_updated_at[row[0]] = row[1]
+        print(f"# 총 {len(existing_values_map)}개의 판매점 정보를 DB에서 가져왔습니다.")
 
         parsed_sids = set(parsed_stores_map.keys())
-        existing_sids = set(existing_stores_map.keys())
+        existing_sids = set(existing_values_map.keys())
+        now = timezone.now()
 
         # 1. 신규 추가 대상
-        sids_to_add = parsed_sids - existing_sids
-        print(f"# 신규 추가 대상: {len(sids_to_add)}개")
-        for sid in sids_to_add:
-            store_data = parsed_stores_map[sid]
-            Store.objects.create(sid=sid, **store_data)
-            print(f"[INSERT] 판매점 생성: {sid} - {store_data['sname']}")
-
-        # 2. 업데이트 대상
-        sids_to_check_update = parsed_sids.intersection(existing_sids)
-        print(f"# 업데이트 점검 대상: {len(sids_to_check_update)}개")
-        for sid in sids_to_check_update:
-            store_obj = existing_stores_map[sid]
+        stores_to_create = [Store(sid=sid, **parsed_stores_map[sid]) for sid in sorted(parsed_sids - existing_sids)]
+
+        # 2. 업데이트 대상: 바뀐 필드 조합별로 묶습니다.
+        updates_by_fields = {}
+        unchanged = 0
+        for sid in parsed_sids & existing_sids:
+            synced_at = self.unchanged_sids.get(sid)
+            if synced_at is not None and existing_updated_at[sid] <= synced_at: # 지난 반영 때와 같은 페이지이고 그 뒤로 DB도 그대로인 판매점
+                unchanged += 1
+                continue
             parsed_data = parsed_stores_map[sid]
-            is_changed = False
-            for field in self.UPDATE_FIELDS:
-                parsed_value = parsed_data[field]
-                db_value = getattr(store_obj, field)
-                if field in ['geo_e', 'geo_n'] and not math.isclose(parsed_value, db_value):
-                    setattr(store_obj, field, parsed_value)
-                    is_changed = True
-                elif parsed_value != db_value:
-                    setattr(store_obj, field, parsed_value)
-                    is_changed = True
-            if is_changed:
-                store_obj.enabled = True
-                store_obj.save()
-                print(f"[UPDATE] 판매점 수정: {sid} - {store_obj.sname}")
-
-        # 3. 비활성화 대상
-        sids_to_disable = existing_sids - parsed_sids
-        print(f"# 비활성화 점검 대상: {len(sids_to_disable)}개")
-        for sid in sids_to_disable:
-            if sid == self.INTERNET_STORE_SID:
+            changed = self._diff_fields(parsed_data, existing_values_map[sid])
+            if not changed:
+                unchanged += 1
                 continue
-            store_obj = existing_stores_map[sid]
-            if store_obj.enabled:
-                store_obj.enabled = False
-                store_obj.save()
-                print(f"[DISABLE] 판매점 비활성화: {sid} - {store_obj.sname}")
+            store_obj = Store(sid=sid, updated_at=now, **parsed_data)
+            updates_by_fields.setdefault(tuple(changed), []).append(store_obj)
+
+        # 3. 비활성화 대상: 목록에서 사라진 활성 판매점 (인터넷 판매점 제외)
+        enabled_index = self.UPDATE_FIELDS.index('enabled')
+        addr1_index = self.UPDATE_FIELDS.index('addr1')
+        sids_to_disable = [
+            sid for sid in existing_sids - parsed_sids
+            if sid != self.INTERNET_STORE_SID and existing_values_map[sid][enabled_index]
+            and (sido is None or existing_values_map[sid][addr1_index] == sido)
+        ]
+
+        with transaction.atomic():
+            Store.objects.bulk_create(stores_to_create, batch_size=UPLOAD_BATCH_SIZE)
+            for fields, stores in updates_by_fields.items():
+                Store.objects.bulk_update(stores, [*fields, 'updated_at'], batch_size=UPLOAD_BATCH_SIZE)
+            disabled = Store.objects.filter(sid__in=sids_to_disable).update(enabled=False, updated_at=now) if sids_to_disable else 0
+
+        for store_obj in stores_to_create:
+            print(f"[INSERT] 판매점 생성: {store_obj.sid} - {store_obj.sname}")
+        for fields, stores in updates_by_fields.items():
+            for store_obj in stores:
+                print(f"[UPDATE] 판매점 수정: {store_obj.sid} - {store_obj.sname} ({', '.join(fields)})")
+        for sid in sids_to_disable:
+            print(f"[DISABLE] 판매점 비활성화: {sid}")
+
+        # 주변 판매점 검색 인덱스와 지역 트리를 다시 만들도록 표시합니다.
+        store_geo_index.invalidate()
+        region_tree.invalidate()
+
+        summary = {
+            'created': len(stores_to_create),
+            'updated': sum(len(stores) for stores in updates_by_fields.values()),
+            'disabled': disabled,
+            'unchanged': unchanged,
+        }
+        print(f"# {sido or '전체'} 판매점 정보 동기화가 완료되었습니다. (생성 {summary['created']}, 수정 {summary['updated']}, "
+              f"비활성화 {summary['disabled']}, 변경 없음 {summary['unchanged']})")
+        return summary
+
+    def disable_unlisted_stores(self):
+        """
+        시도 목록(SIDO)에 속하지 않는 활성 판매점을 비활성화합니다. (인터넷 판매점 제외)
+        시도 단위 반영(upload_store(sido))에서는 판단할 수 없는 판매점을, 모든 시도를 반영한 뒤 한 번에 정리합니다.
+        """
+        return (
+            Store.objects.filter(enabled=True).exclude(addr1__in=self.SIDO).exclude(sid=self.INTERNET_STORE_SID)
+            .update(enabled=False, updated_at=timezone.now())
+        )
+
+    def _is_untouched(self, sido):
+        """
+        지난 반영(identical[sido]) 이후 DB에서 이 시도의 판매점이 바뀌지 않았는지 확인합니다. (한 번의 집계 쿼리)
+        목록의 판매점이 모두 DB에 있고, 이 시도 또는 목록의 판매점 중 그 뒤로 갱신(updated_at)된 판매점이 없어야 합니다.
+        (다른 곳에서 비활성화/수정/추가된 판매점이 있으면 해시가 같아도 다시 비교합니다.)
+        """
+        parsed_sids = {int(store['RTLRID']) for store in self.province_stores[sido]}
+        agg = Store.objects.filter(Q(addr1=sido) | Q(sid__in=parsed_sids)).aggregate(
+            listed=Count('sid', filter=Q(sid__in=parsed_sids)),
+            updated_at=Max('updated_at'),
+        )
+        return agg['listed'] == len(parsed_sids) and (agg['updated_at'] is None or agg['updated_at'] <= self.identical[sido])
+
+    def sync(self, checkpoint, page_hashes=None):
+        """
+        체크포인트를 사용해 판매점 목록을 가져오고, 모든 페이지를 가져온 시도부터 하나씩 DB에 반영합니다.
+        일부 시도가 실패하면 성공한 시도는 반영해 두고 예외를 발생시키며, 다시 실행하면 실패한 시도부터 이어서 진행합니다.
+        모든 시도가 끝나면 체크포인트를 지웁니다.
+
+        page_hashes(StorePageHashes)를 주면 지난 반영 때와 모든 페이지가 같고 그 뒤로 DB도 바뀌지 않은 시도는 건너뛰고,
+        반영한 시도의 페이지 해시와 반영 시각을 갱신합니다.
+
+        Args:
+            checkpoint (StoreSyncCheckpoint): 진행 상황 체크포인트.
+            page_hashes (StorePageHashes, optional): 시도별 페이지 해시 저장소. Defaults to None.
+
+        Returns:
+            dict: 이번 실행에서 반영한 {'created', 'updated', 'disabled', 'unchanged'} 판매점 수 합계.
+        """
+        if checkpoint.start():
+            print("# 이전 판매점 동기화 체크포인트에서 이어서 진행합니다.")
+        self.parse_store(checkpoint, page_hashes)
+
+        totals = {'created': 0, 'updated': 0, 'disabled': 0, 'unchanged': 0}
+        for sido, stores in self.province_stores.items():
+            if sido in self.identical and self._is_untouched(sido):
+                print(f"# {sido}: 지난 반영 때와 모든 페이지가 같아 반영을 건너뜁니다.")
+                totals['unchanged'] += len(stores)
+            else:
+                synced_at = timezone.now() # 반영 중 다른 곳에서 바뀐 판매점도 다음 동기화에서 비교하도록 시작 시각을 기록합니다.
+                summary = self.upload_store(sido)
+                if summary:
+                    for key in totals:
+                        totals[key] += summary[key]
+                if page_hashes is not None:
+                    page_hashes.update(sido, self.page_hashes[sido], synced_at)
+            checkpoint.mark_uploaded(self.SIDO.index(sido))
+
+        if self.failed:
+            raise RuntimeError(
+                f"{', '.join(self.failed)} 판매점 목록을 가져오지 못했습니다. 다시 실행하면 이어서 진행합니다. ({next(iter(self.failed.values()))})"
+            )
 
-        print("# 판매점 정보 동기화가 완료되었습니다.")
+        totals['disabled'] += self.disable_unlisted_stores()
+        checkpoint.clear()
+        store_geo_index.invalidate()
+        region_tree.invalidate()
+        return totals
@@ -1,13 +1,15 @@
 # wins_parser.py
 
-import requests
+import re
 from bs4 import BeautifulSoup
-import time
 from collections import Counter
 from lotto_core.models import StoreWin, Round, Store
+from lotto_core.utils.crawler import Crawler
+from lotto_core.utils.geo_index import store_geo_index
+from lotto_core.utils.leaderboard import store_leaderboard
 from django.db import transaction, models
 
-PAGE_INTERVAL = 6
+SELF_SUBMIT_PATTERN = re.compile(r'selfSubmit\((\d+)\)') # 페이지 표시줄 링크의 페이지 이동 함수
 
 
 class WinsParser:
@@ -17,56 +19,89 @@ class WinsParser:
         'Referer': 'https://dhlottery.co.kr/store.do?method=topStore'
     }
 
-    def __init__(self):
+    def __init__(self, crawler=None, storewin_url=None):
+        """
+        Args:
+            crawler (Crawler, optional): 요청에 사용할 크롤러. Defaults to None (기본 속도 제한의 Crawler).
+            storewin_url (str, optional): 당첨 판매점 조회 주소 (테스트용 가짜 서버 등). Defaults to None (STOREWIN_URL).
+        """
         self.round_no = 0
         self.wins = None
-        self.session = requests.Session()
-        self.session.headers.update(self.HEADERS)
+        self.crawler = crawler or Crawler(headers=self.HEADERS)
+        self.storewin_url = storewin_url or self.STOREWIN_URL
 
     def parse_wins(self, round):
+        """
+        회차의 1, 2등 당첨 판매점 목록을 가져옵니다.
+        1) 첫 페이지에서 1등 목록과 2등 첫 페이지, 페이지 표시줄의 전체 페이지 수를 읽고,
+        2) 2등 나머지 페이지를 작업자 풀에서 동시에 가져와 파싱합니다. (전체 요청 속도는 crawler의 토큰 버킷으로 제한됩니다.)
+        페이지 표시줄이 일부 페이지만 보여 주는 경우, 마지막으로 가져온 페이지에서 더 뒤의 페이지가 보이면 이어서 가져옵니다.
+        결과는 페이지 순서대로 self.wins에 저장됩니다.
+        """
         self.round_no = round
         print(f'##  parse_wins: {self.round_no}')
-        resp = self.session.get(f'{self.STOREWIN_URL}&drwNo={self.round_no}')
-        resp.raise_for_status()
-        soup = BeautifulSoup(resp.text, 'html.parser')
-
-        wins = []
-
+        soup = self._fetch_page(1)
         groups = soup.select('.group_content')
-        
+
         # 1등, 2등(1페이지)
         print(f'# parse first prize store')
-        first_table = groups[0].select_one('.tbl_data')
-        wins = wins + self._parse_storewin_1st_table(first_table)
-
-        # 2등 (1페이지)
-        print(f'# parse second prize store (1/?)')
-        second_table = groups[1].select_one('.tbl_data')
-        wins = wins + self._parse_storewin_2nd_table(second_table)
+        wins = self._parse_storewin_1st_table(groups[0].select_one('.tbl_data'))
+        total_page = self._total_pages(soup)
+        print(f'# parse second prize store (1/{total_page})')
+        wins = wins + self._parse_storewin_2nd_table(groups[1].select_one('.tbl_data'))
 
         # 2등(2페이지~)
-        cur_page = 1
-        while (True):
-            cur_page = cur_page + 1
-            time.sleep(PAGE_INTERVAL)
-            resp = self.session.get(f'{self.STOREWIN_URL}&drwNo={self.round_no}&nowPage={cur_page}')
-            resp.raise_for_status()
-            soup = BeautifulSoup(resp.text, 'html.parser')
-            pages = soup.select('.paginate_common a')
-            cur_page_exists = False
-            for a in pages:
-                if (a.get('title') != None):
-                    cur_page_exists = True
-                    break
-            if not cur_page_exists: # 마지막 페이지 넘어감
+        last_page = 1
+        while last_page < total_page:
+            pages = range(last_page + 1, total_page + 1)
+            results = self.crawler.map(lambda page: self._parse_second_page(page, total_page), pages)
+            for page_wins, _ in results:
+                wins = wins + page_wins
+            if any(page_total == 0 for _, page_total in results): # 마지막 페이지를 넘어간 페이지가 있으면 더 가져오지 않습니다.
                 break
-            groups = soup.select('.group_content')
-            print(f'# parse second prize store ({cur_page}/?)')
-            second_table = groups[1].select_one('.tbl_data')
-            wins = wins + self._parse_storewin_2nd_table(second_table)
+            last_page = total_page
+            total_page = max(total_page, results[-1][1])
 
         self.wins = wins
 
+    def _fetch_page(self, page):
+        """회차 당첨 판매점 목록의 page번째 페이지를 가져와 파싱한 결과(BeautifulSoup)를 반환합니다. (속도 제한/재시도는 crawler가 처리합니다.)"""
+        url = f'{self.storewin_url}&drwNo={self.round_no}'
+        if page > 1:
+            url = f'{url}&nowPage={page}'
+        resp = self.crawler.get(url)
+        return BeautifulSoup(resp.text, 'html.parser')
+
+    def _total_pages(self, soup):
+        """
+        페이지 표시줄(.paginate_common)에서 가장 큰 페이지 번호를 반환합니다.
+        페이지 번호는 링크 글자와 페이지 이동 함수(selfSubmit)의 인자에서만 읽습니다. (onclick의 다른 숫자는 무시합니다.)
+        현재 페이지 표시(title 속성)가 없으면 마지막 페이지를 넘어간 것이므로 0을 반환합니다.
+        """
+        links = soup.select('.paginate_common a')
+        if not any(a.get('title') is not None for a in links):
+            return 0
+        pages = [1]
+        for a in links:
+            match = SELF_SUBMIT_PATTERN.search(a.get('onclick', ''))
+            if match:
+                pages.append(int(match.group(1)))
+            text = a.get_text(strip=True)
+            if text.isdigit():
+                pages.append(int(text))
+        return max(pages)
+
+    def _parse_second_page(self, page, total_page):
+        """2등 page번째 페이지를 가져와 (당첨 목록, 페이지 표시줄의 전체 페이지 수)를 반환합니다."""
+        soup = self._fetch_page(page)
+        page_total = self._total_pages(soup)
+        if page_total == 0: # 마지막 페이지 넘어감
+            return [], 0
+        print(f'# parse second prize store ({page}/{total_page})')
+        groups = soup.select('.group_content')
+        wins = self._parse_storewin_2nd_table(groups[1].select_one('.tbl_data'))
+        return wins, page_total if wins else 0 # 빈 페이지도 마지막 페이지를 넘어간 것으로 봅니다.
+
     def _parse_storewin_1st_table(self, table_soup):
         cells = table_soup.select('tbody tr td')
         if len(cells) == 1:
@@ -192,11 +227,20 @@ class WinsParser:
         if not all_sids:
             return
 
+        # 판매점 상세 조회에서 매번 집계하지 않도록 당첨금 합계와 최근 당첨일도 함께 누적합니다.
         stores_to_update = Store.objects.filter(sid__in=all_sids)
         for store in stores_to_update:
             store.matches1 += rank1_counts.get(store.sid, 0)
             store.matches2 += rank2_counts.get(store.sid, 0)
+            store.amount1_total += rank1_counts.get(store.sid, 0) * round_instance.amount1
+            store.amount2_total += rank2_counts.get(store.sid, 0) * round_instance.amount2
+            if store.last_win_date is None or store.last_win_date < round_instance.date:
+                store.last_win_date = round_instance.date
 
         with transaction.atomic():
-            Store.objects.bulk_update(stores_to_update, ['matches1', 'matches2'])
+            Store.objects.bulk_update(stores_to_update, ['matches1', 'matches2', 'amount1_total', 'amount2_total', 'last_win_date'])
             print(f"# {len(stores_to_update)}개 판매점의 1, 2등 당첨 횟수를 업데이트했습니다.")
+
+        # 1등 배출 판매점이 바뀌었을 수 있으므로 주변 판매점 검색 인덱스와 판매점 순위를 다시 만들도록 표시합니다.
+        store_geo_index.invalidate()
+        store_leaderboard.invalidate()
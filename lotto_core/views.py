@@ -1,14 +1,20 @@
-from django.http import JsonResponse
-from django.views.decorators.http import require_GET, require_POST
+from django.http import JsonResponse, HttpResponse
+from django.views.decorators.http import require_GET, require_POST, condition
 from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 import random
 import json
 from django.core.exceptions import ValidationError
 from django.forms.models import model_to_dict
-from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
 import os
 
 from . import services
+from .utils.pagination import paginate
+
+# 목록 API 응답 항목 필드
+USER_NUMBER_FIELDS = ['id', 'number1', 'number2', 'number3', 'number4', 'number5', 'number6', 'created_at']
+PURCHASED_NUMBER_FIELDS = ['id', 'rid', 'number1', 'number2', 'number3', 'number4', 'number5', 'number6', 'result', 'created_at']
+SHARED_NUMBER_FIELDS = ['id', 'rid', 'number1', 'number2', 'number3', 'number4', 'number5', 'number6', 'description', 'result', 'created_at', 'user__nick']
 
 
 # INFO
@@ -43,17 +49,49 @@ def get_db_updated(request):
 # ROUND
 
 
+# Accept 헤더로 요청할 수 있는 회차 목록 인코딩
+ROUND_ACCEPT_FORMATS = {
+    'application/octet-stream': 'binary',
+    'application/vnd.lottodosa.columns+json': 'columns',
+}
+
+
+def _all_rounds_format(request):
+    """format 파라미터를 우선 사용하고, 없으면 Accept 헤더로 회차 목록의 인코딩 형식을 결정합니다."""
+    fmt = request.GET.get('format')
+    if fmt:
+        return fmt
+    accept = request.headers.get('Accept', '')
+    for media_type, accept_fmt in ROUND_ACCEPT_FORMATS.items():
+        if media_type in accept:
+            return accept_fmt
+    return 'json'
+
+
+def _all_rounds_etag(request):
+    try:
+        return services.get_all_rounds_payload(_all_rounds_format(request)).etag
+    except Exception:
+        return None # 오류는 뷰에서 처리합니다.
+
+
 @require_GET
+@condition(etag_func=_all_rounds_etag)
 def get_all_rounds(request):
     """
-    모든 회차 정보를 JSON 형태로 응답하는 API 뷰.
+    모든 회차 정보를 응답하는 API 뷰.
+    미리 직렬화된 스냅샷을 그대로 내려주며, If-None-Match가 현재 ETag와 같으면 304(Not Modified)를 응답합니다.
+    format 파라미터(json/columns/binary) 또는 Accept 헤더로 인코딩 형식을 선택할 수 있습니다. (기본값: json)
     """
     try:
-        all_rounds = services.get_all_rounds()
-        # QuerySet을 직접 JSON으로 변환할 수 없으므로, values()를 사용해 딕셔너리 리스트로 변환합니다.
-        data = list(all_rounds.values())
+        payload = services.get_all_rounds_payload(_all_rounds_format(request))
+        response = HttpResponse(payload.body, content_type=payload.content_type, status=200)
+        response['Cache-Control'] = 'no-cache' # 캐시는 하되, 매번 ETag로 재검증하도록 합니다.
+        response['Vary'] = 'Accept'
+        return response
 
-        return JsonResponse(data, safe=False, status=200, json_dumps_params={'ensure_ascii': False})
+    except ValidationError as e:
+        return JsonResponse({'status': 'error', 'message': e.message}, status=400)
 
     except Exception as e:
         return JsonResponse({
@@ -63,6 +101,42 @@ def get_all_rounds(request):
         }, status=500)
 
 
+@require_GET
+def get_rounds_since(request):
+    """
+    마지막 동기화 이후 추가되거나 변경된 회차 정보만 응답하는 API 뷰.
+    GET 요청으로 since_rid(마지막으로 받은 회차)와 since(마지막으로 받은 갱신 시각, ISO 8601)를 받습니다.
+    응답의 last_rid, updated_at을 다음 요청의 since_rid, since로 그대로 사용하면 됩니다.
+    """
+    since_rid_str = request.GET.get('since_rid')
+    since_str = request.GET.get('since')
+
+    since_rid = None
+    if since_rid_str:
+        try:
+            since_rid = int(since_rid_str)
+        except (ValueError, TypeError):
+            return JsonResponse({'status': 'error', 'message': 'since_rid는 유효한 정수여야 합니다.'}, status=400)
+
+    since = None
+    if since_str:
+        try:
+            since = parse_datetime(since_str)
+        except ValueError:
+            since = None
+        if since is None:
+            return JsonResponse({'status': 'error', 'message': 'since는 유효한 날짜/시간(ISO 8601) 형식이어야 합니다.'}, status=400)
+        if timezone.is_naive(since):
+            since = timezone.make_aware(since)
+
+    try:
+        data = services.get_rounds_since(since_rid=since_rid, since=since)
+        return JsonResponse(data, status=200, json_dumps_params={'ensure_ascii': False})
+
+    except Exception as e:
+        return JsonResponse({'status': 'error', 'message': '회차 변경분 조회 중 예상치 못한 오류가 발생했습니다.'}, status=500)
+
+
 @require_GET
 def get_last_round(request):
     """
@@ -118,12 +192,20 @@ def get_round(request):
 def get_regions(request):
     """
     지역 정보(시/도, 시/군/구, 읍/면/동)를 계층적으로 조회하는 API 뷰.
+    tree=1이면 지역명 대신 판매점 수와 1/2등 당첨 수 합계를 포함한 하위 트리 전체를 한 번에 응답합니다.
     """
     addr1 = request.GET.get('addr1')
     addr2 = request.GET.get('addr2')
+    tree = request.GET.get('tree') in ('1', 'true', 'True')
 
     try:
-        regions = services.get_regions(addr1=addr1, addr2=addr2)
+        if tree and not addr1:
+            # 전체 트리는 미리 직렬화된 JSON을 그대로 응답합니다.
+            return HttpResponse(services.get_region_tree_body(), content_type='application/json', status=200)
+        if tree:
+            regions = services.get_region_tree(addr1=addr1, addr2=addr2)
+        else:
+            regions = services.get_regions(addr1=addr1, addr2=addr2)
         return JsonResponse(regions, safe=False, status=200, json_dumps_params={'ensure_ascii': False})
 
     except Exception as e:
@@ -136,72 +218,41 @@ def get_stores_by_region(request):
     지역별 판매점 목록을 조회하는 API 뷰.
     GET 요청으로 addr1, addr2, addr3, page, size를 받습니다.
     - page=0이면 전체, page>=1이면 페이지네이션을 적용합니다.
+    - page 대신 after_sid(첫 페이지는 빈 값 또는 0)와 size를 주면 키셋 페이지네이션을 적용합니다.
+      COUNT/OFFSET 없이 조회하므로 뒤쪽 페이지도 첫 페이지와 같은 비용이 들며,
+      응답의 next_after_sid를 다음 요청의 after_sid로 사용합니다. (마지막 페이지면 None)
     """
     addr1 = request.GET.get('addr1')
     addr2 = request.GET.get('addr2')
     addr3 = request.GET.get('addr3')
-    page_str = request.GET.get('page')
-
-    if page_str is None:
-        return JsonResponse({'status': 'error', 'message': 'page는 필수 입력값입니다.'}, status=400)
 
     try:
         stores_qs = services.get_stores_by_region(addr1, addr2, addr3)
-
-        try:
-            page = int(page_str)
-        except (ValueError, TypeError):
-            return JsonResponse({'status': 'error', 'message': 'page는 유효한 정수여야 합니다.'}, status=400)
-
-        if page == 0:
-            # page가 0이면 전체 항목을 페이지네이션 구조에 맞춰 반환
-            all_items = list(stores_qs.values('sid', 'sname', 'phone', 'addr_doro', 'addr4', 'geo_n', 'geo_e', 'matches1', 'matches2'))
-            data = {
-                'total_items': len(all_items),
-                'total_pages': 1,
-                'current_page': 0,
-                'items': all_items
-            }
-            return JsonResponse(data, status=200, json_dumps_params={'ensure_ascii': False})
-
-        elif page >= 1:
-            # page가 1 이상이면 size 파라미터가 필수
-            size_str = request.GET.get('size')
-            if not size_str:
-                return JsonResponse({'status': 'error', 'message': 'page가 1 이상일 경우 size는 필수 입력값입니다.'}, status=400)
-
-            try:
-                size = int(size_str)
-                if size <= 0: raise ValueError
-            except (ValueError, TypeError):
-                return JsonResponse({'status': 'error', 'message': 'size는 0보다 큰 정수여야 합니다.'}, status=400)
-
-            paginator = Paginator(stores_qs, size)
-            try:
-                paginated_page = paginator.page(page)
-            except EmptyPage:
-                return JsonResponse({'status': 'error', 'message': '요청한 페이지가 존재하지 않습니다.'}, status=404)
-
-            data = {
-                'total_items': paginator.count,
-                'total_pages': paginator.num_pages,
-                'current_page': paginated_page.number,
-                'items': list(paginated_page.object_list.values('sid', 'sname', 'phone', 'addr_doro', 'addr4', 'geo_n', 'geo_e', 'matches1', 'matches2'))
-            }
-            return JsonResponse(data, status=200, json_dumps_params={'ensure_ascii': False})
+        return paginate(request, stores_qs, services.STORE_LIST_FIELDS, count='cached',
+                        cursor_param='after_sid', next_key='next_after_sid')
 
     except Exception as e:
         return JsonResponse({'status': 'error', 'message': '지역별 판매점 조회 중 예상치 못한 오류가 발생했습니다.'}, status=500)
 
 
+
 @require_GET
 def get_nearby_stores(request):
     """
     주어진 좌표 근처의 판매점 목록을 JSON 형태로 응답하는 API 뷰.
     GET 요청으로 geo_n(위도)과 geo_e(경도)를 받습니다.
+    가까운 순서로 정렬되며, 각 판매점에 기준점까지의 거리(distance, m)가 포함됩니다.
+
+    선택 파라미터 radius_m(검색 반경), limit(최대 개수), cursor(다음 페이지 커서), lucky(1이면 1등 배출점만) 중
+    하나라도 주어지면 {'items': [...], 'next_cursor': ...} 형태로 응답합니다.
+    주어지지 않으면 기존과 같이 판매점 배열로 응답합니다. (반경 약 10km, 최소 5개, 최대 100개)
     """
     geo_n_str = request.GET.get('geo_n')
     geo_e_str = request.GET.get('geo_e')
+    radius_str = request.GET.get('radius_m')
+    limit_str = request.GET.get('limit')
+    cursor = request.GET.get('cursor')
+    lucky = request.GET.get('lucky') in ('1', 'true', 'True')
 
     if not geo_n_str or not geo_e_str:
         return JsonResponse({
@@ -215,11 +266,28 @@ def get_nearby_stores(request):
     except (ValueError, TypeError):
         return JsonResponse({'status': 'error', 'message': '위도와 경도는 유효한 숫자여야 합니다.'}, status=400)
 
+    if not (-90 <= latitude <= 90 and -180 <= longitude <= 180): # NaN도 여기서 걸러집니다.
+        return JsonResponse({'status': 'error', 'message': '위도는 -90~90, 경도는 -180~180 범위여야 합니다.'}, status=400)
+
+    paged = any(v is not None for v in (radius_str, limit_str, cursor, request.GET.get('lucky')))
+    options = {}
     try:
-        nearby_stores = services.get_nearby_stores(latitude, longitude)
-        data = list(nearby_stores.values('sid', 'sname', 'phone', 'addr_doro', 'addr4', 'geo_n', 'geo_e', 'matches1', 'matches2'))
-        return JsonResponse(data, safe=False, status=200, json_dumps_params={'ensure_ascii': False})
+        if radius_str is not None:
+            options['radius_m'] = float(radius_str)
+            options['min_stores'] = 0 # 반경을 직접 지정하면 반경 밖의 판매점은 포함하지 않습니다.
+        if limit_str is not None:
+            options['limit'] = int(limit_str)
+    except (ValueError, TypeError):
+        return JsonResponse({'status': 'error', 'message': 'radius_m과 limit은 유효한 숫자여야 합니다.'}, status=400)
 
+    try:
+        result = services.get_nearby_stores(latitude, longitude, cursor=cursor, lucky=lucky, **options)
+        if paged:
+            return JsonResponse(result, status=200, json_dumps_params={'ensure_ascii': False})
+        return JsonResponse(result['items'], safe=False, status=200, json_dumps_params={'ensure_ascii': False})
+
+    except ValidationError as e:
+        return JsonResponse({'status': 'error', 'message': e.message}, status=400)
     except Exception as e:
         return JsonResponse({'status': 'error', 'message': '주변 판매점 조회 중 예상치 못한 오류가 발생했습니다.'}, status=500)
 
@@ -276,70 +344,25 @@ def get_top_stores(request):
     """
     1등 당첨 횟수가 많은 순서로 판매점 목록을 조회하는 API 뷰. 
     GET 요청으로 page를 받습니다. page=0이면 전체, page>=1이면 페이지네이션을 적용합니다.
+    page 대신 after(첫 페이지는 빈 값, 이후는 'matches1,matches2,sid')와 size를 주면 키셋 페이지네이션을 적용합니다.
+    응답의 next_after를 다음 요청의 after로 사용합니다. (마지막 페이지면 None)
     """
-    page_str = request.GET.get('page')
-
-    if page_str is None:
-        return JsonResponse({'status': 'error', 'message': 'page는 필수 입력값입니다.'}, status=400)
-
     try:
         top_stores_qs = services.get_top_stores()
-
-        try:
-            page = int(page_str)
-        except (ValueError, TypeError):
-            return JsonResponse({'status': 'error', 'message': 'page는 유효한 정수여야 합니다.'}, status=400)
-
-        if page == 0:
-            # page가 0이면 전체 항목을 페이지네이션 구조에 맞춰 반환
-            all_items = list(top_stores_qs.values('sid', 'sname', 'phone', 'addr_doro', 'addr4', 'geo_n', 'geo_e', 'matches1', 'matches2', 'enabled'))
-            data = {
-                'total_items': len(all_items),
-                'total_pages': 1,
-                'current_page': 0,
-                'items': all_items
-            }
-            return JsonResponse(data, status=200, json_dumps_params={'ensure_ascii': False})
-
-        elif page >= 1:
-            # page가 1 이상이면 size 파라미터가 필수
-            size_str = request.GET.get('size')
-            if not size_str:
-                return JsonResponse({'status': 'error', 'message': 'page가 1 이상일 경우 size는 필수 입력값입니다.'}, status=400)
-
-            try:
-                size = int(size_str)
-                if size <= 0: raise ValueError
-            except (ValueError, TypeError):
-                return JsonResponse({'status': 'error', 'message': 'size는 0보다 큰 정수여야 합니다.'}, status=400)
-
-            paginator = Paginator(top_stores_qs, size)
-            try:
-                paginated_page = paginator.page(page)
-            except EmptyPage:
-                return JsonResponse({'status': 'error', 'message': '요청한 페이지가 존재하지 않습니다.'}, status=404)
-
-            data = {
-                'total_items': paginator.count,
-                'total_pages': paginator.num_pages,
-                'current_page': paginated_page.number,
-                'items': list(paginated_page.object_list.values('sid', 'sname', 'phone', 'addr_doro', 'addr4', 'geo_n', 'geo_e', 'matches1', 'matches2', 'enabled'))
-            }
-            return JsonResponse(data, status=200, json_dumps_params={'ensure_ascii': False})
-
-        else:
-            # page가 음수인 경우
-            return JsonResponse({'status': 'error', 'message': 'page는 0 또는 양의 정수여야 합니다.'}, status=400)
+        # page>=1은 미리 계산해 둔 순위 배열에서 해당 페이지만 잘라 옵니다. (COUNT/정렬 없음)
+        return paginate(request, top_stores_qs, services.STORE_LIST_FIELDS + ['enabled'],
+                        ranked=services.get_top_stores_ranked, cursor_param='after', next_key='next_after')
 
     except Exception as e:
         return JsonResponse({'status': 'error', 'message': '상위 판매점 조회 중 예상치 못한 오류가 발생했습니다.'}, status=500)
 
 
+
 @require_GET
 def get_store(request):
     """
     주어진 ID(sid)에 해당하는 판매점의 상세 정보를 조회하는 API 뷰.
-    GET 요청으로 sid를 받습니다.
+    GET 요청으로 sid를 받습니다. detail=1이면 모든 당첨 내역(wins)을 회차 추첨일, 당첨금과 함께 반환합니다.
     """
     sid_str = request.GET.get('sid')
 
@@ -356,6 +379,8 @@ def get_store(request):
         # model_to_dict를 사용하여 모델 인스턴스를 딕셔너리로 변환합니다.
         # enabled 필드는 제외합니다.
         data = model_to_dict(store, exclude=['enabled'])
+        if request.GET.get('detail') == '1':
+            data['wins'] = services.get_store_wins(sid)
         return JsonResponse(data, status=200, json_dumps_params={'ensure_ascii': False})
 
     except services.Store.DoesNotExist:
@@ -468,6 +493,74 @@ def add_user_numbers(request):
         }, status=500)
 
 
+def _parse_bulk_numbers(request):
+    """
+    일괄 저장 API의 요청 본문에서 (uid, 번호 세트 목록)을 꺼냅니다.
+    - Content-Type: application/json -> {"uid": "...", "numbers": [[1,2,3,4,5,6], ...]}
+    - Content-Type: application/x-ndjson -> 한 줄에 번호 세트 하나, uid는 쿼리 파라미터
+    - 그 외(form) -> uid, numbers(JSON 배열 문자열)
+    NDJSON에서 해석할 수 없는 줄은 None으로 남겨 항목별 오류(invalid)로 응답합니다.
+    """
+    content_type = request.content_type or ''
+    if content_type == 'application/x-ndjson':
+        items = []
+        for line in request.body.decode('utf-8').splitlines():
+            if not line.strip():
+                continue
+            try:
+                items.append(json.loads(line))
+            except json.JSONDecodeError:
+                items.append(None)
+        return request.GET.get('uid'), items
+
+    if content_type == 'application/json':
+        body = json.loads(request.body.decode('utf-8'))
+        if not isinstance(body, dict):
+            raise ValidationError("요청 본문은 uid와 numbers를 가진 JSON 객체여야 합니다.")
+        return body.get('uid') or request.GET.get('uid'), body.get('numbers')
+
+    numbers_str = request.POST.get('numbers')
+    return request.POST.get('uid'), json.loads(numbers_str) if numbers_str else None
+
+
+def _bulk_add_numbers_view(request, add_func, label):
+    try:
+        uid, items = _parse_bulk_numbers(request)
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        return JsonResponse({'status': 'error', 'message': '로또 번호 형식이 올바르지 않습니다. JSON 배열 형태여야 합니다.'}, status=400)
+    except ValidationError as e:
+        return JsonResponse({'status': 'error', 'message': e.message}, status=400)
+
+    if not uid or items is None:
+        return JsonResponse({'status': 'error', 'message': 'UID와 로또 번호는 필수 입력값입니다.'}, status=400)
+    if not isinstance(items, list):
+        return JsonResponse({'status': 'error', 'message': 'numbers는 배열 형태여야 합니다.'}, status=400)
+
+    try:
+        result = add_func(uid, items)
+        return JsonResponse({
+            'status': 'success',
+            'message': f"{result['summary']['created'] + result['summary']['restored']}개의 {label}가 저장되었습니다.",
+            **result
+        }, status=200, json_dumps_params={'ensure_ascii': False})
+
+    except services.User.DoesNotExist as e:
+        return JsonResponse({'status': 'error', 'message': str(e)}, status=404)
+    except ValidationError as e:
+        return JsonResponse({'status': 'error', 'message': e.message}, status=400)
+    except Exception as e:
+        return JsonResponse({'status': 'error', 'message': f'{label} 일괄 저장 중 예상치 못한 오류가 발생했습니다.'}, status=500)
+
+
+@require_POST
+def bulk_add_user_numbers(request):
+    """
+    사용자의 로또 번호를 일괄 저장하는 API 뷰. (JSON 배열 또는 NDJSON, _parse_bulk_numbers 참고)
+    잘못된 세트나 이미 저장된 세트가 있어도 나머지는 저장하며, 항목별 결과(created, restored, duplicate, exists, invalid)를 응답합니다.
+    """
+    return _bulk_add_numbers_view(request, services.bulk_add_user_numbers, '로또 번호')
+
+
 @require_POST
 def del_user_numbers(request):
     """
@@ -512,11 +605,11 @@ def get_user_numbers(request):
     """
     주어진 UID를 가진 사용자의 로또 번호를 조회하는 API 뷰.
     GET 요청으로 uid와 page를 받습니다. page=0이면 전체, page>=1이면 페이지네이션을 적용합니다.
+    page 대신 cursor(첫 페이지는 빈 값)와 size를 주면 키셋 페이지네이션을 적용합니다.
     """
     uid = request.GET.get('uid')
-    page_str = request.GET.get('page')
 
-    if not uid or page_str is None:
+    if not uid:
         return JsonResponse({
             'status': 'error',
             'message': 'UID와 page는 필수 입력값입니다.'
@@ -527,53 +620,8 @@ def get_user_numbers(request):
         if not services.User.objects.filter(uid=uid).exists():
             raise services.User.DoesNotExist(f"UID '{uid}'를 가진 사용자를 찾을 수 없습니다.")
 
-        try:
-            page = int(page_str)
-        except (ValueError, TypeError):
-            return JsonResponse({'status': 'error', 'message': 'page는 유효한 정수여야 합니다.'}, status=400)
-
         user_numbers_qs = services.get_user_numbers(uid)
-
-        if page == 0:
-            # page가 0이면 전체 항목을 페이지네이션 구조에 맞춰 반환
-            all_items = list(user_numbers_qs.values('id', 'number1', 'number2', 'number3', 'number4', 'number5', 'number6', 'created_at'))
-            data = {
-                'total_items': len(all_items),
-                'total_pages': 1,
-                'current_page': 0,
-                'items': all_items
-            }
-            return JsonResponse(data, status=200, json_dumps_params={'ensure_ascii': False})
-
-        elif page >= 1:
-            # page가 1 이상이면 size 파라미터가 필수
-            size_str = request.GET.get('size')
-            if not size_str:
-                return JsonResponse({'status': 'error', 'message': 'page가 1 이상일 경우 size는 필수 입력값입니다.'}, status=400)
-
-            try:
-                size = int(size_str)
-                if size <= 0: raise ValueError
-            except (ValueError, TypeError):
-                return JsonResponse({'status': 'error', 'message': 'size는 0보다 큰 정수여야 합니다.'}, status=400)
-
-            paginator = Paginator(user_numbers_qs, size)
-            try:
-                paginated_page = paginator.page(page)
-            except EmptyPage:
-                return JsonResponse({'status': 'error', 'message': '요청한 페이지가 존재하지 않습니다.'}, status=404)
-
-            data = {
-                'total_items': paginator.count,
-                'total_pages': paginator.num_pages,
-                'current_page': paginated_page.number,
-                'items': list(paginated_page.object_list.values('id', 'number1', 'number2', 'number3', 'number4', 'number5', 'number6', 'created_at'))
-            }
-            return JsonResponse(data, status=200, json_dumps_params={'ensure_ascii': False})
-
-        else:
-            # page가 음수인 경우
-            return JsonResponse({'status': 'error', 'message': 'page는 0 또는 양의 정수여야 합니다.'}, status=400)
+        return paginate(request, user_numbers_qs, USER_NUMBER_FIELDS)
 
     except services.User.DoesNotExist as e:
         return JsonResponse({'status': 'error', 'message': str(e)}, status=404)
@@ -581,6 +629,7 @@ def get_user_numbers(request):
         return JsonResponse({'status': 'error', 'message': '번호 조회 중 예상치 못한 오류가 발생했습니다.'}, status=500)
 
 
+
 # PURCHASED NUMBER
 
 
@@ -615,7 +664,7 @@ def add_purchased_numbers(request):
         new_purchased_numbers = services.add_purchased_numbers(uid, numbers)
 
         data = [
-            model_to_dict(n, exclude=['deleted']) for n in new_purchased_numbers
+            model_to_dict(n, exclude=['deleted', 'mask']) for n in new_purchased_numbers
         ]
 
         return JsonResponse({
@@ -632,6 +681,15 @@ def add_purchased_numbers(request):
         return JsonResponse({'status': 'error', 'message': '구매 번호 저장 중 예상치 못한 오류가 발생했습니다.', 'detail': str(e)}, status=500)
 
 
+@require_POST
+def bulk_add_purchased_numbers(request):
+    """
+    사용자의 다음 회차 구매 번호를 일괄 저장하는 API 뷰. (JSON 배열 또는 NDJSON, _parse_bulk_numbers 참고)
+    QR 용지 한 장이나 수백 개의 조합을 한 번에 저장할 때 사용하며, 항목별 결과를 응답합니다.
+    """
+    return _bulk_add_numbers_view(request, services.bulk_add_purchased_numbers, '구매 번호')
+
+
 @require_POST
 def del_purchased_numbers(request):
     """
@@ -670,11 +728,11 @@ def get_purchased_numbers(request):
     """
     주어진 UID를 가진 사용자의 구매 번호를 조회하는 API 뷰.
     GET 요청으로 uid와 page를 받습니다. page=0이면 전체, page>=1이면 페이지네이션을 적용합니다.
+    page 대신 cursor(첫 페이지는 빈 값)와 size를 주면 키셋 페이지네이션을 적용합니다.
     """
     uid = request.GET.get('uid')
-    page_str = request.GET.get('page')
 
-    if not uid or page_str is None:
+    if not uid:
         return JsonResponse({
             'status': 'error',
             'message': 'UID와 page는 필수 입력값입니다.'
@@ -685,55 +743,16 @@ def get_purchased_numbers(request):
         if not services.User.objects.filter(uid=uid).exists():
             raise services.User.DoesNotExist(f"UID '{uid}'를 가진 사용자를 찾을 수 없습니다.")
 
-        try:
-            page = int(page_str)
-        except (ValueError, TypeError):
-            return JsonResponse({'status': 'error', 'message': 'page는 유효한 정수여야 합니다.'}, status=400)
-
         purchased_numbers_qs = services.get_purchased_numbers(uid)
-
-        if page == 0:
-            # page가 0이면 전체 항목을 페이지네이션 구조에 맞춰 반환
-            all_items = list(purchased_numbers_qs.values('id', 'rid', 'number1', 'number2', 'number3', 'number4', 'number5', 'number6', 'result', 'created_at'))
-            data = {
-                'total_items': len(all_items),
-                'total_pages': 1,
-                'current_page': 0,
-                'items': all_items
-            }
-            return JsonResponse(data, status=200, json_dumps_params={'ensure_ascii': False})
-
-        elif page >= 1:
-            # page가 1 이상이면 size 파라미터가 필수
-            size_str = request.GET.get('size')
-            if not size_str:
-                return JsonResponse({'status': 'error', 'message': 'page가 1 이상일 경우 size는 필수 입력값입니다.'}, status=400)
-
-            try:
-                size = int(size_str)
-                if size <= 0: raise ValueError
-            except (ValueError, TypeError):
-                return JsonResponse({'status': 'error', 'message': 'size는 0보다 큰 정수여야 합니다.'}, status=400)
-
-            paginator = Paginator(purchased_numbers_qs, size)
-            paginated_page = paginator.page(page)
-
-            data = {
-                'total_items': paginator.count,
-                'total_pages': paginator.num_pages,
-                'current_page': paginated_page.number,
-                'items': list(paginated_page.object_list.values('id', 'rid', 'number1', 'number2', 'number3', 'number4', 'number5', 'number6', 'result', 'created_at'))
-            }
-            return JsonResponse(data, status=200, json_dumps_params={'ensure_ascii': False})
+        return paginate(request, purchased_numbers_qs, PURCHASED_NUMBER_FIELDS)
 
     except services.User.DoesNotExist as e:
         return JsonResponse({'status': 'error', 'message': str(e)}, status=404)
-    except EmptyPage:
-        return JsonResponse({'status': 'error', 'message': '요청한 페이지가 존재하지 않습니다.'}, status=404)
     except Exception as e:
         return JsonResponse({'status': 'error', 'message': '구매 번호 조회 중 예상치 못한 오류가 발생했습니다.'}, status=500)
 
 
+
 # SHARED NUMBER
 
 
@@ -769,7 +788,7 @@ def add_shared_number(request):
 
         new_shared_number = services.add_shared_number(uid, rid, numbers, description)
 
-        data = model_to_dict(new_shared_number)
+        data = model_to_dict(new_shared_number, exclude=['mask'])
         data['user_nick'] = new_shared_number.user.nick # 응답에 사용자 닉네임 추가
 
         return JsonResponse({
@@ -832,12 +851,9 @@ def get_shared_numbers(request):
     공유된 번호를 조회하는 API 뷰.
     GET 요청으로 uid, page를 받습니다. page=0이면 전체, page>=1이면 페이지네이션을 적용합니다.
     uid 파라미터로 필터링할 수 있습니다.
+    page 대신 cursor(첫 페이지는 빈 값)와 size를 주면 키셋 페이지네이션을 적용합니다.
     """
     uid = request.GET.get('uid')
-    page_str = request.GET.get('page')
-
-    if page_str is None:
-        return JsonResponse({'status': 'error', 'message': 'page는 필수 입력값입니다.'}, status=400)
 
     try:
         # 서비스 함수를 호출하여 기본 쿼리셋을 가져옵니다.
@@ -847,118 +863,114 @@ def get_shared_numbers(request):
         if uid:
             shared_numbers_qs = shared_numbers_qs.filter(user__uid=uid)
 
-        try:
-            page = int(page_str)
-        except (ValueError, TypeError):
-            return JsonResponse({'status': 'error', 'message': 'page는 유효한 정수여야 합니다.'}, status=400)
-
-        if page == 0:
-            # page가 0이면 전체 항목을 페이지네이션 구조에 맞춰 반환
-            all_items = list(shared_numbers_qs.values('id', 'rid', 'number1', 'number2', 'number3', 'number4', 'number5', 'number6', 'description', 'result', 'created_at', 'user__nick'))
-            data = {
-                'total_items': len(all_items),
-                'total_pages': 1,
-                'current_page': 0,
-                'items': all_items
-            }
-            return JsonResponse(data, status=200, json_dumps_params={'ensure_ascii': False})
-
-        elif page >= 1:
-            # page가 1 이상이면 size 파라미터가 필수
-            size_str = request.GET.get('size')
-            if not size_str:
-                return JsonResponse({'status': 'error', 'message': 'page가 1 이상일 경우 size는 필수 입력값입니다.'}, status=400)
-
-            try:
-                size = int(size_str)
-                if size <= 0: raise ValueError
-            except (ValueError, TypeError):
-                return JsonResponse({'status': 'error', 'message': 'size는 0보다 큰 정수여야 합니다.'}, status=400)
-
-            paginator = Paginator(shared_numbers_qs, size)
-            try:
-                paginated_page = paginator.page(page)
-            except EmptyPage:
-                return JsonResponse({'status': 'error', 'message': '요청한 페이지가 존재하지 않습니다.'}, status=404)
-
-            data = {
-                'total_items': paginator.count,
-                'total_pages': paginator.num_pages,
-                'current_page': paginated_page.number,
-                'items': list(paginated_page.object_list.values('id', 'rid', 'number1', 'number2', 'number3', 'number4', 'number5', 'number6', 'description', 'result', 'created_at', 'user__nick'))
-            }
-            return JsonResponse(data, status=200, json_dumps_params={'ensure_ascii': False})
-
-        else:
-            # page가 음수인 경우
-            return JsonResponse({'status': 'error', 'message': 'page는 0 또는 양의 정수여야 합니다.'}, status=400)
+        # 전체 공유 번호는 계속 늘어나므로 전체 수는 추정값을 사용합니다.
+        return paginate(request, shared_numbers_qs, SHARED_NUMBER_FIELDS, count='exact' if uid else 'estimated')
 
     except Exception as e:
         return JsonResponse({'status': 'error', 'message': '공유 번호 조회 중 예상치 못한 오류가 발생했습니다.'}, status=500)
 
 
+
 @require_GET
 def get_top_shared_numbers(request):
     """
     당첨 결과가 좋은 순서대로 공유 번호 목록을 조회하는 API 뷰.
     GET 요청으로 page를 받습니다. page=0이면 전체, page>=1이면 페이지네이션을 적용합니다.
+    page 대신 cursor(첫 페이지는 빈 값)와 size를 주면 키셋 페이지네이션을 적용합니다.
+    """
+    try:
+        top_numbers_qs = services.get_top_shared_numbers()
+        # 당첨 결과는 추첨 후에만 바뀌므로 전체 수는 잠시 캐시해 둡니다.
+        return paginate(request, top_numbers_qs, SHARED_NUMBER_FIELDS, count='cached')
+
+    except Exception as e:
+        return JsonResponse({'status': 'error', 'message': '상위 공유 번호 조회 중 예상치 못한 오류가 발생했습니다.'}, status=500)
+
+
+
+@require_GET
+def get_same_shared_numbers(request):
+    """
+    같은 회차에 같은 번호 조합을 공유한 사용자 목록을 조회하는 API 뷰.
+    GET 요청으로 rid와 numbers(JSON 배열 문자열)를 받습니다.
     """
-    page_str = request.GET.get('page')
+    rid_str = request.GET.get('rid')
+    numbers_str = request.GET.get('numbers')
 
-    if page_str is None:
-        return JsonResponse({'status': 'error', 'message': 'page는 필수 입력값입니다.'}, status=400)
+    if not rid_str or not numbers_str:
+        return JsonResponse({'status': 'error', 'message': 'rid와 numbers는 필수 입력값입니다.'}, status=400)
 
     try:
-        top_numbers_qs = services.get_top_shared_numbers()
+        rid = int(rid_str)
+        numbers = json.loads(numbers_str)
+    except (ValueError, TypeError):
+        return JsonResponse({'status': 'error', 'message': 'rid는 정수, numbers는 JSON 배열 형태여야 합니다.'}, status=400)
 
-        try:
-            page = int(page_str)
-        except (ValueError, TypeError):
-            return JsonResponse({'status': 'error', 'message': 'page는 유효한 정수여야 합니다.'}, status=400)
-
-        if page == 0:
-            # page가 0이면 전체 항목을 페이지네이션 구조에 맞춰 반환
-            all_items = list(top_numbers_qs.values('id', 'rid', 'number1', 'number2', 'number3', 'number4', 'number5', 'number6', 'description', 'result', 'created_at', 'user__nick'))
-            data = {
-                'total_items': len(all_items),
-                'total_pages': 1,
-                'current_page': 0,
-                'items': all_items
-            }
-            return JsonResponse(data, status=200, json_dumps_params={'ensure_ascii': False})
+    try:
+        same_qs = services.get_same_shared_numbers(rid, numbers)
+        items = list(same_qs.values('id', 'description', 'result', 'created_at', 'user__nick'))
+        data = {
+            'rid': rid,
+            'numbers': sorted(numbers),
+            'count': len(items),
+            'items': items
+        }
+        return JsonResponse(data, status=200, json_dumps_params={'ensure_ascii': False})
 
-        elif page >= 1:
-            # page가 1 이상이면 size 파라미터가 필수
-            size_str = request.GET.get('size')
-            if not size_str:
-                return JsonResponse({'status': 'error', 'message': 'page가 1 이상일 경우 size는 필수 입력값입니다.'}, status=400)
+    except ValidationError as e:
+        return JsonResponse({'status': 'error', 'message': e.message}, status=400)
+    except Exception as e:
+        return JsonResponse({'status': 'error', 'message': '같은 번호 조회 중 예상치 못한 오류가 발생했습니다.'}, status=500)
 
-            try:
-                size = int(size_str)
-                if size <= 0: raise ValueError
-            except (ValueError, TypeError):
-                return JsonResponse({'status': 'error', 'message': 'size는 0보다 큰 정수여야 합니다.'}, status=400)
 
-            paginator = Paginator(top_numbers_qs, size)
-            try:
-                paginated_page = paginator.page(page)
-            except EmptyPage:
-                return JsonResponse({'status': 'error', 'message': '요청한 페이지가 존재하지 않습니다.'}, status=404)
-
-            data = {
-                'total_items': paginator.count,
-                'total_pages': paginator.num_pages,
-                'current_page': paginated_page.number,
-                'items': list(paginated_page.object_list.values('id', 'rid', 'number1', 'number2', 'number3', 'number4', 'number5', 'number6', 'description', 'result', 'created_at', 'user__nick'))
-            }
-            return JsonResponse(data, status=200, json_dumps_params={'ensure_ascii': False})
+@require_GET
+def get_hot_combinations(request):
+    """
+    회차별로 가장 많이 공유/구매된 번호 조합을 조회하는 API 뷰.
+    GET 요청으로 rid(기본값: 다음 회차), kind(total|shared|purchased, 기본값: total), limit(기본값: 10)을 받습니다.
+    """
+    try:
+        rid = int(request.GET['rid']) if request.GET.get('rid') else None
+        limit = int(request.GET.get('limit', 10))
+    except (ValueError, TypeError):
+        return JsonResponse({'status': 'error', 'message': 'rid와 limit은 유효한 정수여야 합니다.'}, status=400)
 
-        else:
-            # page가 음수인 경우
-            return JsonResponse({'status': 'error', 'message': 'page는 0 또는 양의 정수여야 합니다.'}, status=400)
+    try:
+        data = services.get_hot_combinations(rid, request.GET.get('kind', 'total'), limit)
+        return JsonResponse(data, status=200, json_dumps_params={'ensure_ascii': False})
 
+    except ValidationError as e:
+        return JsonResponse({'status': 'error', 'message': e.message}, status=400)
     except Exception as e:
-        return JsonResponse({'status': 'error', 'message': '상위 공유 번호 조회 중 예상치 못한 오류가 발생했습니다.'}, status=500)
+        return JsonResponse({'status': 'error', 'message': '인기 번호 조합 조회 중 예상치 못한 오류가 발생했습니다.'}, status=500)
+
+
+@require_GET
+def get_combination_count(request):
+    """
+    회차에 주어진 번호 조합을 공유/구매한 수를 조회하는 API 뷰.
+    GET 요청으로 rid와 numbers(JSON 배열 문자열)를 받습니다.
+    """
+    rid_str = request.GET.get('rid')
+    numbers_str = request.GET.get('numbers')
+
+    if not rid_str or not numbers_str:
+        return JsonResponse({'status': 'error', 'message': 'rid와 numbers는 필수 입력값입니다.'}, status=400)
+
+    try:
+        rid = int(rid_str)
+        numbers = json.loads(numbers_str)
+    except (ValueError, TypeError):
+        return JsonResponse({'status': 'error', 'message': 'rid는 정수, numbers는 JSON 배열 형태여야 합니다.'}, status=400)
+
+    try:
+        data = services.get_combination_count(rid, numbers)
+        return JsonResponse(data, status=200, json_dumps_params={'ensure_ascii': False})
+
+    except ValidationError as e:
+        return JsonResponse({'status': 'error', 'message': e.message}, status=400)
+    except Exception as e:
+        return JsonResponse({'status': 'error', 'message': '번호 조합 집계 조회 중 예상치 못한 오류가 발생했습니다.'}, status=500)
 
 
 @require_GET
@@ -966,60 +978,142 @@ def get_top_shared_users(request):
     """
     당첨 횟수가 많은 순서대로 사용자 목록을 조회하는 API 뷰.
     GET 요청으로 page를 받습니다. page=0이면 전체, page>=1이면 페이지네이션을 적용합니다.
+    page 대신 cursor(첫 페이지는 빈 값)와 size를 주면 키셋 페이지네이션을 적용합니다.
     """
-    page_str = request.GET.get('page')
+    try:
+        top_users_qs = services.get_top_shared_users()
+        # page>=1은 미리 계산해 둔 순위 배열에서 해당 페이지만 잘라 옵니다. (COUNT/정렬 없음)
+        return paginate(request, top_users_qs, ['uid', 'nick', 'matches1', 'matches2', 'matches3', 'created_at'],
+                        ranked=services.get_top_shared_users_ranked)
+
+    except Exception as e:
+        return JsonResponse({'status': 'error', 'message': '상위 사용자 조회 중 예상치 못한 오류가 발생했습니다.'}, status=500)
 
-    if page_str is None:
-        return JsonResponse({'status': 'error', 'message': 'page는 필수 입력값입니다.'}, status=400)
+
+
+@require_GET
+def get_user_rank(request):
+    """
+    주어진 UID를 가진 사용자의 당첨 순위를 조회하는 API 뷰.
+    GET 요청으로 uid를 받습니다. 순위권 밖이면 rank는 None입니다.
+    """
+    uid = request.GET.get('uid')
+
+    if not uid:
+        return JsonResponse({'status': 'error', 'message': 'uid는 필수 입력값입니다.'}, status=400)
 
     try:
-        top_users_qs = services.get_top_shared_users()
+        data = services.get_user_rank(uid)
+        return JsonResponse(data, status=200, json_dumps_params={'ensure_ascii': False})
 
-        try:
-            page = int(page_str)
-        except (ValueError, TypeError):
-            return JsonResponse({'status': 'error', 'message': 'page는 유효한 정수여야 합니다.'}, status=400)
-
-        if page == 0:
-            # page가 0이면 전체 항목을 페이지네이션 구조에 맞춰 반환
-            all_items = list(top_users_qs.values('uid', 'nick', 'matches1', 'matches2', 'matches3', 'created_at'))
-            data = {
-                'total_items': len(all_items),
-                'total_pages': 1,
-                'current_page': 0,
-                'items': all_items
-            }
-            return JsonResponse(data, status=200, json_dumps_params={'ensure_ascii': False})
+    except services.User.DoesNotExist as e:
+        return JsonResponse({'status': 'error', 'message': str(e)}, status=404)
+    except Exception as e:
+        return JsonResponse({'status': 'error', 'message': '사용자 순위 조회 중 예상치 못한 오류가 발생했습니다.'}, status=500)
 
-        elif page >= 1:
-            # page가 1 이상이면 size 파라미터가 필수
-            size_str = request.GET.get('size')
-            if not size_str:
-                return JsonResponse({'status': 'error', 'message': 'page가 1 이상일 경우 size는 필수 입력값입니다.'}, status=400)
 
-            try:
-                size = int(size_str)
-                if size <= 0: raise ValueError
-            except (ValueError, TypeError):
-                return JsonResponse({'status': 'error', 'message': 'size는 0보다 큰 정수여야 합니다.'}, status=400)
+# STATS
 
-            paginator = Paginator(top_users_qs, size)
-            try:
-                paginated_page = paginator.page(page)
-            except EmptyPage:
-                return JsonResponse({'status': 'error', 'message': '요청한 페이지가 존재하지 않습니다.'}, status=404)
-
-            data = {
-                'total_items': paginator.count,
-                'total_pages': paginator.num_pages,
-                'current_page': paginated_page.number,
-                'items': list(paginated_page.object_list.values('uid', 'nick', 'matches1', 'matches2', 'matches3', 'created_at'))
-            }
-            return JsonResponse(data, status=200, json_dumps_params={'ensure_ascii': False})
 
-        else:
-            # page가 음수인 경우
-            return JsonResponse({'status': 'error', 'message': 'page는 0 또는 양의 정수여야 합니다.'}, status=400)
+@require_GET
+def get_number_stats(request):
+    """
+    회차 구간의 번호별 출현 통계(출현 횟수, 보너스 출현 횟수, 미출현 회차 수, 연속 출현, 동반 출현)를 조회하는 API 뷰.
+    GET 요청으로 from_rid, to_rid(기본값: 전체 구간)와 limit(기본값: 10)을 받습니다.
+    """
+    try:
+        from_rid = int(request.GET['from_rid']) if request.GET.get('from_rid') else None
+        to_rid = int(request.GET['to_rid']) if request.GET.get('to_rid') else None
+        limit = int(request.GET.get('limit', 10))
+    except (ValueError, TypeError):
+        return JsonResponse({'status': 'error', 'message': 'from_rid, to_rid, limit은 유효한 정수여야 합니다.'}, status=400)
 
+    try:
+        data = services.get_number_stats(from_rid, to_rid, limit)
+        return JsonResponse(data, status=200, json_dumps_params={'ensure_ascii': False})
+
+    except ValidationError as e:
+        return JsonResponse({'status': 'error', 'message': e.message}, status=400)
     except Exception as e:
-        return JsonResponse({'status': 'error', 'message': '상위 사용자 조회 중 예상치 못한 오류가 발생했습니다.'}, status=500)
+        return JsonResponse({'status': 'error', 'message': '번호 통계 조회 중 예상치 못한 오류가 발생했습니다.'}, status=500)
+
+
+@require_GET
+def backtest_numbers(request):
+    """
+    번호 세트들이 지난 회차들에서 몇 등이었을지와 등수별 횟수, 가상 당첨금을 조회하는 API 뷰.
+    GET 요청으로 numbers(JSON 2차원 배열 문자열, 한 세트면 1차원 배열도 가능)와 from_rid, to_rid(기본값: 전체 구간)를 받습니다.
+    """
+    numbers_str = request.GET.get('numbers')
+    if not numbers_str:
+        return JsonResponse({'status': 'error', 'message': 'numbers는 필수 입력값입니다.'}, status=400)
+
+    try:
+        numbers_list = json.loads(numbers_str)
+        from_rid = int(request.GET['from_rid']) if request.GET.get('from_rid') else None
+        to_rid = int(request.GET['to_rid']) if request.GET.get('to_rid') else None
+    except (ValueError, TypeError):
+        return JsonResponse({'status': 'error', 'message': 'numbers는 JSON 배열, from_rid와 to_rid는 정수 형태여야 합니다.'}, status=400)
+
+    # 한 세트만 보낸 경우 ([1,2,3,4,5,6])
+    if isinstance(numbers_list, list) and numbers_list and not isinstance(numbers_list[0], list):
+        numbers_list = [numbers_list]
+
+    try:
+        data = services.backtest_numbers(numbers_list, from_rid, to_rid)
+        return JsonResponse(data, status=200, json_dumps_params={'ensure_ascii': False})
+
+    except ValidationError as e:
+        return JsonResponse({'status': 'error', 'message': e.message}, status=400)
+    except Exception as e:
+        return JsonResponse({'status': 'error', 'message': '번호 백테스트 중 예상치 못한 오류가 발생했습니다.'}, status=500)
+
+
+@require_GET
+def get_draw_analytics(request):
+    """
+    추첨기/볼세트별 번호 출현 횟수, 모의추첨 번호와 당첨 번호의 겹침, 추첨 순서별 번호 통계를 조회하는 API 뷰.
+    """
+    try:
+        data = services.get_draw_analytics()
+        return JsonResponse(data, status=200, json_dumps_params={'ensure_ascii': False})
+    except Exception as e:
+        return JsonResponse({'status': 'error', 'message': '추첨 통계 조회 중 예상치 못한 오류가 발생했습니다.'}, status=500)
+
+
+# RECOMMEND
+
+
+@require_GET
+def recommend_numbers(request):
+    """
+    조건을 만족하는 추천 번호 세트들을 생성하는 API 뷰.
+    GET 요청으로 count(기본값: 5), include/exclude(JSON 배열 문자열), sum_min, sum_max, odd(홀수 개수),
+    exclude_won(1이면 지난 1등 조합 제외), uid(사용자 저장 번호 제외), seed를 받습니다.
+    """
+    try:
+        count = int(request.GET.get('count', 5))
+        include = json.loads(request.GET['include']) if request.GET.get('include') else None
+        exclude = json.loads(request.GET['exclude']) if request.GET.get('exclude') else None
+        sum_min = int(request.GET['sum_min']) if request.GET.get('sum_min') else None
+        sum_max = int(request.GET['sum_max']) if request.GET.get('sum_max') else None
+        odd = int(request.GET['odd']) if request.GET.get('odd') else None
+        seed = int(request.GET['seed']) if request.GET.get('seed') else None
+    except (ValueError, TypeError):
+        return JsonResponse({'status': 'error', 'message': 'include와 exclude는 JSON 배열, 나머지 조건은 정수 형태여야 합니다.'}, status=400)
+
+    try:
+        data = services.recommend_numbers(
+            count, include, exclude, sum_min, sum_max, odd,
+            exclude_won=request.GET.get('exclude_won') == '1',
+            uid=request.GET.get('uid'),
+            seed=seed,
+        )
+        return JsonResponse(data, status=200, json_dumps_params={'ensure_ascii': False})
+
+    except services.User.DoesNotExist as e:
+        return JsonResponse({'status': 'error', 'message': str(e)}, status=404)
+    except ValidationError as e:
+        return JsonResponse({'status': 'error', 'message': e.message}, status=400)
+    except Exception as e:
+        return JsonResponse({'status': 'error', 'message': '추천 번호 생성 중 예상치 못한 오류가 발생했습니다.'}, status=500)